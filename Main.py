@@ -1,19 +1,26 @@
 import pygame, sys, math, os, time, random
 from pygame.locals import *
+import numpy as np
 
 from Scripts.GameObject import GameObject
 from Scripts.CppBuild.Simulations import Vec2
 from Scripts.Handlers.SettingsHandler import SettingsHandler
-from Scripts.Handlers.WindowHandler import WindowHandler
 
 class Game:
-    def __init__(self):
+    def __init__(self, Benchmark = None):
+        # Benchmarks run without a window, drawing into an offscreen context
+        self.Benchmark = Benchmark
+
         pygame.init()
         pygame.display.set_caption("Forbidden")
 
         self.Settings = SettingsHandler()
 
-        if self.Settings.FullScreen:
+        if self.Benchmark is not None:
+            self.Benchmark.ApplySettings(self.Settings)
+            self.Screen = pygame.display.set_mode(size = self.Settings.ScreenResolution)
+
+        elif self.Settings.FullScreen:
             self.Screen = pygame.display.set_mode(
                 size = self.Settings.ScreenResolution,
                 flags = pygame.OPENGL | pygame.DOUBLEBUF | pygame.SCALED | pygame.FULLSCREEN,
@@ -25,11 +32,21 @@ class Game:
                 flags = pygame.OPENGL | pygame.DOUBLEBUF | pygame.RESIZABLE,
             )
 
-        self.Window = WindowHandler(self.Settings.AspectRatio, self.Settings.SceneResolution.y)
+        # Only imported with a real window since it needs win32gui
+        if self.Benchmark is None:
+            from Scripts.Handlers.WindowHandler import WindowHandler
+            self.Window = WindowHandler(self.Settings.AspectRatio, self.Settings.SceneResolution.y)
+        else:
+            self.Window = None
 
         self.Clock = pygame.time.Clock()
         self.DeltaTime = 1 / self.Settings.FpsCap
-        self.LastTime = time.time()
+        self.LastTime = time.perf_counter()
+
+        # The python and numpy generators are seeded here, the compiled simulations are handed the seed
+        if self.Settings.RandomSeed is not None:
+            random.seed(self.Settings.RandomSeed)
+            np.random.seed(self.Settings.RandomSeed)
             
         GameObject.Game = self
         self.LoadGameObjects()
@@ -40,18 +57,51 @@ class Game:
         from Scripts.Handlers.MouseHandler import MouseHandler
         from Scripts.Handlers.AudioHandler import AudioHandler
         from Scripts.Handlers.MenusHandler import MenusHandler
+        from Scripts.Handlers.RotationCacheHandler import RotationCacheHandler
+        from Scripts.Handlers.LightingHandler import LightingHandler
+        from Scripts.Simulations.WaveSimulation import WaveSimulation
+        from Scripts.Handlers.ProfilerHandler import ProfilerHandler
+        from Scripts.Handlers.SchedulerHandler import SchedulerHandler
+
+        self.Profiler = ProfilerHandler(
+            Enabled = self.Settings.Profiling,
+            HistoryFrames = self.Settings.ProfileFrames,
+            TraceDirectory = self.Settings.TraceDirectory,
+        )
+
+        # Simulations add themselves to it as they are made
+        self.Scheduler = SchedulerHandler(
+            Rates = self.Settings.SimulationRates,
+            MaximumSteps = self.Settings.MaximumSimulationSteps,
+        )
+
+        # Shared by the boat and the scene shader so it has to exist first
+        self.Waves = WaveSimulation(
+            SamplesPerPixel = 1,
+            TableMargin = 0.25,
+        )
 
         self.PygameScene = ScenePygame()
         self.ModernGLScene = SceneModernGL()
         self.Mouse = MouseHandler()
         self.Audio = AudioHandler()
         self.Menus = MenusHandler()
+        self.Rotations = RotationCacheHandler(
+            CacheBudget = self.Settings.RotationCacheMegabytes * 1024 * 1024,
+            PrewarmRotations = self.Settings.PrewarmRotations,
+        )
+        self.Lighting = LightingHandler()
 
         from Scripts.Simulations.BoatSimulation import BoatSimulation
         from Scripts.Simulations.TerrainSimulation import TerrainSimulation
         from Scripts.Simulations.KelpSimulation import KelpSimulationManager
         from Scripts.Simulations.FishSimulation import FishSimulationManager
 
+        # Benchmarks can scale the scene up
+        SceneSizes = {"NumberOfFish": 25, "NumberOfKelp": 25, "NumberOfGrassBlades": 200}
+        if self.Benchmark is not None:
+            SceneSizes.update(self.Benchmark.SceneSizes)
+
         self.Boat = BoatSimulation(
             Position = self.Settings.SceneResolution * 0.5,
             NumberSamplePoints = 5,
@@ -61,52 +111,106 @@ class Game:
             Position = self.Settings.SceneResolution * Vec2([-0.5, 2.0]),
             Resolution = Vec2([self.Settings.SceneResolution.x * 2, 50]),
             StepSize = 0.1,
-            NumberOfGrassBlades = 200,
+            NumberOfGrassBlades = SceneSizes["NumberOfGrassBlades"],
+            ChunkWidth = 256,
+            CacheBudget = self.Settings.TerrainCacheMegabytes * 1024 * 1024,
         )
 
         self.KelpManager = KelpSimulationManager(
-            NumberOfKelp = 25,
+            NumberOfKelp = SceneSizes["NumberOfKelp"],
         )
 
         self.FishManager = FishSimulationManager(
-            NumberOfFish = 25,
+            NumberOfFish = SceneSizes["NumberOfFish"],
             BoundsMin = self.Settings.SceneResolution * Vec2([-0.5, 0.55]),
             BoundsMax = self.Settings.SceneResolution * Vec2([1.5, 1.875]),
             BoundsMargin = 25,
         )
 
+        from Scripts.Handlers.QualityHandler import QualityHandler
+
+        # Needs every simulation it turns down so it comes last
+        self.Quality = QualityHandler(
+            Tiers = self.Settings.QualityTiers,
+            WindowFrames = 60,
+            DownscaleLoad = 1.0,
+            UpscaleLoad = 0.7,
+        )
+
     def Run(self):
         while True:
             self.Clock.tick(self.Settings.FpsCap)
-            self.DeltaTime = time.time() - self.LastTime
-            self.LastTime = time.time()
 
+            # One clock read so no time falls between the end of one frame and the start of the next
+            CurrentTime = time.perf_counter()
+            self.DeltaTime = CurrentTime - self.LastTime
+            self.LastTime = CurrentTime
+
+            FrameStartTime = time.perf_counter()
             PygameEvents = pygame.event.get()
 
+            self.Frame(PygameEvents, Vec2(pygame.mouse.get_pos()))
+
+            # Measured before the flip, which can wait for vsync
+            if self.Settings.AdaptiveQuality:
+                self.Quality.Update(time.perf_counter() - FrameStartTime, self.ModernGLScene.GpuFrameTime)
+
+            with self.Profiler.Section("Flip"):
+                pygame.display.flip()
+
+            self.Profiler.EndFrame()
+
+            for Event in PygameEvents:
+                if Event.type == QUIT:
+                    self.ModernGLScene.Quit()
+                    pygame.quit()
+                    sys.exit()
+
+                if Event.type == pygame.VIDEORESIZE:
+                    self.Settings.ScreenResolution = Vec2([Event.w, Event.h])
+
+    def Frame(self, PygameEvents, MousePosition):
+        # Sections are timed for the debug menu and traces, they do nothing with profiling off
+        Profile = self.Profiler.Section
+        self.Profiler.BeginFrame(PygameEvents)
+
+        with Profile("Menus"):
             self.Menus.Update(PygameEvents)
+        with Profile("PygameScene"):
             self.PygameScene.Update(PygameEvents)
-            self.Mouse.Update(PygameEvents, Vec2(pygame.mouse.get_pos()))
+        with Profile("Mouse"):
+            self.Mouse.Update(PygameEvents, MousePosition)
+        with Profile("Audio"):
             self.Audio.Update(PygameEvents)
+        with Profile("Waves"):
+            self.Waves.Update()
+
+        # Every simulation that is due steps here, the renders below draw between their last two steps
+        self.Scheduler.Update(self.DeltaTime)
 
+        with Profile("PygameScene"):
             self.PygameScene.Render()
+        with Profile("Boat"):
             self.Boat.Render()
+        with Profile("OceanFloor"):
             self.OceanFloor.Render()
+        with Profile("KelpManager"):
             self.KelpManager.Render()
+        with Profile("FishManager"):
             self.FishManager.Render()
+        with Profile("Menus"):
             self.Menus.Render()
+        with Profile("Mouse"):
             self.Mouse.Render()
+        with Profile("Lighting"):
+            self.Lighting.Update()
+        with Profile("ModernGLScene"):
             self.ModernGLScene.Render()
 
-            pygame.display.flip()
-
-            for Event in PygameEvents:
-                if Event.type == QUIT:
-                    self.ModernGLScene.Quit()
-                    pygame.quit()
-                    sys.exit()
-
-                if Event.type == pygame.VIDEORESIZE:
-                    self.Settings.ScreenResolution = Vec2([Event.w, Event.h])
-
 if __name__ == "__main__":
-    Game().Run()
+    if "--benchmark" in sys.argv:
+        from Scripts.Handlers.BenchmarkHandler import BenchmarkHandler
+        Benchmark = BenchmarkHandler(sys.argv[1:])
+        Benchmark.Run(Game(Benchmark))
+    else:
+        Game().Run()
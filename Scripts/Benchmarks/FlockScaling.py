@@ -0,0 +1,84 @@
+from ..CppBuild.Simulations import Vec2, Boid, SpatialGrid, Flock
+
+import argparse, time, os
+
+# Usage (from the repository root):
+#   python -m Scripts.Benchmarks.FlockScaling
+#   python -m Scripts.Benchmarks.FlockScaling --Sizes 25 500 5000 --Steps 50
+
+# Same fish bounds the game uses for a 640x360 scene
+BoundsMin = Vec2([-320, 198])
+BoundsMax = Vec2([960, 675])
+BoundsMargin = 25
+
+DeltaTime = 1 / 144
+MousePosition = Vec2([320, 400])
+MouseRadius = 25.0
+
+def CreateFlocks(NumberOfFish):
+    BruteForceBoids = [Boid(BoundsMin, BoundsMax, BoundsMargin) for Index in range(NumberOfFish)]
+    GridBoids = [Boid(BoundsMin, BoundsMax, BoundsMargin) for Index in range(NumberOfFish)]
+
+    # Both flocks start from the same state so the timings are comparable
+    for BruteForceBoid, GridBoid in zip(BruteForceBoids, GridBoids):
+        GridBoid.Position = BruteForceBoid.Position.copy()
+        GridBoid.Direction = BruteForceBoid.Direction.copy()
+
+    return BruteForceBoids, GridBoids
+
+def StepFlock(Boids):
+    Boids.Update(DeltaTime, False, MousePosition, MouseRadius)
+
+def StepBruteForce(Boids):
+    for Boid in Boids:
+        Boid.Update(Boids, DeltaTime, False, MousePosition, MouseRadius)
+
+def StepGrid(Boids, Grid):
+    Grid.Build(Boids)
+    for Boid in Boids:
+        Boid.Update(Grid, DeltaTime, False, MousePosition, MouseRadius)
+
+def MeasureStepTime(StepFunction, Steps, TimeLimit):
+    # Returns the average seconds per step, gives up early on very slow configurations
+    StepFunction()
+
+    StartTime = time.perf_counter()
+    for Step in range(Steps):
+        StepFunction()
+        if time.perf_counter() - StartTime > TimeLimit:
+            return (time.perf_counter() - StartTime) / (Step + 1)
+
+    return (time.perf_counter() - StartTime) / Steps
+
+def Main():
+    Parser = argparse.ArgumentParser(description = "Compare brute force, grid and whole flock boid updates")
+    Parser.add_argument("--Sizes", type = int, nargs = "+", default = [25, 100, 250, 500, 1000, 2500, 5000, 10000])
+    Parser.add_argument("--Steps", type = int, default = 25)
+    Parser.add_argument("--TimeLimit", type = float, default = 10.0, help = "Seconds before a configuration is cut short")
+    Parser.add_argument("--Threads", type = int, default = os.cpu_count() or 1, help = "Worker threads used by the flock")
+    Parser.add_argument("--BruteForceLimit", type = int, default = 2500, help = "Largest flock to run the brute force loop on")
+    Arguments = Parser.parse_args()
+
+    print(f"{'Fish':>8} {'Brute ms':>10} {'Grid ms':>10} {'Flock ms':>10} {'Speedup':>8} {'Flock FPS':>10}")
+
+    for NumberOfFish in Arguments.Sizes:
+        BruteForceBoids, GridBoids = CreateFlocks(NumberOfFish)
+        Grid = SpatialGrid()
+
+        GridTime = MeasureStepTime(lambda: StepGrid(GridBoids, Grid), Arguments.Steps, Arguments.TimeLimit)
+
+        WholeFlock = Flock(NumberOfFish, BoundsMin, BoundsMax, BoundsMargin, Arguments.Threads)
+        FlockTime = MeasureStepTime(lambda: StepFlock(WholeFlock), Arguments.Steps, Arguments.TimeLimit)
+
+        if NumberOfFish <= Arguments.BruteForceLimit:
+            BruteForceTime = MeasureStepTime(lambda: StepBruteForce(BruteForceBoids), Arguments.Steps, Arguments.TimeLimit)
+            BruteForceText = f"{BruteForceTime * 1000:10.3f}"
+            SpeedupText = f"{BruteForceTime / FlockTime:7.1f}x"
+        else:
+            BruteForceText = f"{'-':>10}"
+            SpeedupText = f"{'-':>8}"
+
+        print(f"{NumberOfFish:>8} {BruteForceText} {GridTime * 1000:10.3f} {FlockTime * 1000:10.3f} {SpeedupText} {1 / FlockTime:10.0f}")
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,113 @@
+import pygame, moderngl as mgl
+import argparse, time, os
+
+# Usage (from the repository root):
+#   python -m Scripts.Benchmarks.LayerUpload
+#   python -m Scripts.Benchmarks.LayerUpload --Scales 1 4 --Frames 200 --Backend egl
+
+# Scene resolution the game renders its layers at
+SceneResolution = [640, 360]
+NumberLayers = 4
+
+def CreateTexture(Context, Resolution):
+    Texture = Context.texture(Resolution, 4)
+    Texture.swizzle = "BGRA"
+    return Texture
+
+def MeasureFlipUpload(Context, Surfaces, Frames):
+    # The old path, a flipped copy of every layer written straight into its texture
+    Textures = [CreateTexture(Context, Surface.get_size()) for Surface in Surfaces]
+
+    StartTime = time.perf_counter()
+    for Frame in range(Frames):
+        for Texture, Surface in zip(Textures, Surfaces):
+            Texture.write(pygame.transform.flip(Surface, False, True).get_view("1"))
+    UploadTime = time.perf_counter() - StartTime
+
+    Context.finish()
+    TotalTime = time.perf_counter() - StartTime
+
+    for Texture in Textures:
+        Texture.release()
+
+    return UploadTime / Frames, TotalTime / Frames
+
+def MeasureDirectUpload(Context, Surfaces, Frames):
+    # SceneModernGL with StreamLayerUploads off, surface rows written as they are
+    Textures = [CreateTexture(Context, Surface.get_size()) for Surface in Surfaces]
+
+    StartTime = time.perf_counter()
+    for Frame in range(Frames):
+        for Texture, Surface in zip(Textures, Surfaces):
+            Texture.write(Surface.get_view("1"))
+    UploadTime = time.perf_counter() - StartTime
+
+    Context.finish()
+    TotalTime = time.perf_counter() - StartTime
+
+    for Texture in Textures:
+        Texture.release()
+
+    return UploadTime / Frames, TotalTime / Frames
+
+def MeasureBufferUpload(Context, Surfaces, Frames):
+    # SceneModernGL with StreamLayerUploads on, ping ponged pixel buffers orphaned before each write
+    Textures = [CreateTexture(Context, Surface.get_size()) for Surface in Surfaces]
+    Buffers = [[Context.buffer(reserve=Surface.get_width() * Surface.get_height() * 4, dynamic=True) for Index in range(2)] for Surface in Surfaces]
+
+    StartTime = time.perf_counter()
+    for Frame in range(Frames):
+        for Texture, LayerBuffers, Surface in zip(Textures, Buffers, Surfaces):
+            UploadBuffer = LayerBuffers[Frame % 2]
+            UploadBuffer.orphan()
+            UploadBuffer.write(Surface.get_view("1"))
+            Texture.write(UploadBuffer)
+    UploadTime = time.perf_counter() - StartTime
+
+    Context.finish()
+    TotalTime = time.perf_counter() - StartTime
+
+    for Texture, LayerBuffers in zip(Textures, Buffers):
+        Texture.release()
+        for UploadBuffer in LayerBuffers:
+            UploadBuffer.release()
+
+    return UploadTime / Frames, TotalTime / Frames
+
+def Main():
+    Parser = argparse.ArgumentParser(description = "Compare flipped, direct and pixel buffer uploads of the scene layers")
+    Parser.add_argument("--Scales", type = int, nargs = "+", default = [1, 2, 4], help = "Multiples of the scene resolution")
+    Parser.add_argument("--Frames", type = int, default = 100)
+    Parser.add_argument("--Backend", default = None, help = "Standalone context backend, egl on headless Linux")
+    Arguments = Parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode([1, 1])
+
+    Context = mgl.create_standalone_context(backend = Arguments.Backend) if Arguments.Backend else mgl.create_standalone_context()
+    print(f"{Context.info['GL_RENDERER']}")
+    # Upload columns are the time spent handing layers to the driver, GPU columns include waiting for it to finish
+    print(f"{'Resolution':>12} {'Flip ms':>10} {'Flip+GPU ms':>12} {'Direct ms':>10} {'Direct+GPU ms':>14} {'Buffer ms':>10} {'Buffer+GPU ms':>14}")
+
+    for Scale in Arguments.Scales:
+        Resolution = [SceneResolution[0] * Scale, SceneResolution[1] * Scale]
+        Surfaces = [pygame.Surface(Resolution, pygame.SRCALPHA) for Index in range(NumberLayers)]
+
+        for Surface in Surfaces:
+            Surface.fill([40, 80, 120, 255])
+
+        # One frame each first so texture allocation isn't timed
+        MeasureFlipUpload(Context, Surfaces, 1)
+        MeasureDirectUpload(Context, Surfaces, 1)
+        MeasureBufferUpload(Context, Surfaces, 1)
+
+        FlipTime, FlipTotalTime = MeasureFlipUpload(Context, Surfaces, Arguments.Frames)
+        DirectTime, DirectTotalTime = MeasureDirectUpload(Context, Surfaces, Arguments.Frames)
+        BufferTime, BufferTotalTime = MeasureBufferUpload(Context, Surfaces, Arguments.Frames)
+
+        ResolutionText = f"{Resolution[0]}x{Resolution[1]}"
+        print(f"{ResolutionText:>12} {FlipTime * 1000:10.3f} {FlipTotalTime * 1000:12.3f} {DirectTime * 1000:10.3f} {DirectTotalTime * 1000:14.3f} {BufferTime * 1000:10.3f} {BufferTotalTime * 1000:14.3f}")
+
+if __name__ == "__main__":
+    Main()
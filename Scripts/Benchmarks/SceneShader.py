@@ -0,0 +1,117 @@
+from ..NoiseTextures import NoiseTextures
+from ..SceneModernGL import SceneModernGL
+
+import moderngl as mgl
+from array import array
+import numpy as np
+import argparse, time
+
+# Usage (from the repository root):
+#   python -m Scripts.Benchmarks.SceneShader --Backend egl
+#   python -m Scripts.Benchmarks.SceneShader --Resolutions 640x360 1920x1080 --Frames 20
+
+# Flat wave table with the surface across the middle of the screen, half the pixels take the
+# underwater caustics path and half the foggy surface path
+ForegroundHeight = 0.5
+BackgroundHeight = 0.75
+WaveTableSamples = 64
+
+def CreateSceneProgram(Context, QuadBuffer, BakedNoise):
+    with open(f"Shaders/Vertex.glsl") as file:
+        VertexShader = file.read()
+    with open(f"Shaders/SceneFragment.glsl") as file:
+        SceneFragmentShader = file.read()
+
+    if BakedNoise:
+        SceneFragmentShader = SceneModernGL.AddDefines(SceneFragmentShader, ["BAKED_NOISE"])
+
+    SceneProgram = Context.program(vertex_shader=VertexShader, fragment_shader=SceneFragmentShader)
+    return SceneProgram, Context.vertex_array(SceneProgram, [(QuadBuffer, "2f 2f", "Vertex", "TextureCoordinate")])
+
+def CreateSceneInputs(Context):
+    # Empty layers and a flat wave table, the noise is what is being measured
+    LayerTexture = Context.texture([16, 16], 4, bytes(16 * 16 * 4))
+    WaveTable = np.zeros((WaveTableSamples, 4), dtype=np.float32)
+    WaveTable[:, 0] = ForegroundHeight
+    WaveTable[:, 2] = BackgroundHeight
+    WaveTexture = Context.texture([WaveTableSamples, 1], 4, WaveTable.tobytes(), dtype="f4")
+    return LayerTexture, WaveTexture
+
+def BindSceneInputs(SceneProgram, LayerTexture, WaveTexture):
+    for Location, Name in enumerate(["BackgroundTexture", "MidgroundTexture", "ForegroundTexture", "MenusTexture"]):
+        LayerTexture.use(Location)
+        SceneProgram[Name] = Location
+
+    WaveTexture.use(4)
+    SceneProgram["WaveTexture"] = 4
+    SceneProgram["WaveTableRange"] = (-1.0, 3.0)
+    SceneProgram["Offset"] = (0.0, 0.0)
+    SceneProgram["NumberLights"] = 0
+
+def MeasureSceneTime(Context, SceneProgram, SceneRenderObject, Resolution, Frames):
+    # Returns the average milliseconds per scene pass, waiting for each one to finish since
+    # software drivers don't report useful timer queries
+    SceneTexture = Context.texture(Resolution, 4)
+    SceneFrameBuffer = Context.framebuffer(color_attachments=[SceneTexture])
+    SceneFrameBuffer.use()
+    Context.viewport = (0, 0, Resolution[0], Resolution[1])
+
+    SceneProgram["SceneResolution"] = Resolution
+
+    SceneRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+    Context.finish()
+
+    StartTime = time.perf_counter()
+    for Frame in range(Frames):
+        SceneProgram["Time"] = Frame / 60
+        SceneRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+        Context.finish()
+    SceneTime = time.perf_counter() - StartTime
+
+    SceneFrameBuffer.release()
+    SceneTexture.release()
+
+    return SceneTime / Frames * 1000
+
+def Main():
+    Parser = argparse.ArgumentParser(description = "Compare the scene pass GPU time with procedural and baked noise")
+    Parser.add_argument("--Resolutions", nargs = "+", default = ["640x360", "1920x1080"])
+    Parser.add_argument("--Frames", type = int, default = 10)
+    Parser.add_argument("--Backend", default = None, help = "Standalone context backend, egl on headless Linux")
+    Arguments = Parser.parse_args()
+
+    Context = mgl.create_standalone_context(backend = Arguments.Backend) if Arguments.Backend else mgl.create_standalone_context()
+    print(f"{Context.info['GL_RENDERER']}")
+
+    QuadBuffer = Context.buffer(data=array("f", [
+        -1.0, 1.0, 0.0, 1.0,
+        1.0, 1.0, 1.0, 1.0,
+        -1.0, -1.0, 0.0, 0.0,
+        1.0, -1.0, 1.0, 0.0
+    ]))
+    ProceduralProgram, ProceduralRenderObject = CreateSceneProgram(Context, QuadBuffer, False)
+    BakedProgram, BakedRenderObject = CreateSceneProgram(Context, QuadBuffer, True)
+
+    StartTime = time.perf_counter()
+    Noise = NoiseTextures(Context, QuadBuffer)
+    Context.finish()
+    print(f"Noise bake {(time.perf_counter() - StartTime) * 1000:.1f} ms")
+
+    LayerTexture, WaveTexture = CreateSceneInputs(Context)
+    for SceneProgram in [ProceduralProgram, BakedProgram]:
+        BindSceneInputs(SceneProgram, LayerTexture, WaveTexture)
+
+    Noise.Use(BakedProgram, 5, 6)
+
+    print(f"{'Resolution':>12} {'Procedural ms':>14} {'Baked ms':>10} {'Speedup':>8}")
+
+    for ResolutionText in Arguments.Resolutions:
+        Resolution = tuple(int(Size) for Size in ResolutionText.split("x"))
+
+        ProceduralTime = MeasureSceneTime(Context, ProceduralProgram, ProceduralRenderObject, Resolution, Arguments.Frames)
+        BakedTime = MeasureSceneTime(Context, BakedProgram, BakedRenderObject, Resolution, Arguments.Frames)
+
+        print(f"{ResolutionText:>12} {ProceduralTime:14.2f} {BakedTime:10.2f} {ProceduralTime / BakedTime:7.1f}x")
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,296 @@
+from ..GameObject import GameObject
+from ..CppBuild import SimulationsBackend
+from ..CppBuild.Simulations import Vec2, Vec2Array, Boid, SpatialGrid, VerletChain
+from .SceneShader import CreateSceneProgram, CreateSceneInputs, BindSceneInputs
+
+import argparse, json, os, platform, sys, time
+from functools import partial
+from types import SimpleNamespace
+import numpy as np
+
+# Usage (from the repository root):
+#   python -m Scripts.Benchmarks.Suite run --Output Baseline.json
+#   python -m Scripts.Benchmarks.Suite run --Cases BoidUpdate VerletChain --Output Results.json
+#   python -m Scripts.Benchmarks.Suite compare Baseline.json Results.json --Threshold 0.1
+
+# Same bounds, step and mouse the game uses for a 640x360 scene
+SceneResolution = Vec2([640, 360])
+BoundsMin = Vec2([-320, 198])
+BoundsMax = Vec2([960, 675])
+BoundsMargin = 25
+
+DeltaTime = 1 / 144
+MousePosition = Vec2([320, 400])
+MouseRadius = 25.0
+
+# Cases build what they measure and return the call to time, the game objects among them only
+# need the few parts of the game they read
+def CreateGame():
+    import pygame
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    GameObject.Game = SimpleNamespace(
+        Settings = SimpleNamespace(SceneResolution = SceneResolution, GpuSprites = False),
+        PygameScene = SimpleNamespace(PixelOffset = Vec2([0, 0])),
+        DeltaTime = DeltaTime,
+    )
+
+def Vec2Arithmetic(Arguments):
+    # A hundred of the small operations the game does every frame, each one crosses into the extension
+    A = Vec2([3.0, 4.0])
+    B = Vec2([-1.5, 2.5])
+
+    def Step():
+        for Index in range(100):
+            (A + B) * 0.5 - B / 2.0
+    return Step
+
+def Vec2ArrayArithmetic(Arguments):
+    # The same hundred operations as Vec2Arithmetic done as one call over a hundred vectors
+    A = Vec2Array(np.tile([3.0, 4.0], (100, 1)))
+    B = Vec2Array(np.tile([-1.5, 2.5], (100, 1)))
+    return lambda: (A + B) * 0.5 - B / 2.0
+
+def BoidUpdate(NumberOfFish, Arguments):
+    Boids = [Boid(BoundsMin, BoundsMax, BoundsMargin) for Index in range(NumberOfFish)]
+    Grid = SpatialGrid()
+
+    def Step():
+        Grid.Build(Boids)
+        for FlockBoid in Boids:
+            FlockBoid.Update(Grid, DeltaTime, False, MousePosition, MouseRadius)
+    return Step
+
+def CreateChain(NumberPoints):
+    return VerletChain(
+        Position = Vec2([320, 720]),
+        NumberPoints = NumberPoints,
+        DesiredDistancePoints = 25,
+        NumberDisplayPointsPerSegment = 2,
+    )
+
+def VerletChainUpdate(NumberPoints, Arguments):
+    # Clicking on the chain keeps it moving so the solver never gets to skip work
+    Chain = CreateChain(NumberPoints)
+    return lambda: Chain.Update(DeltaTime, True, Vec2([320, 720 - NumberPoints * 12.5]), MouseRadius)
+
+def VerletChainDisplayPoints(NumberPoints, Arguments):
+    Chain = CreateChain(NumberPoints)
+    Chain.Update(DeltaTime, False, MousePosition, MouseRadius)
+    return Chain.CalculateDisplayPoints
+
+def TerrainRenderChunk(Arguments):
+    from ..Simulations.TerrainSimulation import TerrainSimulation
+
+    CreateGame()
+    OceanFloor = TerrainSimulation(
+        Position = SceneResolution * Vec2([-0.5, 2.0]),
+        Resolution = Vec2([SceneResolution.x * 2, 50]),
+        StepSize = 0.1,
+        NumberOfGrassBlades = 200,
+        ChunkWidth = 256,
+        CacheBudget = 0,
+    )
+    return lambda: OceanFloor.RenderChunk(0)
+
+def BoatWaveSample(Arguments):
+    # The table update every frame and the boat reading its sample points from it
+    from ..Simulations.WaveSimulation import WaveSimulation
+
+    CreateGame()
+    Waves = WaveSimulation(SamplesPerPixel = 1, TableMargin = 0.25)
+    WavePointsX = np.linspace(260, 380, 5) / SceneResolution.x
+
+    def Step():
+        Waves.Update()
+        Waves.SampleWaves(WavePointsX)
+    return Step
+
+def RotationCacheBuild(Arguments):
+    # Every fish rotation made from an empty cache, what the prewarm thread does at startup
+    import pygame
+    from ..Handlers.RotationCacheHandler import RotationCacheHandler
+
+    CreateGame()
+    FishImage = pygame.image.load(os.path.join(os.getcwd(), "Data/Images/Fish.png")).convert_alpha()
+
+    def Step():
+        Rotations = RotationCacheHandler(CacheBudget = 64 * 1024 * 1024, PrewarmRotations = False)
+        Rotations.RegisterSprite("Fish", FishImage, AngleStep = 1)
+        for Angle in range(-90, 91):
+            Rotations.GetRotation("Fish", Angle)
+    return Step
+
+def CompositePass(Arguments):
+    # The scene shader with baked noise at the default scene resolution, waiting for it to finish
+    # since software drivers don't report useful timer queries
+    import moderngl as mgl
+    from array import array
+    from ..NoiseTextures import NoiseTextures
+
+    Context = mgl.create_standalone_context(backend = Arguments.Backend) if Arguments.Backend else mgl.create_standalone_context()
+    QuadBuffer = Context.buffer(data=array("f", [
+        -1.0, 1.0, 0.0, 1.0,
+        1.0, 1.0, 1.0, 1.0,
+        -1.0, -1.0, 0.0, 0.0,
+        1.0, -1.0, 1.0, 0.0
+    ]))
+
+    SceneProgram, SceneRenderObject = CreateSceneProgram(Context, QuadBuffer, True)
+    Noise = NoiseTextures(Context, QuadBuffer)
+    LayerTexture, WaveTexture = CreateSceneInputs(Context)
+    BindSceneInputs(SceneProgram, LayerTexture, WaveTexture)
+    Noise.Use(SceneProgram, 5, 6)
+
+    Resolution = (int(SceneResolution.x), int(SceneResolution.y))
+    SceneFrameBuffer = Context.simple_framebuffer(Resolution)
+    SceneFrameBuffer.use()
+    Context.viewport = (0, 0, *Resolution)
+    SceneProgram["SceneResolution"] = Resolution
+    SceneProgram["Time"] = 1.0
+
+    def Step():
+        SceneRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+        Context.finish()
+    return Step
+
+Cases = {
+    "Vec2Arithmetic": Vec2Arithmetic,
+    "Vec2ArrayArithmetic": Vec2ArrayArithmetic,
+    **{f"BoidUpdate{NumberOfFish}": partial(BoidUpdate, NumberOfFish) for NumberOfFish in [25, 250, 2500]},
+    **{f"VerletChainUpdate{NumberPoints}": partial(VerletChainUpdate, NumberPoints) for NumberPoints in [5, 20, 50]},
+    **{f"VerletChainDisplayPoints{NumberPoints}": partial(VerletChainDisplayPoints, NumberPoints) for NumberPoints in [5, 20, 50]},
+    "TerrainRenderChunk": TerrainRenderChunk,
+    "BoatWaveSample": BoatWaveSample,
+    "RotationCacheBuild": RotationCacheBuild,
+    "CompositePass": CompositePass,
+}
+
+def CalibrateCalls(Step, MinimumTime):
+    # Calls per repetition doubled until a repetition is long enough for the timer to be accurate
+    Calls = 1
+    while True:
+        StartTime = time.perf_counter()
+        for Call in range(Calls):
+            Step()
+        if time.perf_counter() - StartTime >= MinimumTime:
+            return Calls
+        Calls *= 2
+
+def MeasureCase(Step, Arguments):
+    # Warmup fills caches and lets lazily built state settle before anything is timed
+    WarmupEndTime = time.perf_counter() + Arguments.WarmupTime
+    while time.perf_counter() < WarmupEndTime:
+        Step()
+
+    Calls = CalibrateCalls(Step, Arguments.MinimumTime)
+
+    # Microseconds per call for every repetition
+    Times = []
+    for Repetition in range(Arguments.Repetitions):
+        StartTime = time.perf_counter()
+        for Call in range(Calls):
+            Step()
+        Times.append((time.perf_counter() - StartTime) / Calls * 1e6)
+
+    Times = np.array(Times)
+    return {
+        "Calls": Calls,
+        "Repetitions": Arguments.Repetitions,
+        "Mean": round(float(Times.mean()), 3),
+        "Median": round(float(np.median(Times)), 3),
+        "Stdev": round(float(Times.std()), 3),
+        "Min": round(float(Times.min()), 3),
+        "Max": round(float(Times.max()), 3),
+        "P90": round(float(np.percentile(Times, 90)), 3),
+    }
+
+def RunCases(Arguments):
+    # Case names or prefixes, every case when none are given
+    Names = [Name for Name in Cases if not Arguments.Cases or any(Name.startswith(Prefix) for Prefix in Arguments.Cases)]
+
+    Results = {
+        "Machine": {
+            "Platform": platform.platform(),
+            "Processor": platform.processor(),
+            "Cores": os.cpu_count(),
+            "Python": platform.python_version(),
+            "Simulations": SimulationsBackend,
+        },
+        "Unit": "microseconds per call",
+        "Cases": {},
+    }
+
+    print(f"{'Case':<28} {'Median us':>12} {'Stdev us':>10} {'Calls':>7}")
+    for Name in Names:
+        Results["Cases"][Name] = Statistics = MeasureCase(Cases[Name](Arguments), Arguments)
+        print(f"{Name:<28} {Statistics['Median']:12.3f} {Statistics['Stdev']:10.3f} {Statistics['Calls']:7}")
+
+    if Arguments.Output:
+        with open(Arguments.Output, "w") as File:
+            json.dump(Results, File, indent = 4)
+
+def CompareResults(Arguments):
+    with open(Arguments.Baseline) as File:
+        Baseline = json.load(File)["Cases"]
+    with open(Arguments.Results) as File:
+        Results = json.load(File)["Cases"]
+
+    # Medians are compared, a case is only flagged when its fastest repetition moved past the
+    # threshold as well, so a run slowed down by something else on the machine isn't reported
+    Regressions = 0
+    print(f"{'Case':<28} {'Baseline us':>12} {'Current us':>12} {'Change':>8}")
+    for Name in Results:
+        if Name not in Baseline:
+            print(f"{Name:<28} {'-':>12} {Results[Name]['Median']:12.3f} {'new':>8}")
+            continue
+
+        BaselineTime = Baseline[Name]["Median"]
+        CurrentTime = Results[Name]["Median"]
+        Change = CurrentTime / BaselineTime - 1
+        MinimumChange = Results[Name]["Min"] / Baseline[Name]["Min"] - 1
+
+        Flag = ""
+        if Change > Arguments.Threshold and MinimumChange > Arguments.Threshold:
+            Flag = "REGRESSION"
+            Regressions += 1
+        elif Change < -Arguments.Threshold and MinimumChange < -Arguments.Threshold:
+            Flag = "improved"
+
+        print(f"{Name:<28} {BaselineTime:12.3f} {CurrentTime:12.3f} {Change * 100:+7.1f}% {Flag}")
+
+    # A non zero exit lets scripts stop on a regression
+    sys.exit(1 if Regressions else 0)
+
+def Main():
+    Parser = argparse.ArgumentParser(description = "Time the hot paths and compare the results against a baseline")
+    Commands = Parser.add_subparsers(dest = "Command", required = True)
+
+    RunParser = Commands.add_parser("run", help = "Measure the cases and optionally save them as JSON")
+    RunParser.add_argument("--Cases", nargs = "+", default = None, help = "Case names or name prefixes, all cases when left out")
+    RunParser.add_argument("--Repetitions", type = int, default = 20)
+    RunParser.add_argument("--WarmupTime", type = float, default = 0.2, help = "Seconds each case runs before it is timed")
+    RunParser.add_argument("--MinimumTime", type = float, default = 0.02, help = "Shortest repetition in seconds")
+    RunParser.add_argument("--Backend", default = None, help = "Standalone context backend, egl on headless Linux")
+    RunParser.add_argument("--Output", default = None)
+    RunParser.add_argument("--List", action = "store_true", help = "Print the case names and exit")
+
+    CompareParser = Commands.add_parser("compare", help = "Flag cases that got slower than the baseline")
+    CompareParser.add_argument("Baseline")
+    CompareParser.add_argument("Results")
+    CompareParser.add_argument("--Threshold", type = float, default = 0.1, help = "Fraction a median may grow before it is a regression")
+
+    Arguments = Parser.parse_args()
+
+    if Arguments.Command == "compare":
+        CompareResults(Arguments)
+    elif Arguments.List:
+        print("\n".join(Cases))
+    else:
+        RunCases(Arguments)
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,31 @@
+import os, sys
+
+# Picks the Simulations backend imported as Scripts.CppBuild.Simulations. The compiled extension is
+# used when it loads, otherwise the numpy port in Scripts/NumpySource takes its place. Set
+# FORBIDDEN_SIMULATIONS to "native" or "numpy" to force either one.
+SimulationsBackend = os.environ.get("FORBIDDEN_SIMULATIONS", "auto").lower()
+
+if SimulationsBackend not in ("auto", "native", "numpy"):
+    raise ValueError(f"FORBIDDEN_SIMULATIONS must be auto, native or numpy, not {SimulationsBackend!r}")
+
+# Everything the game imports from the module. An extension built from older sources still loads
+# but is missing some of these, it is treated like one that doesn't load at all.
+RequiredSymbols = ["Vec2", "Vec2Array", "Boid", "SpatialGrid", "VerletChain", "VerletWorld", "Flock"]
+
+if SimulationsBackend != "numpy":
+    try:
+        from . import Simulations
+        MissingSymbols = [Name for Name in RequiredSymbols if not hasattr(Simulations, Name)]
+        if not hasattr(Simulations.Vec2, "ToTuple"):
+            MissingSymbols.append("Vec2.ToTuple")
+        if MissingSymbols:
+            raise ImportError(f"The compiled Simulations extension is out of date, it has no {', '.join(MissingSymbols)}. Rebuild it with Scripts/CppSource/Setup.py.")
+        SimulationsBackend = "native"
+    except ImportError:
+        if SimulationsBackend == "native":
+            raise
+        SimulationsBackend = "numpy"
+
+if SimulationsBackend == "numpy":
+    from ..NumpySource import Simulations
+    sys.modules[__name__ + ".Simulations"] = Simulations
@@ -1,13 +1,70 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/operators.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 
 #include "VectorMath.h"
 #include "VerletChain.h"
+#include "VerletWorld.h"
 #include "Boid.h"
+#include "SpatialGrid.h"
+#include "Flock.h"
 
 namespace Python = pybind11;
 
+// Read only (NumberBoids, 2) array of a Vec2 member across the contiguous boids of a flock. Between
+// steps it is a zero copy view of the current block, which WaitUpdate swaps out so it has to be
+// fetched again after every one. While a step is in flight it is a copy, the block it would view is
+// the one the next step writes from the worker threads once this one is waited on.
+static Python::array_t<double> FlockMemberView(Python::object FlockObject, Vec2 Boid::* Member) {
+    Flock& Boids = FlockObject.cast<Flock&>();
+
+    // Without a base object the array copies the data instead of viewing it
+    Python::array_t<double> MemberArray(
+        {static_cast<Python::ssize_t>(Boids.NumberBoids), static_cast<Python::ssize_t>(2)},
+        {static_cast<Python::ssize_t>(sizeof(Boid)), static_cast<Python::ssize_t>(sizeof(double))},
+        Boids.Boids.empty() ? nullptr : &(Boids.Boids[0].*Member).x,
+        Boids.UpdatePending ? Python::handle() : FlockObject
+    );
+
+    // Writes would race with the worker threads, the flock only changes through its steps
+    MemberArray.attr("flags").attr("writeable") = false;
+    return MemberArray;
+}
+
+// None picks a new seed every time, like leaving the seed out on the C++ side
+static unsigned int SeedOrRandom(Python::object Seed) {
+    return Seed.is_none() ? std::random_device{}() : Seed.cast<unsigned int>();
+}
+
+// Zero copy view of a flat buffer owned by a python object
+template <typename ValueType>
+static Python::array_t<ValueType> BufferView(Python::object Owner, std::vector<ValueType>& Buffer) {
+    std::vector<Python::ssize_t> Shape = {static_cast<Python::ssize_t>(Buffer.size())};
+    std::vector<Python::ssize_t> Strides = {static_cast<Python::ssize_t>(sizeof(ValueType))};
+    return Python::array_t<ValueType>(Shape, Strides, Buffer.data(), Owner);
+}
+
+static Python::array_t<double> Vec2BufferView(Python::object Owner, std::vector<Vec2>& Buffer) {
+    return Python::array_t<double>(
+        {static_cast<Python::ssize_t>(Buffer.size()), static_cast<Python::ssize_t>(2)},
+        {static_cast<Python::ssize_t>(sizeof(Vec2)), static_cast<Python::ssize_t>(sizeof(double))},
+        Buffer.empty() ? nullptr : &Buffer[0].x,
+        Owner
+    );
+}
+
+// Vec2Array buffers are read as (N, 2) doubles, which only works while a Vec2 is nothing but x and y
+static_assert(sizeof(Vec2) == 2 * sizeof(double), "Vec2 must be two packed doubles");
+
+// Python style index, negative values count from the end
+static size_t Vec2ArrayIndex(const Vec2Array& Array, Python::ssize_t Index) {
+    Python::ssize_t Size = static_cast<Python::ssize_t>(Array.Size());
+    if (Index < 0) Index += Size;
+    if (Index < 0 || Index >= Size) throw Python::index_error("Vec2Array index out of range");
+    return static_cast<size_t>(Index);
+}
+
 PYBIND11_MODULE(Simulations, ModuleObject) {
     Python::class_<Vec2>(ModuleObject, "Vec2")
         // Constructors
@@ -77,6 +134,8 @@ PYBIND11_MODULE(Simulations, ModuleObject) {
         .def("Normalize", &Vec2::Normalize, "Return a normalized version of the vector")
         .def("DistanceTo", &Vec2::DistanceTo, "Return the distance to another vector")
         .def("Dot", &Vec2::Dot, "Return the dot product with another vector")
+        .def("ToTuple", [](const Vec2& Vector) { return Python::make_tuple(Vector.x, Vector.y); },
+             "Return the vector as an (x, y) tuple in one call, for pygame and moderngl arguments")
         
         // String representation
         .def("__repr__", [](const Vec2& Vector) {
@@ -86,6 +145,107 @@ PYBIND11_MODULE(Simulations, ModuleObject) {
             return "Vec2(" + std::to_string(Vector.x) + ", " + std::to_string(Vector.y) + ")";
         });
 
+    // Exposes the buffer protocol as an (N, 2) array of doubles, so numpy, memoryview and moderngl
+    // buffers read it without copying. The size is fixed once made, views stay valid as long as it lives.
+    Python::class_<Vec2Array>(ModuleObject, "Vec2Array", Python::buffer_protocol())
+        // Constructors
+        // A size, a list of Vec2 or anything numpy reads as (N, 2). Checked in one place instead of as
+        // overloads, trying each overload in turn costs more than filling a small array.
+        .def(Python::init<>())
+        .def(Python::init([](Python::object Values) {
+            if (Python::isinstance<Python::int_>(Values)) {
+                return Vec2Array(Values.cast<size_t>());
+            }
+            if (Python::isinstance<Python::list>(Values) && Python::len(Values) > 0 && Python::isinstance<Vec2>(Values.cast<Python::list>()[0])) {
+                return Vec2Array(Values.cast<std::vector<Vec2>>());
+            }
+
+            auto Pairs = Python::array_t<double, Python::array::c_style | Python::array::forcecast>::ensure(Values);
+            if (!Pairs || (Pairs.size() > 0 && (Pairs.ndim() != 2 || Pairs.shape(1) != 2))) {
+                throw Python::value_error("Vec2Array must be initialized with a size, a list of Vec2 or an (N, 2) array");
+            }
+
+            Vec2Array Array(static_cast<size_t>(Pairs.size() / 2));
+            if (!Array.Vectors.empty()) std::copy(Pairs.data(), Pairs.data() + Pairs.size(), &Array.Vectors[0].x);
+            return Array;
+        }), Python::arg("Values"))
+        .def_buffer([](Vec2Array& Array) {
+            return Python::buffer_info(
+                Array.Vectors.empty() ? nullptr : &Array.Vectors[0].x,
+                {static_cast<Python::ssize_t>(Array.Size()), static_cast<Python::ssize_t>(2)},
+                {static_cast<Python::ssize_t>(sizeof(Vec2)), static_cast<Python::ssize_t>(sizeof(double))}
+            );
+        })
+
+        // Indexing returns copies, write back with __setitem__
+        .def("__getitem__", [](const Vec2Array& Array, Python::ssize_t Index) { return Array[Vec2ArrayIndex(Array, Index)]; })
+        .def("__setitem__", [](Vec2Array& Array, Python::ssize_t Index, const Vec2& Vector) { Array[Vec2ArrayIndex(Array, Index)] = Vector; })
+        .def("__iter__", [](const Vec2Array& Array) {
+            return Python::make_iterator(Array.Vectors.begin(), Array.Vectors.end());
+        }, Python::keep_alive<0, 1>())
+        .def("__len__", &Vec2Array::Size)
+
+        // Arithmetic operators
+        .def(Python::self + Python::self) // Vec2Array + Vec2Array
+        .def(Python::self + Vec2())       // Vec2Array + Vec2
+        .def(Python::self + double())     // Vec2Array + scalar
+        .def(Vec2() + Python::self)       // Vec2 + Vec2Array
+        .def(double() + Python::self)     // scalar + Vec2Array
+        .def(Python::self - Python::self) // Vec2Array - Vec2Array
+        .def(Python::self - Vec2())       // Vec2Array - Vec2
+        .def(Python::self - double())     // Vec2Array - scalar
+        .def(Vec2() - Python::self)       // Vec2 - Vec2Array
+        .def(double() - Python::self)     // scalar - Vec2Array
+        .def(Python::self * Python::self) // Vec2Array * Vec2Array
+        .def(Python::self * Vec2())       // Vec2Array * Vec2
+        .def(Python::self * double())     // Vec2Array * scalar
+        .def(Vec2() * Python::self)       // Vec2 * Vec2Array
+        .def(double() * Python::self)     // scalar * Vec2Array
+        .def(Python::self / Python::self) // Vec2Array / Vec2Array
+        .def(Python::self / Vec2())       // Vec2Array / Vec2
+        .def(Python::self / double())     // Vec2Array / scalar
+        .def(Vec2() / Python::self)       // Vec2 / Vec2Array
+        .def(double() / Python::self)     // scalar / Vec2Array
+        .def(-Python::self)               // -Vec2Array
+
+        // In place operators
+        .def(Python::self += Python::self) // Vec2Array += Vec2Array
+        .def(Python::self += Vec2())       // Vec2Array += Vec2
+        .def(Python::self += double())     // Vec2Array += scalar
+        .def(Python::self -= Python::self) // Vec2Array -= Vec2Array
+        .def(Python::self -= Vec2())       // Vec2Array -= Vec2
+        .def(Python::self -= double())     // Vec2Array -= scalar
+        .def(Python::self *= Python::self) // Vec2Array *= Vec2Array
+        .def(Python::self *= Vec2())       // Vec2Array *= Vec2
+        .def(Python::self *= double())     // Vec2Array *= scalar
+        .def(Python::self /= Python::self) // Vec2Array /= Vec2Array
+        .def(Python::self /= Vec2())       // Vec2Array /= Vec2
+        .def(Python::self /= double())     // Vec2Array /= scalar
+
+        // Utility methods
+        .def("copy", &Vec2Array::copy, "Return a copy of the array")
+        .def("Clamp", &Vec2Array::Clamp,
+             "Clamp every vector between min and max vectors", Python::return_value_policy::reference_internal)
+        .def("Lengths", [](const Vec2Array& Array) {
+            std::vector<double> Lengths = Array.Lengths();
+            return Python::array_t<double>(Lengths.size(), Lengths.data());
+        }, "Return the length of every vector as a numpy array")
+        .def("Normalize", &Vec2Array::Normalize, "Return the array with every vector normalized")
+        .def("ToNumpy", [](Python::object Self) { return Vec2BufferView(Self, Self.cast<Vec2Array&>().Vectors); },
+             "Return an (N, 2) numpy view of the array, writes go straight into it")
+        .def("ToTuples", [](const Vec2Array& Array) {
+            Python::list Tuples(Array.Size());
+            for (size_t Index = 0; Index < Array.Size(); Index++) {
+                Tuples[Index] = Python::make_tuple(Array.Vectors[Index].x, Array.Vectors[Index].y);
+            }
+            return Tuples;
+        }, "Return a list of (x, y) tuples, what pygame's draw functions take as points")
+
+        // String representation
+        .def("__repr__", [](const Vec2Array& Array) {
+            return "Vec2Array(" + std::to_string(Array.Size()) + ")";
+        });
+
     Python::class_<VerletChain>(ModuleObject, "VerletChain")
         .def(Python::init<Vec2, int, float, int>(),
             Python::arg("Position"),
@@ -99,19 +259,111 @@ PYBIND11_MODULE(Simulations, ModuleObject) {
             Python::arg("MouseRadius"))
         .def("CalculateDisplayPoints", &VerletChain::CalculateDisplayPoints)
         .def_readwrite("SegmentWidths", &VerletChain::SegmentWidths)
-        .def_readwrite("SegmentColorMultipliers", &VerletChain::SegmentColorMultipliers);
+        .def_readwrite("SegmentColorMultipliers", &VerletChain::SegmentColorMultipliers)
+        .def_readwrite("ConstraintTolerance", &VerletChain::ConstraintTolerance)
+        .def_readwrite("MaximumIterations", &VerletChain::MaximumIterations)
+        .def_readonly("LastIterations", &VerletChain::LastIterations)
+        .def_readonly("LastError", &VerletChain::LastError);
+
+    // Array properties are views into the world's buffers, fetch them again after AddChain
+    Python::class_<VerletWorld>(ModuleObject, "VerletWorld")
+        .def(Python::init([](Python::object Seed) {
+                return new VerletWorld(SeedOrRandom(Seed));
+            }),
+            Python::arg("Seed") = Python::none())
+        .def("AddChain", &VerletWorld::AddChain,
+            Python::arg("Position"),
+            Python::arg("NumberPoints"),
+            Python::arg("DesiredDistancePoints"),
+            Python::arg("NumberDisplayPointsPerSegment"))
+        .def("Update", &VerletWorld::Update,
+            Python::arg("DeltaTime"),
+            Python::arg("MouseClicking"),
+            Python::arg("MousePosition"),
+            Python::arg("MouseRadius"),
+            Python::call_guard<Python::gil_scoped_release>())
+        .def("CalculateDisplayPoints", &VerletWorld::CalculateDisplayPoints,
+            Python::call_guard<Python::gil_scoped_release>())
+        .def("SetView", &VerletWorld::SetView,
+            Python::arg("ViewMin"),
+            Python::arg("ViewMax"))
+        .def("__len__", [](const VerletWorld& World) { return World.NumberChains; })
+        .def_readonly("NumberChains", &VerletWorld::NumberChains)
+        .def_readonly("NumberPoints", &VerletWorld::NumberPoints)
+        .def_readonly("NumberDisplayPoints", &VerletWorld::NumberDisplayPoints)
+        .def_readwrite("ConstraintTolerance", &VerletWorld::ConstraintTolerance)
+        .def_readwrite("MaximumIterations", &VerletWorld::MaximumIterations)
+        .def_readwrite("SleepSpeed", &VerletWorld::SleepSpeed)
+        .def_readwrite("SleepFrames", &VerletWorld::SleepFrames)
+        .def_property_readonly("ChainVisible", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().ChainVisible); })
+        .def_property_readonly("ChainSleeping", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().ChainSleeping); })
+        .def_property_readonly("ChainIterations", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().ChainIterations); })
+        .def_property_readonly("ChainErrors", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().ChainErrors); })
+        .def_property_readonly("DisplayPoints", [](Python::object Self) { return Vec2BufferView(Self, Self.cast<VerletWorld&>().DisplayPoints); })
+        .def_property_readonly("SegmentWidths", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().SegmentWidths); })
+        .def_property_readonly("SegmentColorMultipliers", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().SegmentColorMultipliers); })
+        .def_property_readonly("ChainDisplayStarts", [](Python::object Self) { return BufferView(Self, Self.cast<VerletWorld&>().ChainDisplayStarts); });
 
     Python::class_<Boid>(ModuleObject, "Boid")
         .def(Python::init<Vec2, Vec2, double>(),
             Python::arg("BoundsMin"),
             Python::arg("BoundsMax"),
             Python::arg("BoundsMargin"))
-        .def("Update", &Boid::Update,
+        .def("Update", Python::overload_cast<const std::vector<Boid*>&, double, bool, Vec2, float>(&Boid::Update),
             Python::arg("Boids"),
             Python::arg("DeltaTime"),
             Python::arg("MouseClicking"),
             Python::arg("MousePosition"),
             Python::arg("MouseRadius"))
+        .def("Update", Python::overload_cast<const SpatialGrid&, double, bool, Vec2, float>(&Boid::Update),
+            Python::arg("Grid"),
+            Python::arg("DeltaTime"),
+            Python::arg("MouseClicking"),
+            Python::arg("MousePosition"),
+            Python::arg("MouseRadius"))
         .def_readwrite("Position", &Boid::Position)
         .def_readwrite("Direction", &Boid::Direction);
+
+    Python::class_<SpatialGrid>(ModuleObject, "SpatialGrid")
+        .def(Python::init<>())
+        .def("Build", &SpatialGrid::Build,
+            Python::arg("Boids"))
+        .def_readonly("CellSize", &SpatialGrid::CellSize)
+        .def_readonly("NumberColumns", &SpatialGrid::NumberColumns)
+        .def_readonly("NumberRows", &SpatialGrid::NumberRows);
+
+    Python::class_<Flock>(ModuleObject, "Flock")
+        .def(Python::init([](int NumberBoids, Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin, int NumberThreads, Python::object Seed) {
+                return new Flock(NumberBoids, BoundsMin, BoundsMax, BoundsMargin, NumberThreads, SeedOrRandom(Seed));
+            }),
+            Python::arg("NumberBoids"),
+            Python::arg("BoundsMin"),
+            Python::arg("BoundsMax"),
+            Python::arg("BoundsMargin"),
+            Python::arg("NumberThreads") = 1,
+            Python::arg("Seed") = Python::none())
+        // The step never touches python objects so the GIL is released for all of it
+        .def("Update", &Flock::Update,
+            Python::arg("DeltaTime"),
+            Python::arg("MouseClicking"),
+            Python::arg("MousePosition"),
+            Python::arg("MouseRadius"),
+            Python::call_guard<Python::gil_scoped_release>())
+        .def("StartUpdate", &Flock::StartUpdate,
+            Python::arg("DeltaTime"),
+            Python::arg("MouseClicking"),
+            Python::arg("MousePosition"),
+            Python::arg("MouseRadius"),
+            Python::call_guard<Python::gil_scoped_release>())
+        .def("WaitUpdate", &Flock::WaitUpdate,
+            Python::call_guard<Python::gil_scoped_release>())
+        .def("SetView", &Flock::SetView,
+            Python::arg("ViewMin"),
+            Python::arg("ViewMax"))
+        .def_readwrite("OffscreenUpdateInterval", &Flock::OffscreenUpdateInterval)
+        .def("__len__", [](const Flock& Boids) { return Boids.NumberBoids; })
+        .def_property_readonly("NumberThreads", [](const Flock& Boids) { return Boids.Workers.NumberThreads; })
+        .def_property_readonly("UpdatePending", [](const Flock& Boids) { return Boids.UpdatePending; })
+        .def_property_readonly("Positions", [](Python::object Self) { return FlockMemberView(Self, &Boid::Position); })
+        .def_property_readonly("Directions", [](Python::object Self) { return FlockMemberView(Self, &Boid::Direction); });
 }
@@ -4,14 +4,18 @@ static std::random_device RandomDevice;
 static std::mt19937 Generator(RandomDevice());
 
 Boid::Boid(Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin)
+    : Boid(BoundsMin, BoundsMax, BoundsMargin, Generator)
+{}
+
+Boid::Boid(Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin, std::mt19937& RandomGenerator)
     : BoundsMin(BoundsMin), BoundsMax(BoundsMax), BoundsMargin(BoundsMargin)
 {
     std::uniform_real_distribution<> WidthDistribution(BoundsMin.x, BoundsMax.x);
     std::uniform_real_distribution<> HeightDistribution(BoundsMin.y, BoundsMax.y);
     std::uniform_real_distribution<> DirectionDistribution(-1.0, 1.0);
     
-    Position = Vec2(WidthDistribution(Generator), HeightDistribution(Generator));
-    Direction = Vec2(DirectionDistribution(Generator), DirectionDistribution(Generator)).Normalize();
+    Position = Vec2(WidthDistribution(RandomGenerator), HeightDistribution(RandomGenerator));
+    Direction = Vec2(DirectionDistribution(RandomGenerator), DirectionDistribution(RandomGenerator)).Normalize();
     
     Speed = 175.0;
     
@@ -27,52 +31,34 @@ Boid::Boid(Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin)
     TurnFactorCollisions = 15.0;
 }
 
+double Boid::NeighbourRadius() const {
+    return std::max({AlignmentRadius, CohesionRadius, SeperationRadius});
+}
+
 Vec2 Boid::ApplyRules(const std::vector<Boid*>& Boids) {
-    Vec2 SeperationDirection(0, 0);
-    int SeperationCount = 0;
-    
-    Vec2 CohesionDirection(0, 0);
-    int CohesionCount = 0;
-    
-    Vec2 AlignmentDirection = Direction;
-    int AlignmentCount = 1;
+    BoidRuleSums RuleSums(*this);
     
     for (Boid* Boid : Boids) {
         if (Boid == this) {
             continue;
         }
         
-        double distance = Position.DistanceTo(Boid->Position);
-        
-        if (distance < SeperationRadius) {
-            SeperationDirection = SeperationDirection + (Boid->Position - Position).Normalize();
-            SeperationCount++;
-        }
-        
-        if (distance < CohesionRadius) {
-            CohesionDirection = CohesionDirection + Boid->Position;
-            CohesionCount++;
-        }
-        
-        if (distance < AlignmentRadius) {
-            AlignmentDirection = AlignmentDirection + Boid->Direction;
-            AlignmentCount++;
-        }
+        RuleSums.Accumulate(*Boid);
     }
     
-    if (SeperationCount > 0) {
-        SeperationDirection = (SeperationDirection / static_cast<double>(SeperationCount)).Normalize() * (-SeperationFactor);
-    }
-    
-    if (CohesionCount > 0) {
-        CohesionDirection = ((CohesionDirection / static_cast<double>(CohesionCount)) - Position).Normalize() * CohesionFactor;
-    }
+    return RuleSums.Resolve();
+}
+
+Vec2 Boid::ApplyRules(const SpatialGrid& Grid) const {
+    BoidRuleSums RuleSums(*this);
     
-    if (AlignmentCount > 0) {
-        AlignmentDirection = (AlignmentDirection / static_cast<double>(AlignmentCount)).Normalize() * AlignmentFactor;
-    }
+    Grid.ForEachNeighbour(Position, [&](const Boid* Neighbour) {
+        if (Neighbour != this) {
+            RuleSums.Accumulate(*Neighbour);
+        }
+    });
     
-    return (AlignmentDirection + CohesionDirection + SeperationDirection).Normalize();
+    return RuleSums.Resolve();
 }
 
 Vec2 Boid::RayCircleIntersection(bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
@@ -145,7 +131,15 @@ Vec2 Boid::ApplyCollisions(bool MouseClicking, Vec2 MousePosition, float MouseRa
 }
 
 void Boid::Update(const std::vector<Boid*>& Boids, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
-    Vec2 DesiredDirectionRules = ApplyRules(Boids) * TurnFactorRules;
+    Steer(ApplyRules(Boids), DeltaTime, MouseClicking, MousePosition, MouseRadius);
+}
+
+void Boid::Update(const SpatialGrid& Grid, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    Steer(ApplyRules(Grid), DeltaTime, MouseClicking, MousePosition, MouseRadius);
+}
+
+void Boid::Steer(Vec2 RulesDirection, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    Vec2 DesiredDirectionRules = RulesDirection * TurnFactorRules;
     Vec2 DesiredDirectionCollisions = ApplyCollisions(MouseClicking, MousePosition, MouseRadius) * TurnFactorCollisions;
     
     Vec2 DesiredDirection = DesiredDirectionCollisions.Length() > 0 
@@ -157,3 +151,61 @@ void Boid::Update(const std::vector<Boid*>& Boids, double DeltaTime, bool MouseC
     
     Position = Position + Direction * Speed * DeltaTime;
 }
+
+//////////////////////////////
+//      Boid Rule Sums      //
+//////////////////////////////
+
+BoidRuleSums::BoidRuleSums(const Boid& Owner) :
+    Owner{Owner},
+    SeperationRadiusSquared{Owner.SeperationRadius * Owner.SeperationRadius},
+    CohesionRadiusSquared{Owner.CohesionRadius * Owner.CohesionRadius},
+    AlignmentRadiusSquared{Owner.AlignmentRadius * Owner.AlignmentRadius},
+    SeperationDirection{0, 0},
+    SeperationCount{0},
+    CohesionDirection{0, 0},
+    CohesionCount{0},
+    AlignmentDirection{Owner.Direction},
+    AlignmentCount{1}
+{}
+
+void BoidRuleSums::Accumulate(const Boid& Neighbour) {
+    // Squared distances avoid a square root for every boid that ends up out of range
+    Vec2 PositionDifference = Neighbour.Position - Owner.Position;
+    double DistanceSquared = PositionDifference.Dot(PositionDifference);
+    
+    if (DistanceSquared < SeperationRadiusSquared) {
+        SeperationDirection += PositionDifference.Normalize();
+        SeperationCount++;
+    }
+    
+    if (DistanceSquared < CohesionRadiusSquared) {
+        CohesionDirection += Neighbour.Position;
+        CohesionCount++;
+    }
+    
+    if (DistanceSquared < AlignmentRadiusSquared) {
+        AlignmentDirection += Neighbour.Direction;
+        AlignmentCount++;
+    }
+}
+
+Vec2 BoidRuleSums::Resolve() const {
+    Vec2 Seperation(0, 0);
+    Vec2 Cohesion(0, 0);
+    Vec2 Alignment = AlignmentDirection;
+    
+    if (SeperationCount > 0) {
+        Seperation = (SeperationDirection / static_cast<double>(SeperationCount)).Normalize() * (-Owner.SeperationFactor);
+    }
+    
+    if (CohesionCount > 0) {
+        Cohesion = ((CohesionDirection / static_cast<double>(CohesionCount)) - Owner.Position).Normalize() * Owner.CohesionFactor;
+    }
+    
+    if (AlignmentCount > 0) {
+        Alignment = (AlignmentDirection / static_cast<double>(AlignmentCount)).Normalize() * Owner.AlignmentFactor;
+    }
+    
+    return (Alignment + Cohesion + Seperation).Normalize();
+}
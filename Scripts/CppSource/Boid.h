@@ -1,6 +1,7 @@
 #pragma once
 
 #include "VectorMath.h"
+#include "SpatialGrid.h"
 #include <vector>
 #include <random>
 #include <cmath>
@@ -29,9 +30,38 @@ public:
     double TurnFactorCollisions;
 
     Boid(Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin);
+    Boid(Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin, std::mt19937& RandomGenerator);
     
+    double NeighbourRadius() const;
     Vec2 ApplyRules(const std::vector<Boid*>& Boids);
+    Vec2 ApplyRules(const SpatialGrid& Grid) const;
     Vec2 ApplyCollisions(bool MouseClicking, Vec2 MousePosition, float MouseRadius);
     Vec2 RayCircleIntersection(bool MouseClicking, Vec2 MousePosition, float MouseRadius);
     void Update(const std::vector<Boid*>& Boids, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+    void Update(const SpatialGrid& Grid, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+    void Steer(Vec2 RulesDirection, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+};
+
+// Running sums of the three flocking rules, shared by the brute force and grid neighbour loops
+class BoidRuleSums {
+public:
+    const Boid& Owner;
+
+    double SeperationRadiusSquared;
+    double CohesionRadiusSquared;
+    double AlignmentRadiusSquared;
+
+    Vec2 SeperationDirection;
+    int SeperationCount;
+
+    Vec2 CohesionDirection;
+    int CohesionCount;
+
+    Vec2 AlignmentDirection;
+    int AlignmentCount;
+
+    BoidRuleSums(const Boid& Owner);
+
+    void Accumulate(const Boid& Neighbour);
+    Vec2 Resolve() const;
 };
\ No newline at end of file
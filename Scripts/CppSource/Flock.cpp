@@ -0,0 +1,86 @@
+#include "Flock.h"
+
+// Fewer boids than this per thread is not worth waking another worker for
+static const int MinimumBoidsPerThread = 64;
+
+Flock::Flock(int NumberBoids, Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin, int NumberThreads, unsigned int Seed) :
+    NumberBoids{NumberBoids},
+    Workers{NumberThreads},
+    UpdatePending{false},
+    ViewMin{-std::numeric_limits<double>::infinity(), -std::numeric_limits<double>::infinity()},
+    ViewMax{std::numeric_limits<double>::infinity(), std::numeric_limits<double>::infinity()},
+    OffscreenUpdateInterval{1},
+    StepIndex{0}
+{
+    std::mt19937 Generator(Seed);
+
+    Boids.reserve(NumberBoids);
+    for (int Index = 0; Index < NumberBoids; ++Index) {
+        Boids.emplace_back(BoundsMin, BoundsMax, BoundsMargin, Generator);
+    }
+
+    NextBoids = Boids;
+    BoidPointers.resize(NumberBoids);
+}
+
+Flock::~Flock() {
+    Workers.Wait();
+}
+
+void Flock::SetView(Vec2 ViewMin, Vec2 ViewMax) {
+    this->ViewMin = ViewMin;
+    this->ViewMax = ViewMax;
+}
+
+bool Flock::InView(const Vec2& Position) const {
+    return Position.x >= ViewMin.x && Position.x <= ViewMax.x && Position.y >= ViewMin.y && Position.y <= ViewMax.y;
+}
+
+void Flock::Update(double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    StartUpdate(DeltaTime, MouseClicking, MousePosition, MouseRadius);
+    WaitUpdate();
+}
+
+void Flock::StartUpdate(double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    WaitUpdate();
+
+    // Grid points at the current block which stays read only until the step is finished
+    for (int Index = 0; Index < NumberBoids; ++Index) {
+        BoidPointers[Index] = &Boids[Index];
+    }
+    Grid.Build(BoidPointers);
+
+    UpdatePending = true;
+    StepIndex++;
+    Workers.Dispatch(NumberBoids, MinimumBoidsPerThread, [=](int RangeStart, int RangeEnd) {
+        UpdateRange(RangeStart, RangeEnd, DeltaTime, MouseClicking, MousePosition, MouseRadius);
+    });
+}
+
+void Flock::WaitUpdate() {
+    if (!UpdatePending) {
+        return;
+    }
+
+    Workers.Wait();
+
+    // Any view of the old current block now sees the state from before the step
+    Boids.swap(NextBoids);
+    UpdatePending = false;
+}
+
+void Flock::UpdateRange(int RangeStart, int RangeEnd, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    for (int Index = RangeStart; Index < RangeEnd; ++Index) {
+        NextBoids[Index] = Boids[Index];
+
+        int UpdateInterval = InView(Boids[Index].Position) ? 1 : std::max(OffscreenUpdateInterval, 1);
+        if ((StepIndex + Index) % UpdateInterval != 0) {
+            continue;
+        }
+
+        // Every boid only reads the current block so the result never depends on
+        // which thread runs it or in what order
+        Vec2 RulesDirection = Boids[Index].ApplyRules(Grid);
+        NextBoids[Index].Steer(RulesDirection, DeltaTime * UpdateInterval, MouseClicking, MousePosition, MouseRadius);
+    }
+}
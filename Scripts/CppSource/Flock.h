@@ -0,0 +1,45 @@
+#pragma once
+
+#include "VectorMath.h"
+#include "SpatialGrid.h"
+#include "WorkerPool.h"
+#include "Boid.h"
+#include <vector>
+#include <random>
+#include <limits>
+
+class Flock {
+public:
+    int NumberBoids;
+
+    // Boids live in one contiguous block so their state can be viewed as strided arrays,
+    // a step reads the current block and writes the next one then the two are swapped.
+    // Views point at whichever block was current when they were made, so they have to be
+    // fetched again after every WaitUpdate, the bindings hand out copies during a step
+    std::vector<Boid> Boids;
+    std::vector<Boid> NextBoids;
+    std::vector<Boid*> BoidPointers;
+    SpatialGrid Grid;
+    WorkerPool Workers;
+
+    bool UpdatePending;
+
+    // Boids outside the view only step every OffscreenUpdateInterval updates with a scaled
+    // delta time, staggered by index so the skipped work is spread over the frames
+    Vec2 ViewMin;
+    Vec2 ViewMax;
+    int OffscreenUpdateInterval;
+    long long StepIndex;
+
+    // Spawn positions and directions come from Seed, so the same seed always makes the same flock
+    Flock(int NumberBoids, Vec2 BoundsMin, Vec2 BoundsMax, double BoundsMargin, int NumberThreads = 1, unsigned int Seed = std::random_device{}());
+    ~Flock();
+
+    void SetView(Vec2 ViewMin, Vec2 ViewMax);
+    bool InView(const Vec2& Position) const;
+
+    void Update(double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+    void StartUpdate(double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+    void WaitUpdate();
+    void UpdateRange(int RangeStart, int RangeEnd, double DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+};
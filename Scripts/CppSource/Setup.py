@@ -36,7 +36,11 @@ setup(
                 "Bindings.cpp",
                 "VectorMath.cpp",
                 "VerletChain.cpp",
+                "VerletWorld.cpp",
                 "Boid.cpp",
+                "SpatialGrid.cpp",
+                "Flock.cpp",
+                "WorkerPool.cpp",
             ],
         )
     ],
@@ -0,0 +1,76 @@
+#include "SpatialGrid.h"
+#include "Boid.h"
+
+// Stops a single runaway boid from blowing up the number of cells
+static const int MaximumCellsPerAxis = 256;
+
+SpatialGrid::SpatialGrid() :
+    CellSize{1.0},
+    GridOrigin{0.0, 0.0},
+    NumberColumns{0},
+    NumberRows{0}
+{}
+
+int SpatialGrid::ColumnIndex(double PositionX) const {
+    return static_cast<int>(std::floor((PositionX - GridOrigin.x) / CellSize));
+}
+
+int SpatialGrid::RowIndex(double PositionY) const {
+    return static_cast<int>(std::floor((PositionY - GridOrigin.y) / CellSize));
+}
+
+void SpatialGrid::Build(const std::vector<Boid*>& Boids) {
+    CellBoids.clear();
+    CellStarts.assign(1, 0);
+    NumberColumns = 0;
+    NumberRows = 0;
+
+    if (Boids.empty()) {
+        return;
+    }
+
+    // Cells have to cover the largest rule radius
+    Vec2 BoundsMin = Boids[0]->Position;
+    Vec2 BoundsMax = Boids[0]->Position;
+    CellSize = 1.0;
+
+    for (Boid* Boid : Boids) {
+        BoundsMin.x = std::min(BoundsMin.x, Boid->Position.x);
+        BoundsMin.y = std::min(BoundsMin.y, Boid->Position.y);
+        BoundsMax.x = std::max(BoundsMax.x, Boid->Position.x);
+        BoundsMax.y = std::max(BoundsMax.y, Boid->Position.y);
+        CellSize = std::max(CellSize, Boid->NeighbourRadius());
+    }
+
+    Vec2 GridSize = BoundsMax - BoundsMin;
+    CellSize = std::max({CellSize, GridSize.x / MaximumCellsPerAxis, GridSize.y / MaximumCellsPerAxis});
+
+    GridOrigin = BoundsMin;
+    NumberColumns = static_cast<int>(GridSize.x / CellSize) + 1;
+    NumberRows = static_cast<int>(GridSize.y / CellSize) + 1;
+
+    // Counting sort of the boids into their cells
+    std::vector<int> BoidCells;
+    BoidCells.reserve(Boids.size());
+    CellStarts.assign(NumberColumns * NumberRows + 1, 0);
+
+    for (Boid* Boid : Boids) {
+        int Column = std::min(ColumnIndex(Boid->Position.x), NumberColumns - 1);
+        int Row = std::min(RowIndex(Boid->Position.y), NumberRows - 1);
+        int Cell = Row * NumberColumns + Column;
+
+        BoidCells.push_back(Cell);
+        CellStarts[Cell + 1]++;
+    }
+
+    for (size_t Cell = 1; Cell < CellStarts.size(); ++Cell) {
+        CellStarts[Cell] += CellStarts[Cell - 1];
+    }
+
+    std::vector<int> CellOffsets(CellStarts.begin(), CellStarts.end() - 1);
+    CellBoids.resize(Boids.size());
+
+    for (size_t Index = 0; Index < Boids.size(); ++Index) {
+        CellBoids[CellOffsets[BoidCells[Index]]++] = Boids[Index];
+    }
+}
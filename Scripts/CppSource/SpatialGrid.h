@@ -0,0 +1,58 @@
+#pragma once
+
+#include "VectorMath.h"
+#include <vector>
+#include <cmath>
+#include <algorithm>
+
+class Boid;
+
+class SpatialGrid {
+public:
+    double CellSize;
+    Vec2 GridOrigin;
+    int NumberColumns;
+    int NumberRows;
+
+    // Boids sorted by cell, CellStarts[Cell] to CellStarts[Cell + 1] is the range of a cell
+    std::vector<int> CellStarts;
+    std::vector<Boid*> CellBoids;
+
+    SpatialGrid();
+
+    void Build(const std::vector<Boid*>& Boids);
+    int ColumnIndex(double PositionX) const;
+    int RowIndex(double PositionY) const;
+
+    // Visits every boid in the 3x3 block of cells around the position, cells are at
+    // least as big as the largest rule radius so nothing in range can be missed
+    template <typename Visitor>
+    void ForEachNeighbour(const Vec2& Position, Visitor&& Visit) const {
+        if (CellBoids.empty()) {
+            return;
+        }
+
+        int Column = ColumnIndex(Position.x);
+        int Row = RowIndex(Position.y);
+
+        int FirstRow = std::max(Row - 1, 0);
+        int LastRow = std::min(Row + 1, NumberRows - 1);
+        int FirstColumn = std::max(Column - 1, 0);
+        int LastColumn = std::min(Column + 1, NumberColumns - 1);
+
+        // Positions more than a cell outside the grid have no cells around them to visit
+        if (FirstColumn > LastColumn || FirstRow > LastRow) {
+            return;
+        }
+
+        for (int CurrentRow = FirstRow; CurrentRow <= LastRow; ++CurrentRow) {
+            // Cells in a row are stored next to each other so the whole span is one range
+            int RangeStart = CellStarts[CurrentRow * NumberColumns + FirstColumn];
+            int RangeEnd = CellStarts[CurrentRow * NumberColumns + LastColumn + 1];
+
+            for (int Index = RangeStart; Index < RangeEnd; ++Index) {
+                Visit(CellBoids[Index]);
+            }
+        }
+    }
+};
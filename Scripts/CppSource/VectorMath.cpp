@@ -204,4 +204,217 @@ double Vec2::Dot(const Vec2& other) const {
 std::ostream& operator<<(std::ostream& os, const Vec2& vec) {
     os << "Vec2(" << vec.x << ", " << vec.y << ")";
     return os;
+}
+
+// Vec2Array
+Vec2Array::Vec2Array() {}
+
+Vec2Array::Vec2Array(size_t size) : Vectors(size) {}
+
+Vec2Array::Vec2Array(const std::vector<Vec2>& vectors) : Vectors(vectors) {}
+
+size_t Vec2Array::Size() const {
+    return Vectors.size();
+}
+
+Vec2& Vec2Array::operator[](size_t index) {
+    if (index >= Vectors.size()) throw std::out_of_range("Vec2Array index out of range");
+    return Vectors[index];
+}
+
+const Vec2& Vec2Array::operator[](size_t index) const {
+    if (index >= Vectors.size()) throw std::out_of_range("Vec2Array index out of range");
+    return Vectors[index];
+}
+
+// Every operator goes through these, each output vector is Operation(input vector)
+template <typename Operation>
+static Vec2Array Map(const Vec2Array& array, Operation operation) {
+    Vec2Array result(array.Size());
+    for (size_t index = 0; index < array.Size(); index++) {
+        result.Vectors[index] = operation(array.Vectors[index], index);
+    }
+    return result;
+}
+
+template <typename Operation>
+static Vec2Array& MapInPlace(Vec2Array& array, Operation operation) {
+    for (size_t index = 0; index < array.Size(); index++) {
+        array.Vectors[index] = operation(array.Vectors[index], index);
+    }
+    return array;
+}
+
+static void CheckSizes(const Vec2Array& array, const Vec2Array& other) {
+    if (array.Size() != other.Size()) {
+        throw std::invalid_argument("Vec2Array sizes don't match");
+    }
+}
+
+// Arithmetic operators
+Vec2Array Vec2Array::operator+(const Vec2Array& other) const {
+    CheckSizes(*this, other);
+    return Map(*this, [&](const Vec2& vec, size_t index) { return vec + other.Vectors[index]; });
+}
+
+Vec2Array Vec2Array::operator+(const Vec2& other) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec + other; });
+}
+
+Vec2Array Vec2Array::operator+(double scalar) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec + scalar; });
+}
+
+Vec2Array Vec2Array::operator-(const Vec2Array& other) const {
+    CheckSizes(*this, other);
+    return Map(*this, [&](const Vec2& vec, size_t index) { return vec - other.Vectors[index]; });
+}
+
+Vec2Array Vec2Array::operator-(const Vec2& other) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec - other; });
+}
+
+Vec2Array Vec2Array::operator-(double scalar) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec - scalar; });
+}
+
+Vec2Array Vec2Array::operator*(const Vec2Array& other) const {
+    CheckSizes(*this, other);
+    return Map(*this, [&](const Vec2& vec, size_t index) { return vec * other.Vectors[index]; });
+}
+
+Vec2Array Vec2Array::operator*(const Vec2& other) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec * other; });
+}
+
+Vec2Array Vec2Array::operator*(double scalar) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec * scalar; });
+}
+
+Vec2Array Vec2Array::operator/(const Vec2Array& other) const {
+    CheckSizes(*this, other);
+    return Map(*this, [&](const Vec2& vec, size_t index) { return vec / other.Vectors[index]; });
+}
+
+Vec2Array Vec2Array::operator/(const Vec2& other) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec / other; });
+}
+
+Vec2Array Vec2Array::operator/(double scalar) const {
+    return Map(*this, [&](const Vec2& vec, size_t) { return vec / scalar; });
+}
+
+// Unary operator
+Vec2Array Vec2Array::operator-() const {
+    return Map(*this, [](const Vec2& vec, size_t) { return -vec; });
+}
+
+// In place operators
+Vec2Array& Vec2Array::operator+=(const Vec2Array& other) {
+    CheckSizes(*this, other);
+    return MapInPlace(*this, [&](const Vec2& vec, size_t index) { return vec + other.Vectors[index]; });
+}
+
+Vec2Array& Vec2Array::operator+=(const Vec2& other) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec + other; });
+}
+
+Vec2Array& Vec2Array::operator+=(double scalar) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec + scalar; });
+}
+
+Vec2Array& Vec2Array::operator-=(const Vec2Array& other) {
+    CheckSizes(*this, other);
+    return MapInPlace(*this, [&](const Vec2& vec, size_t index) { return vec - other.Vectors[index]; });
+}
+
+Vec2Array& Vec2Array::operator-=(const Vec2& other) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec - other; });
+}
+
+Vec2Array& Vec2Array::operator-=(double scalar) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec - scalar; });
+}
+
+Vec2Array& Vec2Array::operator*=(const Vec2Array& other) {
+    CheckSizes(*this, other);
+    return MapInPlace(*this, [&](const Vec2& vec, size_t index) { return vec * other.Vectors[index]; });
+}
+
+Vec2Array& Vec2Array::operator*=(const Vec2& other) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec * other; });
+}
+
+Vec2Array& Vec2Array::operator*=(double scalar) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec * scalar; });
+}
+
+Vec2Array& Vec2Array::operator/=(const Vec2Array& other) {
+    CheckSizes(*this, other);
+    return MapInPlace(*this, [&](const Vec2& vec, size_t index) { return vec / other.Vectors[index]; });
+}
+
+Vec2Array& Vec2Array::operator/=(const Vec2& other) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec / other; });
+}
+
+Vec2Array& Vec2Array::operator/=(double scalar) {
+    return MapInPlace(*this, [&](const Vec2& vec, size_t) { return vec / scalar; });
+}
+
+// Friend operators for vector and scalar operations
+Vec2Array operator+(const Vec2& vec, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return vec + other; });
+}
+
+Vec2Array operator-(const Vec2& vec, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return vec - other; });
+}
+
+Vec2Array operator*(const Vec2& vec, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return vec * other; });
+}
+
+Vec2Array operator/(const Vec2& vec, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return vec / other; });
+}
+
+Vec2Array operator+(double scalar, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return scalar + other; });
+}
+
+Vec2Array operator-(double scalar, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return scalar - other; });
+}
+
+Vec2Array operator*(double scalar, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return scalar * other; });
+}
+
+Vec2Array operator/(double scalar, const Vec2Array& array) {
+    return Map(array, [&](const Vec2& other, size_t) { return scalar / other; });
+}
+
+// Utility methods
+Vec2Array Vec2Array::copy() const {
+    return Vec2Array(Vectors);
+}
+
+Vec2Array& Vec2Array::Clamp(const Vec2& minValue, const Vec2& maxValue) {
+    for (Vec2& vec : Vectors) {
+        vec.Clamp(minValue, maxValue);
+    }
+    return *this;
+}
+
+std::vector<double> Vec2Array::Lengths() const {
+    std::vector<double> lengths(Vectors.size());
+    for (size_t index = 0; index < Vectors.size(); index++) {
+        lengths[index] = Vectors[index].Length();
+    }
+    return lengths;
+}
+
+Vec2Array Vec2Array::Normalize() const {
+    return Map(*this, [](const Vec2& vec, size_t) { return vec.Normalize(); });
 }
\ No newline at end of file
@@ -67,4 +67,68 @@ public:
 
     // Stream output
     friend std::ostream& operator<<(std::ostream& os, const Vec2& vec);
+};
+
+// Many vectors stored back to back as x, y pairs, arithmetic runs over all of them in one call
+class Vec2Array {
+public:
+    std::vector<Vec2> Vectors;
+
+    // Constructors
+    Vec2Array();
+    Vec2Array(size_t size);
+    Vec2Array(const std::vector<Vec2>& vectors);
+
+    size_t Size() const;
+
+    // Indexing operators
+    Vec2& operator[](size_t index);
+    const Vec2& operator[](size_t index) const;
+
+    // Arithmetic operators, arrays combine element by element and must be the same size
+    Vec2Array operator+(const Vec2Array& other) const;
+    Vec2Array operator+(const Vec2& other) const;
+    Vec2Array operator+(double scalar) const;
+    Vec2Array operator-(const Vec2Array& other) const;
+    Vec2Array operator-(const Vec2& other) const;
+    Vec2Array operator-(double scalar) const;
+    Vec2Array operator*(const Vec2Array& other) const;
+    Vec2Array operator*(const Vec2& other) const;
+    Vec2Array operator*(double scalar) const;
+    Vec2Array operator/(const Vec2Array& other) const;
+    Vec2Array operator/(const Vec2& other) const;
+    Vec2Array operator/(double scalar) const;
+
+    // Unary operator
+    Vec2Array operator-() const;
+
+    // In place operators
+    Vec2Array& operator+=(const Vec2Array& other);
+    Vec2Array& operator+=(const Vec2& other);
+    Vec2Array& operator+=(double scalar);
+    Vec2Array& operator-=(const Vec2Array& other);
+    Vec2Array& operator-=(const Vec2& other);
+    Vec2Array& operator-=(double scalar);
+    Vec2Array& operator*=(const Vec2Array& other);
+    Vec2Array& operator*=(const Vec2& other);
+    Vec2Array& operator*=(double scalar);
+    Vec2Array& operator/=(const Vec2Array& other);
+    Vec2Array& operator/=(const Vec2& other);
+    Vec2Array& operator/=(double scalar);
+
+    // Friend operators for vector and scalar operations (Vec2 operator Vec2Array)
+    friend Vec2Array operator+(const Vec2& vec, const Vec2Array& array);
+    friend Vec2Array operator-(const Vec2& vec, const Vec2Array& array);
+    friend Vec2Array operator*(const Vec2& vec, const Vec2Array& array);
+    friend Vec2Array operator/(const Vec2& vec, const Vec2Array& array);
+    friend Vec2Array operator+(double scalar, const Vec2Array& array);
+    friend Vec2Array operator-(double scalar, const Vec2Array& array);
+    friend Vec2Array operator*(double scalar, const Vec2Array& array);
+    friend Vec2Array operator/(double scalar, const Vec2Array& array);
+
+    // Utility methods
+    Vec2Array copy() const;
+    Vec2Array& Clamp(const Vec2& minValue, const Vec2& maxValue);
+    std::vector<double> Lengths() const;
+    Vec2Array Normalize() const;
 };
\ No newline at end of file
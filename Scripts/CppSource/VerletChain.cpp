@@ -76,19 +76,9 @@ void VerletChain::Update(float DeltaTime, bool MouseClicking, Vec2 MousePosition
     }
     
     // Next do the chain constraints
-    for (int Iteration = 0; Iteration < round(NumberPoints * 50 * DeltaTime); ++Iteration) {
-        for (int Index = 0; Index < NumberPoints - 1; ++Index) {
-            VerletPoint& CurrentPoint = VerletPoints[Index];
-            VerletPoint& NextPoint = VerletPoints[Index + 1];
-            
-            Vec2 PositionDifference = CurrentPoint.CurrentPosition - NextPoint.CurrentPosition;
-            float DistancePointsError = DesiredDistancePoints - PositionDifference.Length();
-            Vec2 CorrectionVector = PositionDifference.Normalize() * DistancePointsError * 0.5f;
-            
-            CurrentPoint.ContrainPosition(CorrectionVector, MouseClicking, MousePosition, MouseRadius);
-            NextPoint.ContrainPosition(-CorrectionVector, MouseClicking, MousePosition, MouseRadius);
-        }
-    }
+    ChainSolveResult Result = SolveChainConstraints(VerletPoints.data(), NumberPoints, DesiredDistancePoints, DeltaTime, MouseClicking, MousePosition, MouseRadius, ConstraintTolerance, MaximumIterations);
+    LastIterations = Result.Iterations;
+    LastError = Result.MaximumError;
 }
 
 void VerletChain::InitializeKelpVisuals() {
@@ -117,33 +107,100 @@ void VerletChain::InitializeKelpVisuals() {
     }
 }
 
-Vec2 VerletChain::Lerp(const Vec2& StartPoint, const Vec2& EndPoint, float Interpolator) const {
+std::vector<Vec2> VerletChain::CalculateDisplayPoints() const {
+    std::vector<Vec2> DisplayPoints(NumberDisplayPoints);
+    CalculateChainDisplayPoints(VerletPoints.data(), NumberPoints, SegmentCurvePoints.data(), NumberDisplayPointsPerSegment, DisplayPoints.data());
+    return DisplayPoints;
+}
+
+//////////////////////////////
+//      Chain Helpers       //
+//////////////////////////////
+
+void ChainBounds(const VerletPoint* Points, int NumberPoints, Vec2& BoundsMin, Vec2& BoundsMax) {
+    BoundsMin = Points[0].CurrentPosition;
+    BoundsMax = Points[0].CurrentPosition;
+
+    for (int Index = 1; Index < NumberPoints; ++Index) {
+        BoundsMin.x = std::min(BoundsMin.x, Points[Index].CurrentPosition.x);
+        BoundsMin.y = std::min(BoundsMin.y, Points[Index].CurrentPosition.y);
+        BoundsMax.x = std::max(BoundsMax.x, Points[Index].CurrentPosition.x);
+        BoundsMax.y = std::max(BoundsMax.y, Points[Index].CurrentPosition.y);
+    }
+}
+
+bool BoundsNearMouse(Vec2 BoundsMin, Vec2 BoundsMax, float Padding, Vec2 MousePosition, float MouseRadius) {
+    // Closest point of the padded box to the mouse, inside the circle means they overlap
+    Vec2 ClosestPoint(
+        std::clamp(MousePosition.x, BoundsMin.x - Padding, BoundsMax.x + Padding),
+        std::clamp(MousePosition.y, BoundsMin.y - Padding, BoundsMax.y + Padding)
+    );
+    return MousePosition.DistanceTo(ClosestPoint) < MouseRadius;
+}
+
+ChainSolveResult SolveChainConstraints(VerletPoint* Points, int NumberPoints, float DesiredDistancePoints, float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius, float ConstraintTolerance, int MaximumIterations) {
+    // Points only move a fraction of a link while solving, so a box padded by one link
+    // length is enough to rule out the mouse for the whole solve
+    if (MouseClicking) {
+        Vec2 BoundsMin, BoundsMax;
+        ChainBounds(Points, NumberPoints, BoundsMin, BoundsMax);
+        MouseClicking = BoundsNearMouse(BoundsMin, BoundsMax, DesiredDistancePoints, MousePosition, MouseRadius);
+    }
+
+    ChainSolveResult Result{0, 0.0f};
+    int Iterations = std::min(static_cast<int>(round(NumberPoints * 50 * DeltaTime)), MaximumIterations);
+
+    for (int Iteration = 0; Iteration < Iterations; ++Iteration) {
+        Result.Iterations = Iteration + 1;
+        Result.MaximumError = 0.0f;
+
+        for (int Index = 0; Index < NumberPoints - 1; ++Index) {
+            VerletPoint& CurrentPoint = Points[Index];
+            VerletPoint& NextPoint = Points[Index + 1];
+            
+            Vec2 PositionDifference = CurrentPoint.CurrentPosition - NextPoint.CurrentPosition;
+            float DistancePointsError = DesiredDistancePoints - PositionDifference.Length();
+            Vec2 CorrectionVector = PositionDifference.Normalize() * DistancePointsError * 0.5f;
+            Result.MaximumError = std::max(Result.MaximumError, std::abs(DistancePointsError));
+            
+            CurrentPoint.ContrainPosition(CorrectionVector, MouseClicking, MousePosition, MouseRadius);
+            NextPoint.ContrainPosition(-CorrectionVector, MouseClicking, MousePosition, MouseRadius);
+        }
+
+        // Every link was already within tolerance going into this pass
+        if (Result.MaximumError < ConstraintTolerance) {
+            break;
+        }
+    }
+
+    return Result;
+}
+
+static Vec2 Lerp(const Vec2& StartPoint, const Vec2& EndPoint, float Interpolator) {
     return StartPoint + (EndPoint - StartPoint) * Interpolator;
 }
 
-Vec2 VerletChain::QuadraticBezier(const Vec2& StartPoint, const Vec2& CurvePoint, const Vec2& EndPoint, float Interpolator) const {
+static Vec2 QuadraticBezier(const Vec2& StartPoint, const Vec2& CurvePoint, const Vec2& EndPoint, float Interpolator) {
     Vec2 LerpStartToCurve = Lerp(StartPoint, CurvePoint, Interpolator);
     Vec2 LerpCurveToEnd = Lerp(CurvePoint, EndPoint, Interpolator);
     return Lerp(LerpStartToCurve, LerpCurveToEnd, Interpolator);
 }
 
-std::vector<Vec2> VerletChain::CalculateDisplayPoints() const {
-    std::vector<Vec2> DisplayPoints;
-    DisplayPoints.reserve(NumberDisplayPoints);
+void CalculateChainDisplayPoints(const VerletPoint* Points, int NumberPoints, const Vec2* CurvePoints, int NumberDisplayPointsPerSegment, Vec2* DisplayPoints) {
+    int DisplayIndex = 0;
     
     for (int Index = 0; Index < NumberPoints - 1; ++Index) {
-        const Vec2& CurrentPoint = VerletPoints[Index].CurrentPosition;
-        const Vec2& NextPoint = VerletPoints[Index + 1].CurrentPosition;
+        const Vec2& CurrentPoint = Points[Index].CurrentPosition;
+        const Vec2& NextPoint = Points[Index + 1].CurrentPosition;
         
-        DisplayPoints.push_back(CurrentPoint);
-        Vec2 CurvePoint = Lerp(CurrentPoint, NextPoint, 0.5f) + SegmentCurvePoints[Index];
+        DisplayPoints[DisplayIndex++] = CurrentPoint;
+        Vec2 CurvePoint = Lerp(CurrentPoint, NextPoint, 0.5f) + CurvePoints[Index];
         
         for (int Count = 0; Count < NumberDisplayPointsPerSegment; ++Count) {
             float Interpolator = static_cast<float>(Count + 1) / static_cast<float>(NumberDisplayPointsPerSegment + 1);
-            DisplayPoints.push_back(QuadraticBezier(CurrentPoint, CurvePoint, NextPoint, Interpolator));
+            DisplayPoints[DisplayIndex++] = QuadraticBezier(CurrentPoint, CurvePoint, NextPoint, Interpolator);
         }
     }
     
-    DisplayPoints.push_back(VerletPoints[NumberPoints - 1].CurrentPosition);
-    return DisplayPoints;
+    DisplayPoints[DisplayIndex] = Points[NumberPoints - 1].CurrentPosition;
 }
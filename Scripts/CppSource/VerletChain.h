@@ -4,6 +4,7 @@
 #include <vector>
 #include <cmath>
 #include <random>
+#include <algorithm>
 
 class VerletPoint {
 public:
@@ -22,6 +23,22 @@ public:
     void ContrainPosition(Vec2 CorrectionVector, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
 };
 
+// Solver defaults, chains stop iterating once every link is within the tolerance in pixels
+const float DefaultConstraintTolerance = 0.05f;
+const int DefaultMaximumIterations = 64;
+
+class ChainSolveResult {
+public:
+    int Iterations;
+    float MaximumError;
+};
+
+// Shared by VerletChain and VerletWorld, both work on a run of points belonging to one chain
+ChainSolveResult SolveChainConstraints(VerletPoint* Points, int NumberPoints, float DesiredDistancePoints, float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius, float ConstraintTolerance, int MaximumIterations);
+void ChainBounds(const VerletPoint* Points, int NumberPoints, Vec2& BoundsMin, Vec2& BoundsMax);
+bool BoundsNearMouse(Vec2 BoundsMin, Vec2 BoundsMax, float Padding, Vec2 MousePosition, float MouseRadius);
+void CalculateChainDisplayPoints(const VerletPoint* Points, int NumberPoints, const Vec2* CurvePoints, int NumberDisplayPointsPerSegment, Vec2* DisplayPoints);
+
 class VerletChain {
 public:
     int NumberDisplayPointsPerSegment;
@@ -29,6 +46,13 @@ public:
     int NumberPoints;
     float DesiredDistancePoints;
 
+    float ConstraintTolerance = DefaultConstraintTolerance;
+    int MaximumIterations = DefaultMaximumIterations;
+
+    // Solver counters from the last update
+    int LastIterations = 0;
+    float LastError = 0.0f;
+
     std::vector<Vec2> SegmentCurvePoints;
     std::vector<int> SegmentWidths;
     std::vector<float> SegmentColorMultipliers;
@@ -40,7 +64,5 @@ public:
     void Update(float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
 
     void InitializeKelpVisuals();
-    Vec2 Lerp(const Vec2& StartPoint, const Vec2& EndPoint, float Interpolator) const;
-    Vec2 QuadraticBezier(const Vec2& StartPoint, const Vec2& CurvePoint, const Vec2& EndPoint, float Interpolator) const;
     std::vector<Vec2> CalculateDisplayPoints() const;
 };
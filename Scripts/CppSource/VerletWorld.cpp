@@ -0,0 +1,137 @@
+#include "VerletWorld.h"
+
+VerletWorld::VerletWorld(unsigned int Seed) :
+    NumberChains{0},
+    NumberPoints{0},
+    NumberDisplayPoints{0},
+    ChainPointStarts{0},
+    ChainDisplayStarts{0},
+    ViewMin{-std::numeric_limits<double>::infinity(), -std::numeric_limits<double>::infinity()},
+    ViewMax{std::numeric_limits<double>::infinity(), std::numeric_limits<double>::infinity()},
+    Generator{Seed}
+{}
+
+int VerletWorld::AddChain(Vec2 Position, int NumberPoints, float DesiredDistancePoints, int NumberDisplayPointsPerSegment) {
+    int NumberChainDisplayPoints = (NumberPoints - 1) * (NumberDisplayPointsPerSegment + 1) + 1;
+
+    std::uniform_real_distribution<float> CurveDistribution(-10.0f, 10.0f);
+    std::uniform_int_distribution<int> WidthDistribution(2, 4);
+    std::uniform_real_distribution<float> ColorDistribution(0.75f, 1.0f);
+
+    for (int Index = 0; Index < NumberPoints; ++Index) {
+        // First node will be fixed
+        VerletPoints.emplace_back(Position - Vec2(0.0f, DesiredDistancePoints * Index), (Index == 0));
+    }
+
+    // Curve points are per segment, padded to one per point so they share the point offsets
+    for (int Index = 0; Index < NumberPoints; ++Index) {
+        SegmentCurvePoints.emplace_back(CurveDistribution(Generator), CurveDistribution(Generator));
+    }
+
+    for (int Index = 0; Index < NumberChainDisplayPoints; ++Index) {
+        SegmentWidths.push_back(WidthDistribution(Generator));
+        SegmentColorMultipliers.push_back(ColorDistribution(Generator));
+    }
+
+    DisplayPoints.resize(DisplayPoints.size() + NumberChainDisplayPoints);
+
+    this->NumberPoints += NumberPoints;
+    this->NumberDisplayPoints += NumberChainDisplayPoints;
+    ChainPointStarts.push_back(this->NumberPoints);
+    ChainDisplayStarts.push_back(this->NumberDisplayPoints);
+    ChainDesiredDistances.push_back(DesiredDistancePoints);
+    ChainDisplayPointsPerSegment.push_back(NumberDisplayPointsPerSegment);
+    ChainIterations.push_back(0);
+    ChainErrors.push_back(0.0f);
+    ChainStillFrames.push_back(0);
+    ChainSleeping.push_back(0);
+    ChainVisible.push_back(1);
+    ChainBoundsMin.emplace_back(0.0, 0.0);
+    ChainBoundsMax.emplace_back(0.0, 0.0);
+    ChainBounds(&VerletPoints[ChainPointStarts[NumberChains]], NumberPoints, ChainBoundsMin.back(), ChainBoundsMax.back());
+
+    CalculateChainDisplayPoints(
+        &VerletPoints[ChainPointStarts[NumberChains]], NumberPoints,
+        &SegmentCurvePoints[ChainPointStarts[NumberChains]], NumberDisplayPointsPerSegment,
+        &DisplayPoints[ChainDisplayStarts[NumberChains]]
+    );
+
+    return NumberChains++;
+}
+
+void VerletWorld::SetView(Vec2 ViewMin, Vec2 ViewMax) {
+    this->ViewMin = ViewMin;
+    this->ViewMax = ViewMax;
+}
+
+bool VerletWorld::ChainInView(int Chain) const {
+    // Padded by a link length to cover the curved display points and line widths
+    float Padding = ChainDesiredDistances[Chain];
+    return ChainBoundsMax[Chain].x + Padding >= ViewMin.x && ChainBoundsMin[Chain].x - Padding <= ViewMax.x &&
+           ChainBoundsMax[Chain].y + Padding >= ViewMin.y && ChainBoundsMin[Chain].y - Padding <= ViewMax.y;
+}
+
+void VerletWorld::Update(float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    for (int Chain = 0; Chain < NumberChains; ++Chain) {
+        ChainVisible[Chain] = ChainInView(Chain);
+
+        bool MouseReaches = MouseClicking && BoundsNearMouse(ChainBoundsMin[Chain], ChainBoundsMax[Chain], ChainDesiredDistances[Chain], MousePosition, MouseRadius);
+        if (ChainVisible[Chain] || MouseReaches) {
+            ChainSleeping[Chain] = 0;
+            ChainStillFrames[Chain] = 0;
+        }
+
+        if (ChainSleeping[Chain]) {
+            ChainIterations[Chain] = 0;
+            continue;
+        }
+
+        UpdateChain(Chain, DeltaTime, MouseClicking, MousePosition, MouseRadius);
+    }
+}
+
+void VerletWorld::UpdateChain(int Chain, float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius) {
+    int ChainStart = ChainPointStarts[Chain];
+    int ChainLength = ChainPointStarts[Chain + 1] - ChainStart;
+    VerletPoint* Points = &VerletPoints[ChainStart];
+
+    for (int Index = 0; Index < ChainLength; ++Index) {
+        Points[Index].Update(DeltaTime);
+    }
+
+    ChainSolveResult Result = SolveChainConstraints(Points, ChainLength, ChainDesiredDistances[Chain], DeltaTime, MouseClicking, MousePosition, MouseRadius, ConstraintTolerance, MaximumIterations);
+    ChainIterations[Chain] = Result.Iterations;
+    ChainErrors[Chain] = Result.MaximumError;
+    ChainBounds(Points, ChainLength, ChainBoundsMin[Chain], ChainBoundsMax[Chain]);
+
+    if (ChainVisible[Chain]) {
+        return;
+    }
+
+    // Only a chain nobody can see is allowed to fall asleep
+    float MaximumSpeed = 0.0f;
+    for (int Index = 0; Index < ChainLength; ++Index) {
+        MaximumSpeed = std::max(MaximumSpeed, static_cast<float>(Points[Index].CurrentPosition.DistanceTo(Points[Index].PreviousPosition)));
+    }
+
+    ChainStillFrames[Chain] = (MaximumSpeed < SleepSpeed) ? ChainStillFrames[Chain] + 1 : 0;
+    ChainSleeping[Chain] = ChainStillFrames[Chain] >= SleepFrames;
+}
+
+void VerletWorld::CalculateDisplayPoints() {
+    // Written into the preallocated buffer so the array views on the python side just see new
+    // values, chains out of view are skipped and catch up once they are visible again
+    for (int Chain = 0; Chain < NumberChains; ++Chain) {
+        if (!ChainVisible[Chain]) {
+            continue;
+        }
+
+        int ChainStart = ChainPointStarts[Chain];
+
+        CalculateChainDisplayPoints(
+            &VerletPoints[ChainStart], ChainPointStarts[Chain + 1] - ChainStart,
+            &SegmentCurvePoints[ChainStart], ChainDisplayPointsPerSegment[Chain],
+            &DisplayPoints[ChainDisplayStarts[Chain]]
+        );
+    }
+}
@@ -0,0 +1,60 @@
+#pragma once
+
+#include "VectorMath.h"
+#include "VerletChain.h"
+#include <vector>
+#include <random>
+#include <limits>
+#include <cstdint>
+
+class VerletWorld {
+public:
+    int NumberChains;
+    int NumberPoints;
+    int NumberDisplayPoints;
+
+    // Every chain's points, curve points and display data live in flat buffers, chain
+    // Index owns [ChainPointStarts[Index], ChainPointStarts[Index + 1]) and so on
+    std::vector<VerletPoint> VerletPoints;
+    std::vector<Vec2> SegmentCurvePoints;
+    std::vector<Vec2> DisplayPoints;
+    std::vector<int> SegmentWidths;
+    std::vector<float> SegmentColorMultipliers;
+
+    std::vector<int> ChainPointStarts;
+    std::vector<int> ChainDisplayStarts;
+    std::vector<float> ChainDesiredDistances;
+    std::vector<int> ChainDisplayPointsPerSegment;
+
+    float ConstraintTolerance = DefaultConstraintTolerance;
+    int MaximumIterations = DefaultMaximumIterations;
+
+    // Solver counters from the last update, one entry per chain
+    std::vector<int> ChainIterations;
+    std::vector<float> ChainErrors;
+
+    // Chains outside the view go to sleep once they have been still for SleepFrames updates,
+    // they wake when the mouse reaches them or they come back into view
+    Vec2 ViewMin;
+    Vec2 ViewMax;
+    float SleepSpeed = 0.05f;
+    int SleepFrames = 60;
+
+    std::vector<Vec2> ChainBoundsMin;
+    std::vector<Vec2> ChainBoundsMax;
+    std::vector<int> ChainStillFrames;
+    std::vector<uint8_t> ChainVisible;
+    std::vector<uint8_t> ChainSleeping;
+
+    std::mt19937 Generator;
+
+    // Curve points, widths and colours of new chains come from Seed
+    VerletWorld(unsigned int Seed = std::random_device{}());
+
+    int AddChain(Vec2 Position, int NumberPoints, float DesiredDistancePoints, int NumberDisplayPointsPerSegment);
+    void SetView(Vec2 ViewMin, Vec2 ViewMax);
+    void Update(float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+    void UpdateChain(int Chain, float DeltaTime, bool MouseClicking, Vec2 MousePosition, float MouseRadius);
+    bool ChainInView(int Chain) const;
+    void CalculateDisplayPoints();
+};
@@ -0,0 +1,91 @@
+#include "WorkerPool.h"
+
+#include <algorithm>
+
+WorkerPool::WorkerPool(int NumberThreads) :
+    NumberThreads{std::max(NumberThreads, 1)},
+    RangesRemaining{0},
+    Generation{0},
+    Stopping{false}
+{
+    Workers.reserve(this->NumberThreads);
+    for (int WorkerIndex = 0; WorkerIndex < this->NumberThreads; ++WorkerIndex) {
+        Workers.emplace_back(&WorkerPool::WorkerLoop, this, WorkerIndex);
+    }
+}
+
+WorkerPool::~WorkerPool() {
+    Wait();
+
+    {
+        std::lock_guard<std::mutex> Lock(Mutex);
+        Stopping = true;
+    }
+    WorkReady.notify_all();
+
+    for (std::thread& Worker : Workers) {
+        Worker.join();
+    }
+}
+
+void WorkerPool::Dispatch(int Count, int MinimumRangeSize, std::function<void(int, int)> Task) {
+    Wait();
+
+    // Small jobs use fewer ranges, waking a thread costs more than a handful of boids
+    int NumberRanges = std::max(1, std::min(NumberThreads, (Count + MinimumRangeSize - 1) / std::max(MinimumRangeSize, 1)));
+
+    {
+        std::lock_guard<std::mutex> Lock(Mutex);
+        CurrentTask = std::move(Task);
+
+        RangeStarts.resize(NumberRanges + 1);
+        for (int Range = 0; Range <= NumberRanges; ++Range) {
+            RangeStarts[Range] = static_cast<int>(static_cast<long long>(Count) * Range / NumberRanges);
+        }
+
+        RangesRemaining = NumberRanges;
+        Generation++;
+    }
+    WorkReady.notify_all();
+}
+
+void WorkerPool::Wait() {
+    std::unique_lock<std::mutex> Lock(Mutex);
+    WorkDone.wait(Lock, [this] { return RangesRemaining == 0; });
+}
+
+void WorkerPool::WorkerLoop(int WorkerIndex) {
+    unsigned long long LastGeneration = 0;
+
+    while (true) {
+        int RangeStart;
+        int RangeEnd;
+
+        {
+            std::unique_lock<std::mutex> Lock(Mutex);
+            WorkReady.wait(Lock, [&] { return Stopping || Generation != LastGeneration; });
+
+            if (Stopping) {
+                return;
+            }
+
+            LastGeneration = Generation;
+
+            // Workers without a range this time just go back to sleep
+            if (WorkerIndex >= static_cast<int>(RangeStarts.size()) - 1) {
+                continue;
+            }
+
+            RangeStart = RangeStarts[WorkerIndex];
+            RangeEnd = RangeStarts[WorkerIndex + 1];
+        }
+
+        CurrentTask(RangeStart, RangeEnd);
+
+        {
+            std::lock_guard<std::mutex> Lock(Mutex);
+            RangesRemaining--;
+        }
+        WorkDone.notify_all();
+    }
+}
@@ -0,0 +1,36 @@
+#pragma once
+
+#include <vector>
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <functional>
+
+class WorkerPool {
+public:
+    int NumberThreads;
+
+    WorkerPool(int NumberThreads);
+    ~WorkerPool();
+
+    WorkerPool(const WorkerPool&) = delete;
+    WorkerPool& operator=(const WorkerPool&) = delete;
+
+    // Splits [0, Count) into contiguous ranges and hands one to each worker, returns straight away
+    void Dispatch(int Count, int MinimumRangeSize, std::function<void(int, int)> Task);
+    void Wait();
+
+private:
+    std::vector<std::thread> Workers;
+    std::mutex Mutex;
+    std::condition_variable WorkReady;
+    std::condition_variable WorkDone;
+
+    std::function<void(int, int)> CurrentTask;
+    std::vector<int> RangeStarts;
+    int RangesRemaining;
+    unsigned long long Generation;
+    bool Stopping;
+
+    void WorkerLoop(int WorkerIndex);
+};
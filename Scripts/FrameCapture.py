@@ -0,0 +1,93 @@
+import pygame
+import numpy as np
+import os, queue, threading, time
+
+class FrameCapture:
+    def __init__(self, Context, FrameBuffer, Resolution, OutputDirectory, Format = "png", RingSize = 3, QueueFrames = 8, DropFrames = True):
+        self.FrameBuffer = FrameBuffer
+        self.Resolution = [int(Resolution[0]), int(Resolution[1])]
+        self.Format = Format
+
+        # Pixels are copied into these on the GPU and only read back RingSize - 1 frames later,
+        # by then the copy has finished and reading doesn't stall the frame being drawn
+        FrameBytes = self.Resolution[0] * self.Resolution[1] * 3
+        self.PixelBuffers = [Context.buffer(reserve=FrameBytes) for Index in range(RingSize)]
+        self.PendingFrames = [None] * RingSize
+        self.FrameNumber = 0
+
+        # Encoding happens on a worker thread. When it falls behind and the queue is full new
+        # frames are dropped so the game never waits on the disk, or with DropFrames off the
+        # game waits so every frame is kept. Raw video has no frame numbers to leave gaps in, a
+        # dropped frame would speed the video up, so it always waits.
+        self.EncodeQueue = queue.Queue(maxsize = QueueFrames)
+        self.DropFrames = DropFrames and Format != "raw"
+        self.CapturedFrames = 0
+        self.DroppedFrames = 0
+
+        self.OutputDirectory = os.path.join(OutputDirectory, time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(self.OutputDirectory, exist_ok = True)
+
+        # Raw video is one file of top first rgb24 frames, ffmpeg reads it with
+        # -f rawvideo -pix_fmt rgb24 -s WIDTHxHEIGHT
+        self.RawFile = open(os.path.join(self.OutputDirectory, f"Capture{self.Resolution[0]}x{self.Resolution[1]}.rgb"), "wb") if Format == "raw" else None
+
+        self.Worker = threading.Thread(target = self.EncodeFrames, daemon = True)
+        self.Worker.start()
+
+    def Capture(self):
+        RingIndex = self.FrameNumber % len(self.PixelBuffers)
+
+        self.FrameBuffer.read_into(self.PixelBuffers[RingIndex], viewport = (0, 0, *self.Resolution), components = 3)
+        self.PendingFrames[RingIndex] = self.FrameNumber
+
+        # Frame N - 2 is collected while frame N is being drawn
+        self.CollectFrame((self.FrameNumber + 1) % len(self.PixelBuffers))
+        self.FrameNumber += 1
+
+    def CollectFrame(self, RingIndex):
+        FrameNumber = self.PendingFrames[RingIndex]
+        if FrameNumber is None:
+            return
+
+        self.PendingFrames[RingIndex] = None
+        Pixels = self.PixelBuffers[RingIndex].read()
+
+        try:
+            self.EncodeQueue.put((FrameNumber, Pixels), block = not self.DropFrames)
+            self.CapturedFrames += 1
+        except queue.Full:
+            self.DroppedFrames += 1
+
+    def EncodeFrames(self):
+        while True:
+            Frame = self.EncodeQueue.get()
+            if Frame is None:
+                break
+
+            FrameNumber, Pixels = Frame
+
+            # Rows come back from OpenGL bottom first
+            Image = np.frombuffer(Pixels, dtype=np.uint8).reshape(self.Resolution[1], self.Resolution[0], 3)[::-1]
+
+            if self.RawFile is not None:
+                self.RawFile.write(Image.tobytes())
+            else:
+                # Dropped frames leave gaps in the numbering
+                pygame.image.save(
+                    pygame.image.frombuffer(Image.tobytes(), self.Resolution, "RGB"),
+                    os.path.join(self.OutputDirectory, f"Frame{FrameNumber:06d}.png"),
+                )
+
+    def Close(self):
+        # Frames still in flight are collected oldest first, then the worker finishes the queue
+        for Offset in range(1, len(self.PixelBuffers) + 1):
+            self.CollectFrame((self.FrameNumber + Offset) % len(self.PixelBuffers))
+
+        self.EncodeQueue.put(None)
+        self.Worker.join()
+
+        if self.RawFile is not None:
+            self.RawFile.close()
+
+        for PixelBuffer in self.PixelBuffers:
+            PixelBuffer.release()
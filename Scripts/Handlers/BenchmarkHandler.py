@@ -0,0 +1,164 @@
+from ..CppBuild.Simulations import Vec2
+
+import pygame, moderngl as mgl
+from pygame.locals import *
+import numpy as np
+import argparse, json, math, os, sys
+
+# Usage (from the repository root):
+#   python Main.py --benchmark --Frames 600
+#   python Main.py --benchmark --NumberOfFish 10000 --SceneResolution 1280x720 --Output Fish10000.json
+
+class BenchmarkHandler:
+    def __init__(self, Arguments):
+        Parser = argparse.ArgumentParser(description = "Run the game without a window for a fixed number of frames and report frame times")
+        Parser.add_argument("--benchmark", action = "store_true")
+        Parser.add_argument("--Frames", type = int, default = 600)
+        Parser.add_argument("--WarmupFrames", type = int, default = 60, help = "Frames run before timing starts")
+        Parser.add_argument("--NumberOfFish", type = int, default = None)
+        Parser.add_argument("--NumberOfKelp", type = int, default = None)
+        Parser.add_argument("--NumberOfGrassBlades", type = int, default = None)
+        Parser.add_argument("--SceneResolution", default = None, help = "Width x height, like 640x360")
+        Parser.add_argument("--ScreenResolution", default = None, help = "Width x height, defaults to the scene resolution")
+        Parser.add_argument("--Backend", default = "egl" if sys.platform.startswith("linux") else None, help = "Standalone context backend, egl on headless Linux")
+        Parser.add_argument("--Seed", type = int, default = 0)
+        Parser.add_argument("--CaptureSource", default = None, help = "Scene or Screen to record the run, see CaptureSource in the settings")
+        Parser.add_argument("--Output", default = None, help = "JSON file to write, printed when left out")
+        self.Arguments = Parser.parse_args(Arguments)
+
+        self.SceneSizes = {
+            Name : getattr(self.Arguments, Name)
+            for Name in ["NumberOfFish", "NumberOfKelp", "NumberOfGrassBlades"]
+            if getattr(self.Arguments, Name) is not None
+        }
+
+        # Set before pygame starts, nothing is shown or played
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+        # Seconds per frame for every profiler section, filled in as sections show up
+        self.FrameTimes = {}
+
+    @staticmethod
+    def ParseResolution(ResolutionText):
+        return Vec2([int(Size) for Size in ResolutionText.split("x")])
+
+    def ApplySettings(self, Settings):
+        if self.Arguments.SceneResolution is not None:
+            Settings.SceneResolution = self.ParseResolution(self.Arguments.SceneResolution)
+            Settings.ScreenResolution = Settings.SceneResolution.copy()
+            Settings.AspectRatio = Settings.SceneResolution.x / Settings.SceneResolution.y
+        if self.Arguments.ScreenResolution is not None:
+            Settings.ScreenResolution = self.ParseResolution(self.Arguments.ScreenResolution)
+        if self.Arguments.CaptureSource is not None:
+            Settings.CaptureSource = self.Arguments.CaptureSource
+
+        # The terrain, kelp and fish are laid out from the seed on both simulation backends
+        Settings.RandomSeed = self.Arguments.Seed
+
+        # Runs have to be comparable, so the quality stays where the settings put it
+        Settings.FullScreen = False
+        Settings.AdaptiveQuality = False
+
+        # Frame times come from the profiler sections
+        Settings.Profiling = True
+
+    def CreateContext(self):
+        if self.Arguments.Backend:
+            return mgl.create_standalone_context(backend = self.Arguments.Backend)
+        return mgl.create_standalone_context()
+
+    def ScriptedInput(self, Game, Frame):
+        # Any key closes the title menu on the first frame
+        Events = []
+        if Frame == 0:
+            Events.append(pygame.event.Event(KEYDOWN, key = pygame.K_SPACE))
+
+        # The camera pans right, down, left and up, one key held for each quarter of every 8 seconds
+        Keys = [pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w]
+        Segment = Frame * 4 // (8 * Game.Settings.FpsCap)
+        PreviousSegment = (Frame - 1) * 4 // (8 * Game.Settings.FpsCap)
+        if Frame == 0 or Segment != PreviousSegment:
+            if Frame > 0:
+                Events.append(pygame.event.Event(KEYUP, key = Keys[PreviousSegment % 4]))
+            Events.append(pygame.event.Event(KEYDOWN, key = Keys[Segment % 4]))
+
+        # The mouse circles the middle of the screen, holding the button down every other second
+        Angle = 2 * math.pi * Frame / (3 * Game.Settings.FpsCap)
+        MousePosition = Game.Settings.ScreenResolution * Vec2([0.5 + 0.3 * math.cos(Angle), 0.6 + 0.25 * math.sin(Angle)])
+
+        Clicking = (Frame // Game.Settings.FpsCap) % 2 == 1
+        if Clicking != Game.Mouse.Clicking:
+            Events.append(pygame.event.Event(MOUSEBUTTONDOWN if Clicking else MOUSEBUTTONUP, button = 1, pos = MousePosition.ToTuple()))
+
+        return Events, MousePosition
+
+    def Run(self, Game):
+        # Every frame steps the same amount so runs replay identically
+        Game.DeltaTime = 1 / Game.Settings.FpsCap
+
+        for Frame in range(self.Arguments.WarmupFrames + self.Arguments.Frames):
+            # Only the measured frames are recorded
+            if Frame == self.Arguments.WarmupFrames and Game.Settings.CaptureSource:
+                Game.ModernGLScene.StartCapture()
+
+            Events, MousePosition = self.ScriptedInput(Game, Frame)
+            Game.Frame(Events, MousePosition)
+
+            # Stands in for the flip, waiting until the GPU has drawn the frame
+            with Game.Profiler.Section("GpuWait"):
+                Game.ModernGLScene.Context.finish()
+
+            Game.Profiler.EndFrame()
+            pygame.event.pump()
+
+            if Frame < self.Arguments.WarmupFrames:
+                continue
+
+            # Sections that didn't run in a frame count as zero for it
+            MeasuredFrames = Frame - self.Arguments.WarmupFrames
+            for Name, FrameTime in Game.Profiler.LastFrameTimes.items():
+                self.FrameTimes.setdefault(Name, [0.0] * MeasuredFrames).append(FrameTime)
+            for FrameTimes in self.FrameTimes.values():
+                if len(FrameTimes) == MeasuredFrames:
+                    FrameTimes.append(0.0)
+
+        # Waits for the capture encoder to finish
+        Game.ModernGLScene.Quit()
+
+        Results = {
+            "Frames": self.Arguments.Frames,
+            "SceneResolution": [int(Game.Settings.SceneResolution.x), int(Game.Settings.SceneResolution.y)],
+            "ScreenResolution": [int(Game.Settings.ScreenResolution.x), int(Game.Settings.ScreenResolution.y)],
+            "NumberOfFish": len(Game.FishManager.Boids),
+            "NumberOfKelp": len(Game.KelpManager.KelpWorld),
+            "NumberOfGrassBlades": Game.OceanFloor.NumberOfGrassBlades,
+            "Renderer": Game.ModernGLScene.Context.info["GL_RENDERER"],
+            "FrameTimesMs": {Name : self.Percentiles(FrameTimes) for Name, FrameTimes in self.FrameTimes.items()},
+        }
+
+        Capture = Game.ModernGLScene.Capture
+        if Capture is not None:
+            Results["CapturedFrames"] = Capture.CapturedFrames
+            Results["DroppedFrames"] = Capture.DroppedFrames
+            Results["CaptureDirectory"] = Capture.OutputDirectory
+
+        pygame.quit()
+
+        ResultsText = json.dumps(Results, indent = 4)
+        if self.Arguments.Output is None:
+            print(ResultsText)
+        else:
+            with open(self.Arguments.Output, "w") as File:
+                File.write(ResultsText)
+
+    @staticmethod
+    def Percentiles(FrameTimes):
+        FrameTimes = np.array(FrameTimes) * 1000
+        return {
+            "Mean": round(float(FrameTimes.mean()), 4),
+            "P50": round(float(np.percentile(FrameTimes, 50)), 4),
+            "P90": round(float(np.percentile(FrameTimes, 90)), 4),
+            "P99": round(float(np.percentile(FrameTimes, 99)), 4),
+            "Max": round(float(FrameTimes.max()), 4),
+        }
@@ -0,0 +1,50 @@
+from ..GameObject import GameObject
+from ..CppBuild.Simulations import Vec2
+
+import numpy as np
+
+class PointLight:
+    def __init__(self, Position, Color, Radius, Intensity):
+        # Position is in world pixels, color is 0 to 255 like the rest of pygame
+        self.Position = Position
+        self.Color = Color
+        self.Radius = Radius
+        self.Intensity = Intensity
+
+class LightingHandler(GameObject):
+    # Has to match MaximumLights in SceneFragment.glsl
+    MaximumLights = 32
+
+    def __init__(self):
+        self.Lights = []
+
+        # Uniform arrays are always uploaded at full length, only the first NumberLights are read
+        self.LightPositions = np.zeros((self.MaximumLights, 2), dtype=np.float32)
+        self.LightColors = np.zeros((self.MaximumLights, 4), dtype=np.float32)
+        self.LightRadii = np.zeros(self.MaximumLights, dtype=np.float32)
+        self.NumberLights = 0
+
+    def AddLight(self, Position, Color, Radius, Intensity):
+        Light = PointLight(Position, Color, Radius, Intensity)
+        self.Lights.append(Light)
+        return Light
+
+    def RemoveLight(self, Light):
+        self.Lights.remove(Light)
+
+    def Update(self):
+        # Lights that can't reach the screen are left out so the shader loop stays short
+        self.NumberLights = 0
+
+        for Light in self.Lights:
+            if self.NumberLights == self.MaximumLights:
+                break
+
+            if not self.Game.PygameScene.IsVisible(Light.Position - Vec2([Light.Radius, Light.Radius]), Vec2([Light.Radius, Light.Radius]) * 2):
+                continue
+
+            self.LightPositions[self.NumberLights] = (Light.Position.x, Light.Position.y)
+            self.LightColors[self.NumberLights, :3] = np.asarray(Light.Color, dtype=np.float32) / 255.0
+            self.LightColors[self.NumberLights, 3] = Light.Intensity
+            self.LightRadii[self.NumberLights] = Light.Radius
+            self.NumberLights += 1
@@ -3,17 +3,76 @@ from ..CppBuild.Simulations import Vec2
 
 import pygame, os
 from pygame.locals import *
+from collections import OrderedDict
 
 # Title.ttf # 16 + 16n # 16, 32, 48, 64
 # Body.ttf # 13 + 13n # 13, 26, 39, 52
 
+class TextCache:
+    def __init__(self, MaximumEntries):
+        # Rendered text by font and string, least recently used first
+        self.MaximumEntries = MaximumEntries
+        self.CachedImages = OrderedDict()
+
+    def Render(self, Font, Text):
+        Key = (Font, Text)
+
+        TextImage = self.CachedImages.get(Key)
+        if TextImage is not None:
+            self.CachedImages.move_to_end(Key)
+            return TextImage
+
+        TextImage = Font.render(Text, False, [255, 255, 255])
+        self.CachedImages[Key] = TextImage
+
+        if len(self.CachedImages) > self.MaximumEntries:
+            self.CachedImages.popitem(last = False)
+
+        return TextImage
+
+class TextWidget(GameObject):
+    def __init__(self, Font, Position, Centered = False):
+        self.Font = Font
+        self.Position = Position
+        self.Centered = Centered
+
+        # What is on the menus layer right now, None while hidden
+        self.Text = None
+        self.Rect = None
+
+    def SetText(self, Text):
+        # Drawn only when the text changes, the menus layer keeps it otherwise
+        if Text == self.Text and self.Rect is not None:
+            return
+
+        self.Hide()
+
+        TextImage = self.Game.Menus.TextCache.Render(self.Font, Text)
+        RenderPosition = self.Position - Vec2(TextImage.get_size()) * 0.5 if self.Centered else self.Position
+
+        self.Text = Text
+        self.Rect = self.Game.PygameScene.GetRetainedLayer("Menus").blit(
+            source = TextImage,
+            dest = RenderPosition.ToTuple(),
+        )
+        self.Game.PygameScene.MarkDirty("Menus", self.Rect)
+
+    def Hide(self):
+        # Widgets don't overlap so clearing the rectangle only removes this one
+        if self.Rect is None:
+            return
+
+        self.Game.PygameScene.GetRetainedLayer("Menus").fill([0, 0, 0, 0], self.Rect)
+        self.Game.PygameScene.MarkDirty("Menus", self.Rect)
+        self.Rect = None
+
 class TitleMenu(GameObject):
     def __init__(self, Active):
         self.TitleFont = pygame.font.Font(os.path.join(os.getcwd(), "Data/Fonts/Title.ttf"), 64)
         self.BodyFont = pygame.font.Font(os.path.join(os.getcwd(), "Data/Fonts/Body.ttf"), 13)
 
-        self.TitleImage = self.TitleFont.render("forbidden", False, [255, 255, 255])
-        self.TextImage = self.BodyFont.render("press any key to continue", False, [255, 255, 255])
+        self.TitleWidget = TextWidget(self.TitleFont, self.Game.Settings.SceneResolution * Vec2([0.5, 0.45]), Centered = True)
+        self.TextWidget = TextWidget(self.BodyFont, self.Game.Settings.SceneResolution * Vec2([0.5, 0.55]), Centered = True)
 
         self.Active = Active
 
@@ -24,35 +83,92 @@ class TitleMenu(GameObject):
                 self.Game.Audio.MenuSound.play()
 
     def Render(self):
-        self.Game.PygameScene.MenusSurface.blit(
-            source = self.TitleImage,
-            dest = self.Game.Settings.SceneResolution * Vec2([0.5, 0.45]) - Vec2(self.TitleImage.get_size()) * 0.5,
-        )
+        self.TitleWidget.SetText("forbidden")
+        self.TextWidget.SetText("press any key to continue")
 
-        self.Game.PygameScene.MenusSurface.blit(
-            source = self.TextImage,
-            dest = self.Game.Settings.SceneResolution * Vec2([0.5, 0.55]) - Vec2(self.TextImage.get_size()) * 0.5,
-        )
+    def Hide(self):
+        self.TitleWidget.Hide()
+        self.TextWidget.Hide()
 
 class DebugMenu(GameObject):
     def __init__(self, Active):
         self.BodyFont = pygame.font.Font(os.path.join(os.getcwd(), "Data/Fonts/Body.ttf"), 13)
         self.CurrentFrameFps = None
+        self.KelpSolverIterations = None
+        self.KelpSolverError = None
+        self.VisibilityText = None
+        self.UploadText = None
+        self.QualityText = None
+        self.StepsText = None
+        self.ProfileTexts = {}
+
+        # One line each, stacked down from the top left corner
+        LinePosition = self.Game.Settings.SceneResolution * Vec2([0.025, 0.025])
+        LineHeight = self.BodyFont.get_height()
+        self.LineWidgets = [TextWidget(self.BodyFont, LinePosition + Vec2([0, LineHeight * Index])) for Index in range(6)]
+
+        # Profiled sections go underneath in columns of nine, in the order they first show up
+        self.ProfilePosition = LinePosition + Vec2([0, LineHeight * 7])
+        self.ProfileSpacing = Vec2([self.Game.Settings.SceneResolution.x * 0.3, LineHeight])
+        self.ProfileWidgets = {}
 
         self.Active = Active
 
     def Update(self, Events):
         self.CurrentFrameFps = round(self.Game.Clock.get_fps())
 
+        KelpWorld = self.Game.KelpManager.KelpWorld
+        self.KelpSolverIterations = int(KelpWorld.ChainIterations.sum())
+        self.KelpSolverError = float(KelpWorld.ChainErrors.max(initial = 0))
+
+        KelpManager = self.Game.KelpManager
+        FishManager = self.Game.FishManager
+        self.VisibilityText = f"VISIBLE KELP {KelpManager.NumberVisible}/{len(KelpWorld)} SLEEPING {KelpManager.NumberSleeping} FISH {FishManager.NumberVisible}/{len(FishManager.Boids)}"
+
+        UploadTimes = self.Game.ModernGLScene.UploadTimes
+        self.UploadText = "UPLOAD MS " + " ".join(f"{Name.upper()} {UploadTime * 1000:.2f}" for Name, UploadTime in UploadTimes.items())
+
+        Quality = self.Game.Quality
+        self.QualityText = f"QUALITY {Quality.TierName.upper()} {Quality.Reason}"
+
+        Simulations = self.Game.Scheduler.Simulations.values()
+        self.StepsText = "STEPS " + " ".join(f"{Simulation.Name.upper()} {Simulation.StepsTaken}" for Simulation in Simulations)
+        self.StepsText += f" DROPPED {sum(Simulation.DroppedSteps for Simulation in Simulations)}"
+
+        # Percentiles over the whole history are only worked out a few times a second
+        Profiler = self.Game.Profiler
+        if Profiler.Enabled and Profiler.FrameNumber % 30 == 0:
+            self.ProfileTexts = {"Header": "MS P50 P99"}
+            for Name in Profiler.History:
+                Median, Worst = Profiler.Percentiles(Name)
+                self.ProfileTexts[Name] = f"{Name.upper()} {Median * 1000:.2f} {Worst * 1000:.2f}"
+
     def Render(self):
-        FpsTextImage = self.BodyFont.render(f"FPS {str(self.CurrentFrameFps)}", False, [255, 255, 255])
-        self.Game.PygameScene.MenusSurface.blit(
-            source = FpsTextImage,
-            dest = self.Game.Settings.SceneResolution * Vec2([0.025, 0.025]),
-        )
+        FpsWidget, KelpWidget, VisibilityWidget, UploadWidget, QualityWidget, StepsWidget = self.LineWidgets
+
+        FpsWidget.SetText(f"FPS {str(self.CurrentFrameFps)}")
+        KelpWidget.SetText(f"KELP {self.KelpSolverIterations} ITERATIONS {self.KelpSolverError:.2f} ERROR")
+        VisibilityWidget.SetText(self.VisibilityText)
+        UploadWidget.SetText(self.UploadText)
+        QualityWidget.SetText(self.QualityText)
+        StepsWidget.SetText(self.StepsText)
+
+        for Name, ProfileText in self.ProfileTexts.items():
+            if Name not in self.ProfileWidgets:
+                Column, Row = divmod(len(self.ProfileWidgets), 9)
+                self.ProfileWidgets[Name] = TextWidget(self.BodyFont, self.ProfilePosition + self.ProfileSpacing * Vec2([Column, Row]))
+            self.ProfileWidgets[Name].SetText(ProfileText)
+
+    def Hide(self):
+        for LineWidget in self.LineWidgets:
+            LineWidget.Hide()
+        for ProfileWidget in self.ProfileWidgets.values():
+            ProfileWidget.Hide()
 
 class MenusHandler(GameObject):
     def __init__(self):
+        self.TextCache = TextCache(256)
+
         self.Menus = {
             "TitleMenu": TitleMenu(True),
             "DebugMenu": DebugMenu(self.Game.Settings.ShowDebug),
@@ -67,7 +183,9 @@ class MenusHandler(GameObject):
             Menu.Update(Events)
 
     def Render(self):
+        # Menus that were closed take their text off the menus layer
         for Menu in self.Menus.values():
             if not Menu.Active:
+                Menu.Hide()
                 continue
             Menu.Render()
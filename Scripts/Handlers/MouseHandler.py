@@ -18,12 +18,35 @@ class MouseHandler(GameObject):
         self.MaxRadius = 150
         self.MenusRadius = 4
 
+        # Radius and click state the cursor sprite was last drawn with
+        self.CursorKey = None
+
     def Render(self):
+        if not self.Game.Settings.GpuSprites:
+            self.DrawCursor(self.Game.PygameScene.GetLayer("Foreground"), self.ScenePosition.ToTuple(), self.AnimatedRadius)
+            return
+
+        # Sprites are drawn over the foreground layer on the GPU, so the cursor is an overlay sprite
+        # drawn after them. It is only redrawn when its whole pixel radius or the click changes.
+        Radius = int(self.AnimatedRadius)
+        if self.CursorKey != (Radius, self.Clicking):
+            self.CursorKey = (Radius, self.Clicking)
+
+            CursorImage = pygame.Surface((Radius * 2, Radius * 2)).convert_alpha()
+            CursorImage.fill([0, 0, 0, 0])
+            self.DrawCursor(CursorImage, (Radius, Radius), Radius)
+            self.Game.ModernGLScene.Overlays.RegisterSprite("Cursor", CursorImage)
+
+        # Circles are drawn around the whole pixel under their centre, the sprite is placed to match
+        CursorCenter = Vec2([int(self.ScenePosition.x), int(self.ScenePosition.y)]) + self.Game.PygameScene.PixelOffset
+        self.Game.ModernGLScene.Overlays.AddInstances("Cursor", [[CursorCenter.x, CursorCenter.y]], [0])
+
+    def DrawCursor(self, Surface, Center, Radius):
         pygame.draw.circle(
-            surface = self.Game.PygameScene.ForegroundSurface,
+            surface = Surface,
             color = [255, 255, 255],
-            center = self.ScenePosition,
-            radius = self.AnimatedRadius,
+            center = Center,
+            radius = Radius,
             width = self.BorderThickness,
         )
 
@@ -31,10 +54,10 @@ class MouseHandler(GameObject):
             return
 
         pygame.draw.circle(
-            surface = self.Game.PygameScene.ForegroundSurface,
+            surface = Surface,
             color = [255, 255, 255],
-            center = self.ScenePosition,
-            radius = self.AnimatedRadius - (self.BorderThickness * 2),
+            center = Center,
+            radius = Radius - (self.BorderThickness * 2),
         )
 
     def Update(self, Events, MousePosition):
@@ -0,0 +1,143 @@
+from ..GameObject import GameObject
+
+import pygame
+from pygame.locals import *
+from collections import deque
+import numpy as np
+import json, os, time
+
+class GpuTimer:
+    def __init__(self, Context, RingSize = 3):
+        # Time queries are read back RingSize frames late so the CPU never waits on the GPU
+        self.Queries = [Context.query(time=True) for Index in range(RingSize)]
+        self.QueryIndex = 0
+        self.QueriesIssued = 0
+
+        # Seconds the GPU spent inside the timer RingSize frames ago
+        self.Time = 0.0
+
+    def __enter__(self):
+        Query = self.Queries[self.QueryIndex]
+        if self.QueriesIssued >= len(self.Queries):
+            self.Time = Query.elapsed / 1e9
+
+        Query.__enter__()
+
+    def __exit__(self, *Exception):
+        self.Queries[self.QueryIndex].__exit__(*Exception)
+        self.QueryIndex = (self.QueryIndex + 1) % len(self.Queries)
+        self.QueriesIssued += 1
+
+class ProfileSection:
+    def __init__(self, Profiler, Name):
+        self.Profiler = Profiler
+        self.Name = Name
+
+    def __enter__(self):
+        self.StartTime = time.perf_counter()
+
+    def __exit__(self, *Exception):
+        self.Profiler.Record(self.Name, self.StartTime, time.perf_counter() - self.StartTime)
+
+class NullSection:
+    # Stands in for every section while profiling is off, entering it does nothing
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *Exception):
+        pass
+
+class ProfilerHandler(GameObject):
+    def __init__(self, Enabled, HistoryFrames, TraceDirectory, TraceKey = pygame.K_F3):
+        self.Enabled = Enabled
+        self.TraceDirectory = TraceDirectory
+        self.TraceKey = TraceKey
+
+        # Sections are made once and reused, so a profiled call costs two clock reads
+        self.Sections = {}
+        self.DisabledSection = NullSection()
+
+        # Seconds spent in each section this frame, and the last HistoryFrames frames of them
+        self.FrameStartTime = time.perf_counter()
+        self.FrameTimes = {}
+        self.LastFrameTimes = {}
+        self.HistoryFrames = HistoryFrames
+        self.History = {}
+        self.FrameNumber = 0
+
+        # Every section call of the last HistoryFrames frames for the trace
+        self.FrameEvents = []
+        self.TraceFrames = deque(maxlen = HistoryFrames)
+
+    def Section(self, Name):
+        if not self.Enabled:
+            return self.DisabledSection
+
+        Section = self.Sections.get(Name)
+        if Section is None:
+            Section = self.Sections[Name] = ProfileSection(self, Name)
+        return Section
+
+    def Record(self, Name, StartTime, Duration):
+        self.FrameTimes[Name] = self.FrameTimes.get(Name, 0.0) + Duration
+        self.FrameEvents.append((Name, StartTime, Duration))
+
+    def BeginFrame(self, Events):
+        self.FrameStartTime = time.perf_counter()
+
+        for Event in Events:
+            if Event.type == KEYDOWN and Event.key == self.TraceKey and self.Enabled:
+                self.DumpTrace()
+
+    def EndFrame(self):
+        if not self.Enabled:
+            return
+
+        self.FrameTimes["Total"] = time.perf_counter() - self.FrameStartTime
+
+        # GPU times arrive a few frames late, they are added to the frame they belong to
+        GpuTimers = self.Game.ModernGLScene.GpuTimers
+        GpuTimes = {f"Gpu{Name}" : Timer.Time for Name, Timer in GpuTimers.items()}
+        self.FrameTimes.update(GpuTimes)
+
+        for Name, FrameTime in self.FrameTimes.items():
+            if Name not in self.History:
+                self.History[Name] = deque(maxlen = self.HistoryFrames)
+            self.History[Name].append(FrameTime)
+
+        self.TraceFrames.append({"StartTime": self.FrameStartTime, "Events": self.FrameEvents, "GpuTimes": {}})
+        GpuLag = len(next(iter(GpuTimers.values())).Queries)
+        if len(self.TraceFrames) > GpuLag:
+            self.TraceFrames[-1 - GpuLag]["GpuTimes"] = GpuTimes
+
+        self.LastFrameTimes = self.FrameTimes
+        self.FrameTimes = {}
+        self.FrameEvents = []
+        self.FrameNumber += 1
+
+    def Percentiles(self, Name):
+        # Rolling p50 and p99 in seconds
+        History = np.fromiter(self.History[Name], dtype=np.float64)
+        return np.percentile(History, 50), np.percentile(History, 99)
+
+    def DumpTrace(self):
+        # Chrome trace event format, open it in chrome://tracing or ui.perfetto.dev. GPU passes
+        # only have durations so they are laid out one after another from the start of their frame.
+        TraceEvents = []
+        TraceStartTime = self.TraceFrames[0]["StartTime"] if self.TraceFrames else 0.0
+
+        for Frame in self.TraceFrames:
+            for Name, StartTime, Duration in Frame["Events"]:
+                TraceEvents.append({"name": Name, "ph": "X", "pid": 0, "tid": "CPU", "ts": (StartTime - TraceStartTime) * 1e6, "dur": Duration * 1e6})
+
+            GpuStartTime = Frame["StartTime"]
+            for Name, Duration in Frame["GpuTimes"].items():
+                TraceEvents.append({"name": Name, "ph": "X", "pid": 0, "tid": "GPU", "ts": (GpuStartTime - TraceStartTime) * 1e6, "dur": Duration * 1e6})
+                GpuStartTime += Duration
+
+        os.makedirs(self.TraceDirectory, exist_ok = True)
+        TracePath = os.path.join(self.TraceDirectory, time.strftime("Trace-%Y%m%d-%H%M%S.json"))
+        with open(TracePath, "w") as File:
+            json.dump({"traceEvents": TraceEvents, "displayTimeUnit": "ms"}, File)
+
+        return TracePath
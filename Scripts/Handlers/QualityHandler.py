@@ -0,0 +1,82 @@
+from ..GameObject import GameObject
+
+from collections import deque
+import numpy as np
+
+class QualityHandler(GameObject):
+    def __init__(self, Tiers, WindowFrames, DownscaleLoad, UpscaleLoad):
+        # The highest tier is the settings as they are written, lower tiers override some of them.
+        # The scene only keeps a divisor once it has made the effects buffer, so both effects
+        # settings are read from the settings themselves.
+        BaseTier = {
+            "Name": "Settings",
+            "EffectsTier": self.Game.ModernGLScene.EffectsTier,
+            "EffectsResolutionDivisor": self.Game.Settings.EffectsResolutionDivisor,
+            "EffectsRefreshInterval": self.Game.Settings.EffectsRefreshInterval,
+            "OffscreenUpdateInterval": self.Game.FishManager.OffscreenUpdateInterval,
+            "KelpMaximumIterations": self.Game.KelpManager.KelpWorld.MaximumIterations,
+        }
+        self.Tiers = [{**BaseTier, **Tier} for Tier in Tiers] or [BaseTier]
+        self.Tier = len(self.Tiers) - 1
+
+        # Rolling frame times in seconds, the frame is as slow as the slower of the two
+        self.CpuFrameTimes = deque(maxlen = WindowFrames)
+        self.GpuFrameTimes = deque(maxlen = WindowFrames)
+        self.WindowFrames = WindowFrames
+
+        # Fractions of the frame budget, stepping down above the first and up below the second.
+        # Every time a tier is left for being too slow it has to show headroom for twice as long
+        # before it is tried again, so two neighbouring tiers don't keep swapping.
+        self.DownscaleLoad = DownscaleLoad
+        self.UpscaleLoad = UpscaleLoad
+        self.TierFailures = [0] * len(self.Tiers)
+        self.FramesWithHeadroom = 0
+
+        self.Reason = "STARTING TIER"
+        self.ApplyTier(self.Tier)
+
+    @property
+    def TierName(self):
+        return self.Tiers[self.Tier]["Name"]
+
+    def ApplyTier(self, Tier):
+        self.Tier = Tier
+        TierSettings = self.Tiers[Tier]
+
+        self.Game.ModernGLScene.SetEffectsQuality(TierSettings["EffectsTier"], TierSettings["EffectsResolutionDivisor"], TierSettings["EffectsRefreshInterval"])
+        self.Game.FishManager.OffscreenUpdateInterval = TierSettings["OffscreenUpdateInterval"]
+        self.Game.KelpManager.KelpWorld.MaximumIterations = TierSettings["KelpMaximumIterations"]
+
+        # Frames from before the change say nothing about the new tier
+        self.CpuFrameTimes.clear()
+        self.GpuFrameTimes.clear()
+        self.FramesWithHeadroom = 0
+
+    def Update(self, CpuFrameTime, GpuFrameTime):
+        self.CpuFrameTimes.append(CpuFrameTime)
+        self.GpuFrameTimes.append(GpuFrameTime)
+
+        if len(self.CpuFrameTimes) < self.WindowFrames:
+            return
+
+        # Medians so a single hitch doesn't change the tier
+        FrameBudget = 1 / self.Game.Settings.FpsCap
+        CpuTime = float(np.median(self.CpuFrameTimes))
+        GpuTime = float(np.median(self.GpuFrameTimes))
+        Bound, FrameTime = ("CPU", CpuTime) if CpuTime >= GpuTime else ("GPU", GpuTime)
+
+        if FrameTime > FrameBudget * self.DownscaleLoad:
+            self.FramesWithHeadroom = 0
+            if self.Tier > 0:
+                self.TierFailures[self.Tier] += 1
+                self.Reason = f"{Bound} {FrameTime * 1000:.1f} MS OVER {FrameBudget * self.DownscaleLoad * 1000:.1f} MS"
+                self.ApplyTier(self.Tier - 1)
+
+        elif FrameTime < FrameBudget * self.UpscaleLoad and self.Tier < len(self.Tiers) - 1:
+            self.FramesWithHeadroom += 1
+            if self.FramesWithHeadroom >= self.WindowFrames * (2 ** min(self.TierFailures[self.Tier + 1], 5)):
+                self.Reason = f"{Bound} {FrameTime * 1000:.1f} MS UNDER {FrameBudget * self.UpscaleLoad * 1000:.1f} MS"
+                self.ApplyTier(self.Tier + 1)
+
+        else:
+            self.FramesWithHeadroom = 0
@@ -0,0 +1,76 @@
+from ..GameObject import GameObject
+
+import pygame, threading
+from pygame.locals import *
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+
+class RotationCacheHandler(GameObject):
+    def __init__(self, CacheBudget, PrewarmRotations):
+        # Registered sprites by name, each with the angle step its rotations are snapped to
+        self.Sprites = {}
+        self.AngleSteps = {}
+
+        # Rotated surfaces keyed by (name, snapped angle), least recently used first
+        self.CacheBudget = CacheBudget
+        self.CachedRotations = OrderedDict()
+        self.CachedBytes = 0
+        self.CacheLock = threading.Lock()
+
+        self.PrewarmRotations = PrewarmRotations
+        self.PrewarmWorker = ThreadPoolExecutor(max_workers = 1) if PrewarmRotations else None
+
+    def RegisterSprite(self, Name, Surface, AngleStep = 1.0, PrewarmRange = None):
+        self.Sprites[Name] = Surface
+        self.AngleSteps[Name] = AngleStep
+
+        if PrewarmRange is None or self.PrewarmWorker is None:
+            return
+
+        # Rotations expected soon are made on the worker thread, anything not ready yet is
+        # still made on first use
+        MinimumAngle, MaximumAngle = PrewarmRange
+        NumberAngles = int(round((MaximumAngle - MinimumAngle) / AngleStep)) + 1
+        self.PrewarmWorker.submit(self.Prewarm, Name, [MinimumAngle + Index * AngleStep for Index in range(NumberAngles)])
+
+    def Prewarm(self, Name, Angles):
+        for Angle in Angles:
+            Key = (Name, self.SnapAngle(Name, Angle))
+            with self.CacheLock:
+                if Key in self.CachedRotations:
+                    continue
+
+            self.StoreRotation(Key, pygame.transform.rotate(self.Sprites[Name], Key[1]))
+
+    def SnapAngle(self, Name, Angle):
+        AngleStep = self.AngleSteps[Name]
+        return round(Angle / AngleStep) * AngleStep
+
+    def GetRotation(self, Name, Angle):
+        Key = (Name, self.SnapAngle(Name, Angle))
+
+        with self.CacheLock:
+            RotatedSurface = self.CachedRotations.get(Key)
+            if RotatedSurface is not None:
+                self.CachedRotations.move_to_end(Key)
+                return RotatedSurface
+
+        return self.StoreRotation(Key, pygame.transform.rotate(self.Sprites[Key[0]], Key[1]))
+
+    def StoreRotation(self, Key, RotatedSurface):
+        with self.CacheLock:
+            # Another thread may have made the same rotation in the meantime
+            if Key in self.CachedRotations:
+                return self.CachedRotations[Key]
+
+            self.CachedRotations[Key] = RotatedSurface
+            self.CachedBytes += self.SurfaceBytes(RotatedSurface)
+
+            while self.CachedBytes > self.CacheBudget and len(self.CachedRotations) > 1:
+                EvictedKey, EvictedSurface = self.CachedRotations.popitem(last = False)
+                self.CachedBytes -= self.SurfaceBytes(EvictedSurface)
+
+        return RotatedSurface
+
+    def SurfaceBytes(self, Surface):
+        return Surface.get_width() * Surface.get_height() * Surface.get_bytesize()
@@ -0,0 +1,56 @@
+from ..GameObject import GameObject
+
+class FixedStep:
+    def __init__(self, Name, Rate, Step):
+        self.Name = Name
+        self.StepTime = 1 / Rate
+        self.Step = Step
+
+        # Time that has passed but not been stepped yet, always less than a step after an update.
+        # It starts a full step in so every simulation has stepped by the first frame it draws.
+        self.Accumulator = self.StepTime
+        self.StepsTaken = 0
+        self.DroppedSteps = 0
+
+    @property
+    def Alpha(self):
+        # How far rendering is between the last two steps, 0 draws the older state and 1 the newer
+        return min(self.Accumulator / self.StepTime, 1.0)
+
+class SchedulerHandler(GameObject):
+    # Steps within this fraction of a step count as due, so a frame exactly one step long isn't
+    # left a rounding error short and stepped twice the next frame
+    StepTolerance = 1e-6
+
+    def __init__(self, Rates, MaximumSteps):
+        # Steps per second for every simulation, each one runs on its own accumulator
+        self.Rates = Rates
+        self.MaximumSteps = MaximumSteps
+        self.Simulations = {}
+
+    def Add(self, Name, Step):
+        # Step is called with the fixed step time whenever a step is due
+        Simulation = self.Simulations[Name] = FixedStep(Name, self.Rates[Name], Step)
+        return Simulation
+
+    def Update(self, DeltaTime):
+        for Simulation in self.Simulations.values():
+            Simulation.Accumulator += DeltaTime
+            Simulation.StepsTaken = 0
+
+            while Simulation.Accumulator >= Simulation.StepTime * (1 - self.StepTolerance):
+                # After a long hitch only a few steps are caught up, the rest of the time is dropped
+                # so a slow frame doesn't make the next one slower still
+                if Simulation.StepsTaken == self.MaximumSteps:
+                    DroppedSteps = int(Simulation.Accumulator // Simulation.StepTime)
+                    Simulation.DroppedSteps += DroppedSteps
+                    Simulation.Accumulator -= DroppedSteps * Simulation.StepTime
+                    break
+
+                with self.Game.Profiler.Section(f"{Simulation.Name}Step"):
+                    Simulation.Step(Simulation.StepTime)
+
+                Simulation.Accumulator -= Simulation.StepTime
+                Simulation.StepsTaken += 1
+
+            Simulation.Accumulator = max(Simulation.Accumulator, 0.0)
@@ -19,3 +19,53 @@ class SettingsHandler:
 
         self.ShowDebug = SettingsData["ShowDebug"]
         self.FpsCap = SettingsData["FpsCap"]
+
+        # Zero uses every core for the threaded simulations
+        self.SimulationThreads = SettingsData["SimulationThreads"] or os.cpu_count() or 1
+
+        # Steps per second for each simulation, and how many steps one frame may catch up on
+        self.SimulationRates = SettingsData["SimulationRates"]
+        self.MaximumSimulationSteps = SettingsData["MaximumSimulationSteps"]
+
+        # Seeds the terrain, kelp and fish layout, None picks a new one every run
+        self.RandomSeed = SettingsData["RandomSeed"]
+
+        # Off screen fish only step once every this many steps
+        self.OffscreenUpdateInterval = SettingsData["OffscreenUpdateInterval"]
+
+        # Memory kept for terrain chunks that have scrolled out of view
+        self.TerrainCacheMegabytes = SettingsData["TerrainCacheMegabytes"]
+
+        # Memory for rotated sprites, prewarming makes the common angles on a background thread
+        self.RotationCacheMegabytes = SettingsData["RotationCacheMegabytes"]
+        self.PrewarmRotations = SettingsData["PrewarmRotations"]
+
+        # Layers go through orphaned pixel buffers, software drivers are faster writing them directly
+        self.StreamLayerUploads = SettingsData["StreamLayerUploads"]
+
+        # Fish, boat and lantern drawn in one instanced draw, otherwise blitted from the rotation cache
+        self.GpuSprites = SettingsData["GpuSprites"]
+
+        # Fog and caustics sample noise textures baked at startup instead of computing it per pixel
+        self.BakedNoise = SettingsData["BakedNoise"]
+
+        # Fog and caustics drawn at this fraction of the scene resolution, once every this many frames
+        self.EffectsResolutionDivisor = SettingsData["EffectsResolutionDivisor"]
+        self.EffectsRefreshInterval = SettingsData["EffectsRefreshInterval"]
+
+        # Presets from lowest to highest quality, stepped through when the frame misses the FpsCap budget
+        self.AdaptiveQuality = SettingsData["AdaptiveQuality"]
+        self.QualityTiers = SettingsData["QualityTiers"]
+
+        # "Scene" or "Screen" records every frame to CaptureDirectory, empty turns capturing off.
+        # CaptureDropFrames only applies to png, raw captures always wait so the timing holds
+        self.CaptureSource = SettingsData["CaptureSource"]
+        self.CaptureFormat = SettingsData["CaptureFormat"]
+        self.CaptureDirectory = SettingsData["CaptureDirectory"]
+        self.CaptureQueueFrames = SettingsData["CaptureQueueFrames"]
+        self.CaptureDropFrames = SettingsData["CaptureDropFrames"]
+
+        # Per section frame times for the debug menu, F3 saves the last ProfileFrames frames as a trace
+        self.Profiling = SettingsData["Profiling"]
+        self.ProfileFrames = SettingsData["ProfileFrames"]
+        self.TraceDirectory = SettingsData["TraceDirectory"]
@@ -0,0 +1,68 @@
+import moderngl as mgl
+import math
+
+class NoiseTextures:
+    def __init__(self, Context, QuadBuffer, ValueNoisePeriod = 8, ValueNoiseSize = 1024, CausticsPeriod = 16, CausticsSize = 256, CausticsFrames = 64, CausticsEdgeWidth = 0.015):
+        self.Context = Context
+
+        with open(f"Shaders/Vertex.glsl") as file:
+            VertexShader = file.read()
+        with open(f"Shaders/NoiseBake.glsl") as file:
+            BakeFragmentShader = file.read()
+
+        BakeProgram = self.Context.program(vertex_shader=VertexShader, fragment_shader=BakeFragmentShader)
+        BakeRenderObject = self.Context.vertex_array(BakeProgram, [(QuadBuffer, "2f 2f", "Vertex", "TextureCoordinate")])
+
+        # Fractal value noise, rendered straight into the texture the scene samples
+        self.ValueNoiseTexture = self.Context.texture([ValueNoiseSize, ValueNoiseSize], 1, dtype="f2")
+        self.ValueNoiseTexture.filter = (mgl.LINEAR, mgl.LINEAR)
+        self.ValueNoisePeriod = ValueNoisePeriod
+
+        BakeFrameBuffer = self.Context.framebuffer(color_attachments=[self.ValueNoiseTexture])
+        BakeFrameBuffer.use()
+        self.Context.viewport = (0, 0, ValueNoiseSize, ValueNoiseSize)
+        BakeProgram["BakeMode"] = 0
+        BakeProgram["Period"] = ValueNoisePeriod
+        BakeRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+        BakeFrameBuffer.release()
+
+        # Caustic line coverage, the voronoi cell centres move with sin(Time) so one period of the
+        # animation is baked frame by frame into the slices of a 3D texture
+        self.CausticsTexture = self.Context.texture3d([CausticsSize, CausticsSize, CausticsFrames], 1, dtype="f2")
+        self.CausticsTexture.filter = (mgl.LINEAR, mgl.LINEAR)
+        self.CausticsPeriod = CausticsPeriod
+
+        FrameTexture = self.Context.texture([CausticsSize, CausticsSize], 1, dtype="f2")
+        BakeFrameBuffer = self.Context.framebuffer(color_attachments=[FrameTexture])
+        BakeFrameBuffer.use()
+        self.Context.viewport = (0, 0, CausticsSize, CausticsSize)
+        BakeProgram["BakeMode"] = 1
+        BakeProgram["Period"] = CausticsPeriod
+        BakeProgram["TexelSize"] = CausticsPeriod / CausticsSize
+        BakeProgram["EdgeWidth"] = CausticsEdgeWidth
+
+        for Frame in range(CausticsFrames):
+            BakeProgram["BakeTime"] = 2 * math.pi * Frame / CausticsFrames
+            BakeRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+            self.CausticsTexture.write(FrameTexture.read(), viewport=(0, 0, Frame, CausticsSize, CausticsSize, 1))
+
+        BakeFrameBuffer.release()
+        FrameTexture.release()
+        BakeRenderObject.release()
+        BakeProgram.release()
+
+    def Use(self, Program, ValueNoiseLocation, CausticsLocation):
+        # Programs built at a lower effects tier leave out the noise they don't sample
+        if Program.get("ValueNoiseTexture", None) is not None:
+            self.ValueNoiseTexture.use(ValueNoiseLocation)
+            Program["ValueNoiseTexture"] = ValueNoiseLocation
+            Program["ValueNoisePeriod"] = self.ValueNoisePeriod
+
+        if Program.get("CausticsTexture", None) is not None:
+            self.CausticsTexture.use(CausticsLocation)
+            Program["CausticsTexture"] = CausticsLocation
+            Program["CausticsPeriod"] = self.CausticsPeriod
+
+    def Release(self):
+        self.ValueNoiseTexture.release()
+        self.CausticsTexture.release()
@@ -0,0 +1,967 @@
+import math, random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Pure python / numpy port of the native Simulations module (Scripts/CppSource), it has the same
+# classes, arguments and attribute names so the game runs anywhere numpy does. Boids are stored as
+# structure of arrays and verlet constraints are solved in batches, results match the native module
+# up to floating point ordering. Selected in Scripts/CppBuild/__init__.py.
+
+#############################
+#           Vec2            #
+#############################
+
+class Vec2:
+    __slots__ = ("x", "y")
+
+    def __init__(self, *Arguments):
+        if len(Arguments) == 0:
+            self.x, self.y = 0.0, 0.0
+        elif len(Arguments) == 2:
+            self.x, self.y = float(Arguments[0]), float(Arguments[1])
+        elif isinstance(Arguments[0], (int, float)):
+            self.x = self.y = float(Arguments[0])
+        else:
+            Values = list(Arguments[0])
+            if len(Values) != 2:
+                raise ValueError("Vec2 must be initialized with a vector of size 2")
+            self.x, self.y = float(Values[0]), float(Values[1])
+
+    # Indexing (allows for vec[0], vec[1])
+    def __getitem__(self, Index):
+        if Index == 0: return self.x
+        if Index == 1: return self.y
+        raise IndexError("Vec2 index out of range")
+
+    def __setitem__(self, Index, Value):
+        if Index == 0: self.x = float(Value)
+        elif Index == 1: self.y = float(Value)
+        else: raise IndexError("Vec2 index out of range")
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __len__(self):
+        return 2
+
+    # Arithmetic operators, arrays on the right are left to Vec2Array
+    def __add__(self, Other):
+        if isinstance(Other, Vec2): return Vec2(self.x + Other.x, self.y + Other.y)
+        if isinstance(Other, Vec2Array): return NotImplemented
+        return Vec2(self.x + Other, self.y + Other)
+
+    def __radd__(self, Other):
+        return Vec2(Other + self.x, Other + self.y)
+
+    def __sub__(self, Other):
+        if isinstance(Other, Vec2): return Vec2(self.x - Other.x, self.y - Other.y)
+        if isinstance(Other, Vec2Array): return NotImplemented
+        return Vec2(self.x - Other, self.y - Other)
+
+    def __rsub__(self, Other):
+        return Vec2(Other - self.x, Other - self.y)
+
+    def __mul__(self, Other):
+        if isinstance(Other, Vec2): return Vec2(self.x * Other.x, self.y * Other.y)
+        if isinstance(Other, Vec2Array): return NotImplemented
+        return Vec2(self.x * Other, self.y * Other)
+
+    def __rmul__(self, Other):
+        return Vec2(Other * self.x, Other * self.y)
+
+    def __truediv__(self, Other):
+        if isinstance(Other, Vec2): return Vec2(self.x / Other.x, self.y / Other.y)
+        if isinstance(Other, Vec2Array): return NotImplemented
+        return Vec2(self.x / Other, self.y / Other)
+
+    def __rtruediv__(self, Other):
+        return Vec2(Other / self.x, Other / self.y)
+
+    def __mod__(self, Other):
+        if isinstance(Other, Vec2): return Vec2(math.fmod(self.x, Other.x), math.fmod(self.y, Other.y))
+        return Vec2(math.fmod(self.x, Other), math.fmod(self.y, Other))
+
+    def __neg__(self):
+        return Vec2(-self.x, -self.y)
+
+    # In place operators
+    def __iadd__(self, Other):
+        if isinstance(Other, Vec2): self.x += Other.x; self.y += Other.y
+        else: self.x += Other; self.y += Other
+        return self
+
+    def __isub__(self, Other):
+        if isinstance(Other, Vec2): self.x -= Other.x; self.y -= Other.y
+        else: self.x -= Other; self.y -= Other
+        return self
+
+    def __imul__(self, Other):
+        if isinstance(Other, Vec2): self.x *= Other.x; self.y *= Other.y
+        else: self.x *= Other; self.y *= Other
+        return self
+
+    def __itruediv__(self, Other):
+        if isinstance(Other, Vec2): self.x /= Other.x; self.y /= Other.y
+        else: self.x /= Other; self.y /= Other
+        return self
+
+    def __imod__(self, Other):
+        if isinstance(Other, Vec2): self.x = math.fmod(self.x, Other.x); self.y = math.fmod(self.y, Other.y)
+        else: self.x = math.fmod(self.x, Other); self.y = math.fmod(self.y, Other)
+        return self
+
+    # Utility methods
+    def copy(self):
+        return Vec2(self.x, self.y)
+
+    def Clamp(self, MinValue, MaxValue):
+        if isinstance(MinValue, Vec2):
+            self.x = max(MinValue.x, min(self.x, MaxValue.x))
+            self.y = max(MinValue.y, min(self.y, MaxValue.y))
+        else:
+            self.x = max(MinValue, min(self.x, MaxValue))
+            self.y = max(MinValue, min(self.y, MaxValue))
+        return self
+
+    def Length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def Normalize(self):
+        Length = self.Length()
+        if Length == 0.0:
+            return Vec2(0.0, 0.0)
+        return Vec2(self.x / Length, self.y / Length)
+
+    def DistanceTo(self, Other):
+        return Vec2(self.x - Other.x, self.y - Other.y).Length()
+
+    def Dot(self, Other):
+        return self.x * Other.x + self.y * Other.y
+
+    def ToTuple(self):
+        return (self.x, self.y)
+
+    # String representation
+    def __repr__(self):
+        return f"Vec2({self.x:f}, {self.y:f})"
+
+    __str__ = __repr__
+
+#############################
+#         Vec2Array         #
+#############################
+
+def Vec2ArrayOperand(Other):
+    # Vectors broadcast over every row, arrays line up row by row
+    if isinstance(Other, Vec2Array):
+        return Other.Array
+    if isinstance(Other, Vec2):
+        return np.array((Other.x, Other.y))
+    return Other
+
+class Vec2Array:
+    # An (N, 2) float64 array, numpy reads it without copying through __array__ and python 3.12+
+    # through __buffer__. The size is fixed once made like the native Vec2Array.
+    __slots__ = ("Array",)
+
+    def __init__(self, Values = 0):
+        if isinstance(Values, int):
+            self.Array = np.zeros((Values, 2))
+            return
+
+        if isinstance(Values, list) and Values and isinstance(Values[0], Vec2):
+            Values = [(Vector.x, Vector.y) for Vector in Values]
+
+        self.Array = np.array(Values, dtype=np.float64)
+        if self.Array.size == 0:
+            self.Array = self.Array.reshape(0, 2)
+        if self.Array.ndim != 2 or self.Array.shape[1] != 2:
+            raise ValueError("Vec2Array must be initialized with a size, a list of Vec2 or an (N, 2) array")
+
+    @classmethod
+    def Wrap(cls, Array):
+        Vectors = cls.__new__(cls)
+        Vectors.Array = Array
+        return Vectors
+
+    def __array__(self, dtype = None, copy = None):
+        return self.Array if dtype is None else self.Array.astype(dtype)
+
+    def __buffer__(self, Flags):
+        return memoryview(self.Array)
+
+    # Indexing returns copies, write back with __setitem__
+    def __getitem__(self, Index):
+        PositionX, PositionY = self.Array[Index].tolist()
+        return Vec2(PositionX, PositionY)
+
+    def __setitem__(self, Index, Value):
+        self.Array[Index] = (Value.x, Value.y)
+
+    def __iter__(self):
+        return (Vec2(PositionX, PositionY) for PositionX, PositionY in self.Array.tolist())
+
+    def __len__(self):
+        return len(self.Array)
+
+    # Arithmetic operators
+    def __add__(self, Other):
+        return Vec2Array.Wrap(self.Array + Vec2ArrayOperand(Other))
+
+    def __radd__(self, Other):
+        return Vec2Array.Wrap(Vec2ArrayOperand(Other) + self.Array)
+
+    def __sub__(self, Other):
+        return Vec2Array.Wrap(self.Array - Vec2ArrayOperand(Other))
+
+    def __rsub__(self, Other):
+        return Vec2Array.Wrap(Vec2ArrayOperand(Other) - self.Array)
+
+    def __mul__(self, Other):
+        return Vec2Array.Wrap(self.Array * Vec2ArrayOperand(Other))
+
+    def __rmul__(self, Other):
+        return Vec2Array.Wrap(Vec2ArrayOperand(Other) * self.Array)
+
+    def __truediv__(self, Other):
+        return Vec2Array.Wrap(self.Array / Vec2ArrayOperand(Other))
+
+    def __rtruediv__(self, Other):
+        return Vec2Array.Wrap(Vec2ArrayOperand(Other) / self.Array)
+
+    def __neg__(self):
+        return Vec2Array.Wrap(-self.Array)
+
+    # In place operators write into the same array so numpy views of it see the change
+    def __iadd__(self, Other):
+        self.Array += Vec2ArrayOperand(Other)
+        return self
+
+    def __isub__(self, Other):
+        self.Array -= Vec2ArrayOperand(Other)
+        return self
+
+    def __imul__(self, Other):
+        self.Array *= Vec2ArrayOperand(Other)
+        return self
+
+    def __itruediv__(self, Other):
+        self.Array /= Vec2ArrayOperand(Other)
+        return self
+
+    # Utility methods
+    def copy(self):
+        return Vec2Array.Wrap(self.Array.copy())
+
+    def Clamp(self, MinValue, MaxValue):
+        np.clip(self.Array, Vec2ArrayOperand(MinValue), Vec2ArrayOperand(MaxValue), out=self.Array)
+        return self
+
+    def Lengths(self):
+        return np.hypot(self.Array[:, 0], self.Array[:, 1])
+
+    def Normalize(self):
+        return Vec2Array.Wrap(NormalizeArray(self.Array))
+
+    def ToNumpy(self):
+        return self.Array
+
+    def ToTuples(self):
+        return list(map(tuple, self.Array.tolist()))
+
+    # String representation
+    def __repr__(self):
+        return f"Vec2Array({len(self.Array)})"
+
+    __str__ = __repr__
+
+def NormalizeArray(Vectors):
+    # Row wise normalize of an (N, 2) array, zero length rows stay zero like Vec2.Normalize
+    Lengths = np.sqrt(np.einsum("ij,ij->i", Vectors, Vectors))
+    return np.divide(Vectors, Lengths[:, None], out = np.zeros_like(Vectors), where = Lengths[:, None] != 0)
+
+#############################
+#       Verlet Chain        #
+#############################
+
+def IntegrateVerletPoints(CurrentPositions, PreviousPositions, Movable, DeltaTime, Boyancy, VelocityDamping, VelocityMaximum):
+    Acceleration = 0.5 * Boyancy * DeltaTime * DeltaTime
+    Velocities = np.clip((CurrentPositions - PreviousPositions) * VelocityDamping, -VelocityMaximum, VelocityMaximum)
+    Velocities[:, 1] += Acceleration
+    Velocities[~Movable] = 0.0
+
+    PreviousPositions[Movable] = CurrentPositions[Movable]
+    CurrentPositions += Velocities
+
+def ApplyMouseCollisions(CurrentPositions, PointIndices, MousePosition, MouseRadius):
+    # Push points inside the mouse circle back onto its edge
+    MouseCenter = np.array([MousePosition.x, MousePosition.y])
+    Differences = CurrentPositions[PointIndices] - MouseCenter
+    Distances = np.sqrt(np.einsum("ij,ij->i", Differences, Differences))
+
+    Inside = Distances - MouseRadius < 0
+    if not Inside.any():
+        return
+
+    CurrentPositions[PointIndices[Inside]] = MouseCenter + NormalizeArray(Differences[Inside]) * MouseRadius
+
+def SolveConstraintBatch(CurrentPositions, StartIndices, Movable, DesiredDistances, MouseMask, MousePosition, MouseRadius):
+    # Solves a batch of links that share no points in one go, returns each link's error going in.
+    # MouseMask marks the points that collide with the mouse, None when nothing can
+    EndIndices = StartIndices + 1
+    PositionDifferences = CurrentPositions[StartIndices] - CurrentPositions[EndIndices]
+    Distances = np.sqrt(np.einsum("ij,ij->i", PositionDifferences, PositionDifferences))
+
+    DistanceErrors = DesiredDistances[StartIndices] - Distances
+    Corrections = NormalizeArray(PositionDifferences) * (DistanceErrors * 0.5)[:, None]
+
+    CurrentPositions[StartIndices] += Corrections * Movable[StartIndices, None]
+    CurrentPositions[EndIndices] -= Corrections * Movable[EndIndices, None]
+
+    if MouseMask is not None:
+        TouchedIndices = np.concatenate([StartIndices, EndIndices])
+        ApplyMouseCollisions(CurrentPositions, TouchedIndices[MouseMask[TouchedIndices]], MousePosition, MouseRadius)
+
+    return np.abs(DistanceErrors)
+
+def ChainBounds(CurrentPositions, ChainPointStarts):
+    # Bounding box of every chain, ChainPointStarts has one more entry than there are chains
+    return np.minimum.reduceat(CurrentPositions, ChainPointStarts[:-1]), np.maximum.reduceat(CurrentPositions, ChainPointStarts[:-1])
+
+def BoundsNearMouse(BoundsMin, BoundsMax, Paddings, MousePosition, MouseRadius):
+    # Closest point of each padded box to the mouse, inside the circle means they overlap
+    MouseCenter = np.array([MousePosition.x, MousePosition.y])
+    Differences = np.clip(MouseCenter, BoundsMin - Paddings[:, None], BoundsMax + Paddings[:, None]) - MouseCenter
+    return np.einsum("ij,ij->i", Differences, Differences) < MouseRadius * MouseRadius
+
+def CalculateBezierPoints(Points, CurvePoints, NumberDisplayPointsPerSegment):
+    # Display points of one chain, each segment is the start point followed by points along a
+    # quadratic bezier bent by that segment's curve point, the last chain point closes it off
+    StartPoints = Points[:-1, None, :]
+    EndPoints = Points[1:, None, :]
+    ControlPoints = (StartPoints + EndPoints) * 0.5 + CurvePoints[:, None, :]
+
+    Interpolators = (np.arange(NumberDisplayPointsPerSegment) + 1.0) / (NumberDisplayPointsPerSegment + 1.0)
+    Interpolators = Interpolators[None, :, None]
+
+    LerpStartToCurve = StartPoints + (ControlPoints - StartPoints) * Interpolators
+    LerpCurveToEnd = ControlPoints + (EndPoints - ControlPoints) * Interpolators
+    BezierPoints = LerpStartToCurve + (LerpCurveToEnd - LerpStartToCurve) * Interpolators
+
+    SegmentPoints = np.concatenate([StartPoints, BezierPoints], axis = 1).reshape(-1, 2)
+    return np.concatenate([SegmentPoints, Points[-1:]])
+
+# Solver defaults, chains stop iterating once every link is within the tolerance in pixels
+DefaultConstraintTolerance = 0.05
+DefaultMaximumIterations = 64
+
+class VerletChain:
+    def __init__(self, Position, NumberPoints, DesiredDistancePoints, NumberDisplayPointsPerSegment = 0):
+        self.NumberPoints = NumberPoints
+        self.DesiredDistancePoints = DesiredDistancePoints
+        self.NumberDisplayPointsPerSegment = NumberDisplayPointsPerSegment
+        self.NumberDisplayPoints = (NumberPoints - 1) * (NumberDisplayPointsPerSegment + 1) + 1
+
+        self.Boyancy = -15000.0
+        self.VelocityDamping = 0.75
+        self.VelocityMaximum = 10.0
+
+        # First node will be fixed
+        self.CurrentPositions = np.array([[Position.x, Position.y - DesiredDistancePoints * Index] for Index in range(NumberPoints)], dtype = np.float64)
+        self.PreviousPositions = self.CurrentPositions.copy()
+        self.Movable = np.arange(NumberPoints) != 0
+
+        self.DesiredDistances = np.full(NumberPoints, float(DesiredDistancePoints))
+        self.ConstraintBatches = [np.arange(0, NumberPoints - 1, 2), np.arange(1, NumberPoints - 1, 2)]
+
+        self.ConstraintTolerance = DefaultConstraintTolerance
+        self.MaximumIterations = DefaultMaximumIterations
+        self.LastIterations = 0
+        self.LastError = 0.0
+
+        self.InitializeKelpVisuals()
+
+    def InitializeKelpVisuals(self):
+        self.SegmentCurvePoints = np.array([[random.uniform(-10.0, 10.0), random.uniform(-10.0, 10.0)] for Index in range(self.NumberPoints - 1)]).reshape(-1, 2)
+        self.SegmentWidths = [random.randint(2, 4) for Index in range(self.NumberDisplayPoints)]
+        self.SegmentColorMultipliers = [random.uniform(0.75, 1.0) for Index in range(self.NumberDisplayPoints)]
+
+    def Update(self, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+        # Start with velocity position updates
+        IntegrateVerletPoints(self.CurrentPositions, self.PreviousPositions, self.Movable, DeltaTime, self.Boyancy, self.VelocityDamping, self.VelocityMaximum)
+
+        # Next do the chain constraints, rounded half away from zero like the native module
+        Iterations = min(int(math.floor(self.NumberPoints * 50 * DeltaTime + 0.5)), self.MaximumIterations)
+        self.LastIterations = 0
+        self.LastError = 0.0
+
+        MouseMask = None
+        if MouseClicking and BoundsNearMouse(*ChainBounds(self.CurrentPositions, np.array([0, self.NumberPoints])), np.array([float(self.DesiredDistancePoints)]), MousePosition, MouseRadius)[0]:
+            MouseMask = self.Movable
+
+        for Iteration in range(Iterations):
+            self.LastIterations = Iteration + 1
+            self.LastError = max((float(SolveConstraintBatch(self.CurrentPositions, StartIndices, self.Movable, self.DesiredDistances, MouseMask, MousePosition, MouseRadius).max()) for StartIndices in self.ConstraintBatches if len(StartIndices)), default = 0.0)
+
+            # Every link was already within tolerance going into this pass
+            if self.LastError < self.ConstraintTolerance:
+                break
+
+    def CalculateDisplayPoints(self):
+        DisplayPoints = CalculateBezierPoints(self.CurrentPositions, self.SegmentCurvePoints, self.NumberDisplayPointsPerSegment)
+        return [Vec2(PositionX, PositionY) for PositionX, PositionY in DisplayPoints.tolist()]
+
+class VerletWorld:
+    # Every chain's points and display data live in flat arrays, chain Index owns the points from
+    # ChainPointStarts[Index] to ChainPointStarts[Index + 1] and likewise for the display arrays
+    def __init__(self, Seed = None):
+        self.NumberChains = 0
+        self.NumberPoints = 0
+        self.NumberDisplayPoints = 0
+
+        # Curve points, widths and colours of new chains come from Seed, None picks a new one
+        self.Generator = random.Random(Seed)
+
+        self.Boyancy = -15000.0
+        self.VelocityDamping = 0.75
+        self.VelocityMaximum = 10.0
+
+        self.CurrentPositions = np.zeros((0, 2))
+        self.PreviousPositions = np.zeros((0, 2))
+        self.Movable = np.zeros(0, dtype = bool)
+        self.DesiredDistances = np.zeros(0)
+        self.SegmentCurvePoints = np.zeros((0, 2))
+
+        self.DisplayPoints = np.zeros((0, 2))
+        self.SegmentWidths = np.zeros(0, dtype = np.int32)
+        self.SegmentColorMultipliers = np.zeros(0, dtype = np.float32)
+
+        self.ChainPointStarts = [0]
+        self.ChainDisplayStarts = np.zeros(1, dtype = np.int32)
+        self.ChainDisplayPointsPerSegment = []
+        self.ChainDesiredDistances = np.zeros(0)
+
+        self.ConstraintTolerance = DefaultConstraintTolerance
+        self.MaximumIterations = DefaultMaximumIterations
+
+        # Solver counters from the last update, one entry per chain
+        self.ChainIterations = np.zeros(0, dtype = np.int32)
+        self.ChainErrors = np.zeros(0, dtype = np.float32)
+
+        # Chains outside the view go to sleep once they have been still for SleepFrames updates,
+        # they wake when the mouse reaches them or they come back into view
+        self.ViewMin = np.array([-np.inf, -np.inf])
+        self.ViewMax = np.array([np.inf, np.inf])
+        self.SleepSpeed = 0.05
+        self.SleepFrames = 60
+
+        self.ChainBoundsMin = np.zeros((0, 2))
+        self.ChainBoundsMax = np.zeros((0, 2))
+        self.ChainStillFrames = np.zeros(0, dtype = np.int64)
+        self.ChainVisible = np.zeros(0, dtype = np.uint8)
+        self.ChainSleeping = np.zeros(0, dtype = np.uint8)
+
+    def __len__(self):
+        return self.NumberChains
+
+    def AddChain(self, Position, NumberPoints, DesiredDistancePoints, NumberDisplayPointsPerSegment):
+        NumberChainDisplayPoints = (NumberPoints - 1) * (NumberDisplayPointsPerSegment + 1) + 1
+
+        # First node will be fixed
+        ChainPositions = np.array([[Position.x, Position.y - DesiredDistancePoints * Index] for Index in range(NumberPoints)], dtype = np.float64)
+        self.CurrentPositions = np.concatenate([self.CurrentPositions, ChainPositions])
+        self.PreviousPositions = np.concatenate([self.PreviousPositions, ChainPositions])
+        self.Movable = np.concatenate([self.Movable, np.arange(NumberPoints) != 0])
+        self.DesiredDistances = np.concatenate([self.DesiredDistances, np.full(NumberPoints, float(DesiredDistancePoints))])
+
+        # Curve points are per segment, padded to one per point so they share the point offsets
+        CurvePoints = np.array([[self.Generator.uniform(-10.0, 10.0), self.Generator.uniform(-10.0, 10.0)] for Index in range(NumberPoints)])
+        self.SegmentCurvePoints = np.concatenate([self.SegmentCurvePoints, CurvePoints])
+
+        Widths = np.array([self.Generator.randint(2, 4) for Index in range(NumberChainDisplayPoints)], dtype = np.int32)
+        ColorMultipliers = np.array([self.Generator.uniform(0.75, 1.0) for Index in range(NumberChainDisplayPoints)], dtype = np.float32)
+        self.SegmentWidths = np.concatenate([self.SegmentWidths, Widths])
+        self.SegmentColorMultipliers = np.concatenate([self.SegmentColorMultipliers, ColorMultipliers])
+        self.DisplayPoints = np.concatenate([self.DisplayPoints, np.zeros((NumberChainDisplayPoints, 2))])
+
+        self.NumberPoints += NumberPoints
+        self.NumberDisplayPoints += NumberChainDisplayPoints
+        self.ChainPointStarts.append(self.NumberPoints)
+        self.ChainDisplayStarts = np.append(self.ChainDisplayStarts, np.int32(self.NumberDisplayPoints))
+        self.ChainDisplayPointsPerSegment.append(NumberDisplayPointsPerSegment)
+        self.ChainDesiredDistances = np.append(self.ChainDesiredDistances, float(DesiredDistancePoints))
+        self.ChainIterations = np.append(self.ChainIterations, np.int32(0))
+        self.ChainErrors = np.append(self.ChainErrors, np.float32(0.0))
+        self.ChainStillFrames = np.append(self.ChainStillFrames, 0)
+        self.ChainVisible = np.append(self.ChainVisible, np.uint8(1))
+        self.ChainSleeping = np.append(self.ChainSleeping, np.uint8(0))
+        self.ChainBoundsMin = np.concatenate([self.ChainBoundsMin, ChainPositions.min(axis = 0)[None]])
+        self.ChainBoundsMax = np.concatenate([self.ChainBoundsMax, ChainPositions.max(axis = 0)[None]])
+        self.NumberChains += 1
+
+        self.BuildSolverBatches()
+        self.CalculateDisplayPoints()
+        return self.NumberChains - 1
+
+    def BuildSolverBatches(self):
+        # Even and odd links of every chain, tagged with their chain so each chain can stop
+        # iterating on its own like the native solver
+        BatchStarts = [[], []]
+        BatchChains = [[], []]
+        ChainLastPoints = []
+
+        # Display points are grouped by points per segment so each group is one vectorized bezier
+        DisplayGroups = {}
+
+        for Chain in range(self.NumberChains):
+            ChainStart = self.ChainPointStarts[Chain]
+            ChainLength = self.ChainPointStarts[Chain + 1] - ChainStart
+            PointsPerSegment = self.ChainDisplayPointsPerSegment[Chain]
+
+            for Index in range(ChainLength - 1):
+                BatchStarts[Index % 2].append(ChainStart + Index)
+                BatchChains[Index % 2].append(Chain)
+
+            DisplayStart = int(self.ChainDisplayStarts[Chain])
+            SegmentChains, SegmentStarts, OutputStarts = DisplayGroups.setdefault(PointsPerSegment, ([], [], []))
+            SegmentChains.extend([Chain] * (ChainLength - 1))
+            SegmentStarts.extend(range(ChainStart, ChainStart + ChainLength - 1))
+            OutputStarts.extend(range(DisplayStart, DisplayStart + (ChainLength - 1) * (PointsPerSegment + 1), PointsPerSegment + 1))
+            ChainLastPoints.append(self.ChainPointStarts[Chain + 1] - 1)
+
+        self.ConstraintBatches = [np.array(Starts, dtype = np.intp) for Starts in BatchStarts]
+        self.ConstraintBatchChains = [np.array(Chains, dtype = np.intp) for Chains in BatchChains]
+        self.ChainLengths = np.diff(self.ChainPointStarts)
+
+        self.DisplayGroups = []
+        for PointsPerSegment, (SegmentChains, SegmentStarts, OutputStarts) in DisplayGroups.items():
+            OutputIndices = np.array(OutputStarts, dtype = np.intp)[:, None] + np.arange(PointsPerSegment + 1)
+            self.DisplayGroups.append((PointsPerSegment, np.array(SegmentChains, dtype = np.intp), np.array(SegmentStarts, dtype = np.intp), OutputIndices))
+
+        self.ChainLastPoints = np.array(ChainLastPoints, dtype = np.intp)
+
+    def SetView(self, ViewMin, ViewMax):
+        self.ViewMin = np.array([ViewMin.x, ViewMin.y])
+        self.ViewMax = np.array([ViewMax.x, ViewMax.y])
+
+    def Update(self, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+        if not self.NumberChains:
+            return
+
+        # Padded by a link length to cover the curved display points and line widths
+        Paddings = self.ChainDesiredDistances[:, None]
+        Visible = np.all((self.ChainBoundsMax + Paddings >= self.ViewMin) & (self.ChainBoundsMin - Paddings <= self.ViewMax), axis = 1)
+        self.ChainVisible[:] = Visible
+
+        # Chains whose padded bounding box misses the mouse skip the collision tests
+        ChainsInRange = np.zeros(self.NumberChains, dtype = bool)
+        if MouseClicking:
+            ChainsInRange = BoundsNearMouse(self.ChainBoundsMin, self.ChainBoundsMax, self.ChainDesiredDistances, MousePosition, MouseRadius)
+
+        Waking = Visible | ChainsInRange
+        self.ChainSleeping[Waking] = 0
+        self.ChainStillFrames[Waking] = 0
+
+        AwakeChains = self.ChainSleeping == 0
+        AwakePoints = np.repeat(AwakeChains, self.ChainLengths)
+
+        # Start with velocity position updates
+        IntegrateVerletPoints(self.CurrentPositions, self.PreviousPositions, self.Movable & AwakePoints, DeltaTime, self.Boyancy, self.VelocityDamping, self.VelocityMaximum)
+
+        # Chains get different iteration counts and converge at different times, each pass only
+        # solves the links of chains that are still iterating
+        IterationLimits = np.minimum(np.floor(self.ChainLengths * 50 * DeltaTime + 0.5).astype(np.int64), self.MaximumIterations)
+        IterationLimits[~AwakeChains] = 0
+        ActiveChains = IterationLimits > 0
+        self.ChainIterations[:] = 0
+        self.ChainErrors[AwakeChains] = 0.0
+
+        MouseMask = None
+        if (ChainsInRange & AwakeChains).any():
+            MouseMask = self.Movable & np.repeat(ChainsInRange, self.ChainLengths)
+
+        for Iteration in range(int(IterationLimits.max(initial = 0))):
+            ChainErrors = np.zeros(self.NumberChains)
+
+            for StartIndices, LinkChains in zip(self.ConstraintBatches, self.ConstraintBatchChains):
+                ActiveLinks = ActiveChains[LinkChains]
+                if ActiveLinks.any():
+                    LinkErrors = SolveConstraintBatch(self.CurrentPositions, StartIndices[ActiveLinks], self.Movable, self.DesiredDistances, MouseMask, MousePosition, MouseRadius)
+                    np.maximum.at(ChainErrors, LinkChains[ActiveLinks], LinkErrors)
+
+            self.ChainIterations[ActiveChains] += 1
+            self.ChainErrors[ActiveChains] = ChainErrors[ActiveChains]
+
+            # Every link of a chain was already within tolerance going into this pass
+            ActiveChains &= (ChainErrors >= self.ConstraintTolerance) & (IterationLimits > Iteration + 1)
+            if not ActiveChains.any():
+                break
+
+        BoundsMin, BoundsMax = ChainBounds(self.CurrentPositions, np.array(self.ChainPointStarts))
+        self.ChainBoundsMin[AwakeChains] = BoundsMin[AwakeChains]
+        self.ChainBoundsMax[AwakeChains] = BoundsMax[AwakeChains]
+
+        # Only a chain nobody can see is allowed to fall asleep
+        PointSpeeds = np.sqrt(np.einsum("ij,ij->i", self.CurrentPositions - self.PreviousPositions, self.CurrentPositions - self.PreviousPositions))
+        Still = np.maximum.reduceat(PointSpeeds, self.ChainPointStarts[:-1]) < self.SleepSpeed
+
+        Settling = AwakeChains & ~Visible
+        self.ChainStillFrames[Settling] = np.where(Still[Settling], self.ChainStillFrames[Settling] + 1, 0)
+        self.ChainSleeping[Settling] = self.ChainStillFrames[Settling] >= self.SleepFrames
+
+    def CalculateDisplayPoints(self):
+        # Written into the same buffer every time so existing references see the new values,
+        # chains out of view are skipped and catch up once they are visible again
+        Visible = self.ChainVisible != 0
+
+        for PointsPerSegment, SegmentChains, SegmentStarts, OutputIndices in self.DisplayGroups:
+            SegmentStarts = SegmentStarts[Visible[SegmentChains]]
+            OutputIndices = OutputIndices[Visible[SegmentChains]]
+
+            StartPoints = self.CurrentPositions[SegmentStarts][:, None, :]
+            EndPoints = self.CurrentPositions[SegmentStarts + 1][:, None, :]
+            ControlPoints = (StartPoints + EndPoints) * 0.5 + self.SegmentCurvePoints[SegmentStarts][:, None, :]
+
+            Interpolators = ((np.arange(PointsPerSegment) + 1.0) / (PointsPerSegment + 1.0))[None, :, None]
+            LerpStartToCurve = StartPoints + (ControlPoints - StartPoints) * Interpolators
+            LerpCurveToEnd = ControlPoints + (EndPoints - ControlPoints) * Interpolators
+            BezierPoints = LerpStartToCurve + (LerpCurveToEnd - LerpStartToCurve) * Interpolators
+
+            self.DisplayPoints[OutputIndices] = np.concatenate([StartPoints, BezierPoints], axis = 1)
+
+        self.DisplayPoints[self.ChainDisplayStarts[1:][Visible] - 1] = self.CurrentPositions[self.ChainLastPoints[Visible]]
+
+#############################
+#           Boids           #
+#############################
+
+class BoidSettings:
+    # Shared defaults of the boid rules, Boid and Flock both carry these as attributes
+    def __init__(self, BoundsMin, BoundsMax, BoundsMargin):
+        self.BoundsMin = Vec2(BoundsMin.x, BoundsMin.y)
+        self.BoundsMax = Vec2(BoundsMax.x, BoundsMax.y)
+        self.BoundsMargin = float(BoundsMargin)
+
+        self.Speed = 175.0
+
+        self.AlignmentRadius = 100.0
+        self.CohesionRadius = 100.0
+        self.SeperationRadius = 75.0
+
+        self.AlignmentFactor = 0.75
+        self.CohesionFactor = 1.0
+        self.SeperationFactor = 0.95
+
+        self.TurnFactorRules = 5.0
+        self.TurnFactorCollisions = 15.0
+
+    def NeighbourRadius(self):
+        return max(self.AlignmentRadius, self.CohesionRadius, self.SeperationRadius)
+
+def RandomBoidStates(Settings, NumberBoids, Generator = np.random):
+    Positions = np.column_stack([
+        Generator.uniform(Settings.BoundsMin.x, Settings.BoundsMax.x, NumberBoids),
+        Generator.uniform(Settings.BoundsMin.y, Settings.BoundsMax.y, NumberBoids),
+    ])
+    Directions = NormalizeArray(Generator.uniform(-1.0, 1.0, (NumberBoids, 2)))
+    return Positions, Directions
+
+def ApplyRulesArrays(Settings, Positions, Directions, NeighbourPositions, NeighbourDirections, NeighbourMask):
+    # Separation, cohesion and alignment for every row of Positions against the neighbour arrays,
+    # NeighbourMask is (Rows, Neighbours) and is False where a boid would be compared with itself
+    PositionDifferences = NeighbourPositions[None, :, :] - Positions[:, None, :]
+    DistancesSquared = np.einsum("rnk,rnk->rn", PositionDifferences, PositionDifferences)
+
+    Seperation = (DistancesSquared < Settings.SeperationRadius ** 2) & NeighbourMask
+    Cohesion = (DistancesSquared < Settings.CohesionRadius ** 2) & NeighbourMask
+    Alignment = (DistancesSquared < Settings.AlignmentRadius ** 2) & NeighbourMask
+
+    Distances = np.sqrt(DistancesSquared)
+    UnitDifferences = np.divide(PositionDifferences, Distances[:, :, None], out = np.zeros_like(PositionDifferences), where = Distances[:, :, None] != 0)
+
+    SeperationCount = Seperation.sum(axis = 1)[:, None]
+    CohesionCount = Cohesion.sum(axis = 1)[:, None]
+    AlignmentCount = Alignment.sum(axis = 1)[:, None] + 1
+
+    SeperationDirection = np.einsum("rn,rnk->rk", Seperation.astype(np.float64), UnitDifferences)
+    CohesionDirection = Cohesion.astype(np.float64) @ NeighbourPositions
+    AlignmentDirection = Directions + Alignment.astype(np.float64) @ NeighbourDirections
+
+    SeperationDirection = np.where(
+        SeperationCount > 0,
+        NormalizeArray(SeperationDirection / np.maximum(SeperationCount, 1)) * (-Settings.SeperationFactor),
+        0.0,
+    )
+    CohesionDirection = np.where(
+        CohesionCount > 0,
+        NormalizeArray(CohesionDirection / np.maximum(CohesionCount, 1) - Positions) * Settings.CohesionFactor,
+        0.0,
+    )
+    AlignmentDirection = NormalizeArray(AlignmentDirection / AlignmentCount) * Settings.AlignmentFactor
+
+    return NormalizeArray(AlignmentDirection + CohesionDirection + SeperationDirection)
+
+def ApplyCollisionsArrays(Settings, Positions, Directions, MouseClicking, MousePosition, MouseRadius):
+    # Wraps Positions horizontally in place and returns the collision steering direction of each boid
+    PositionsX = Positions[:, 0]
+    PositionsX[PositionsX < Settings.BoundsMin.x - Settings.BoundsMargin] = Settings.BoundsMax.x + Settings.BoundsMargin
+    PositionsX[PositionsX > Settings.BoundsMax.x + Settings.BoundsMargin] = Settings.BoundsMin.x - Settings.BoundsMargin
+
+    CollisionDirections = np.zeros_like(Positions)
+    Resolved = np.zeros(len(Positions), dtype = bool)
+
+    # Bounce vertically
+    BelowTop = Positions[:, 1] < Settings.BoundsMin.y + Settings.BoundsMargin
+    CollisionDirections[BelowTop] = [0.0, 1.0]
+    Resolved |= BelowTop
+
+    AboveBottom = ~Resolved & (Positions[:, 1] > Settings.BoundsMax.y - Settings.BoundsMargin)
+    CollisionDirections[AboveBottom] = [0.0, -1.0]
+    Resolved |= AboveBottom
+
+    if not MouseClicking:
+        return CollisionDirections
+
+    # If inside mouse circle, flee
+    MouseCenter = np.array([MousePosition.x, MousePosition.y])
+    CircleToPositions = Positions - MouseCenter
+    CircleDistancesSquared = np.einsum("ij,ij->i", CircleToPositions, CircleToPositions)
+
+    InsideMouse = ~Resolved & (np.sqrt(CircleDistancesSquared) < MouseRadius)
+    CollisionDirections[InsideMouse] = NormalizeArray(CircleToPositions[InsideMouse])
+    Resolved |= InsideMouse
+
+    # If going to hit mouse circle, steer away
+    A = np.einsum("ij,ij->i", Directions, Directions)
+    B = 2.0 * np.einsum("ij,ij->i", CircleToPositions, Directions)
+    C = CircleDistancesSquared - MouseRadius * MouseRadius
+
+    Discriminants = B * B - 4.0 * A * C
+    DiscriminantsSqrt = np.sqrt(np.maximum(Discriminants, 0.0))
+    IntersectionsNear = (-B - DiscriminantsSqrt) * 0.5
+    IntersectionsFar = (-B + DiscriminantsSqrt) * 0.5
+
+    IntersectionDistances = np.where(
+        (IntersectionsNear >= 0) & (IntersectionsFar >= 0), np.minimum(IntersectionsNear, IntersectionsFar),
+        np.where(IntersectionsNear >= 0, IntersectionsNear, np.where(IntersectionsFar >= 0, IntersectionsFar, np.nan)),
+    )
+    IntersectionDistances[Discriminants < 0] = np.nan
+
+    IntersectionPositions = Positions + Directions * IntersectionDistances[:, None]
+    IntersectionOffsets = Positions - IntersectionPositions
+
+    with np.errstate(invalid = "ignore"):
+        Steering = ~Resolved & ~np.isnan(IntersectionDistances) & (np.sqrt(np.einsum("ij,ij->i", IntersectionOffsets, IntersectionOffsets)) < Settings.BoundsMargin)
+
+    CollisionDirections[Steering] = NormalizeArray(IntersectionPositions[Steering] - MouseCenter)
+    return CollisionDirections
+
+def SteerArrays(Settings, Positions, Directions, RulesDirections, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+    # Turns every boid towards its rules or collision direction and moves it, works on the arrays in place
+    DesiredDirectionsRules = RulesDirections * Settings.TurnFactorRules
+    DesiredDirectionsCollisions = ApplyCollisionsArrays(Settings, Positions, Directions, MouseClicking, MousePosition, MouseRadius) * Settings.TurnFactorCollisions
+
+    Colliding = np.einsum("ij,ij->i", DesiredDirectionsCollisions, DesiredDirectionsCollisions) > 0
+    DesiredDirections = np.where(Colliding[:, None], DesiredDirectionsCollisions, DesiredDirectionsRules)
+
+    Directions[:] = NormalizeArray(Directions + (DesiredDirections - Directions) * DeltaTime)
+    Positions += Directions * Settings.Speed * DeltaTime
+
+class SpatialGrid:
+    # Stops a single runaway boid from blowing up the number of cells
+    MaximumCellsPerAxis = 256
+
+    def __init__(self):
+        self.CellSize = 1.0
+        self.GridOrigin = Vec2(0.0, 0.0)
+        self.NumberColumns = 0
+        self.NumberRows = 0
+        self.Cells = {}
+
+    def Build(self, Boids):
+        self.Cells = {}
+        self.NumberColumns = 0
+        self.NumberRows = 0
+
+        if len(Boids) == 0:
+            return
+
+        Positions = np.array([[Boid.Position.x, Boid.Position.y] for Boid in Boids])
+        BoundsMin = Positions.min(axis = 0)
+        GridSize = Positions.max(axis = 0) - BoundsMin
+
+        # Cells have to cover the largest rule radius
+        self.CellSize = max(1.0, max(Boid.NeighbourRadius() for Boid in Boids), *(GridSize / self.MaximumCellsPerAxis))
+        self.GridOrigin = Vec2(BoundsMin[0], BoundsMin[1])
+        self.NumberColumns = int(GridSize[0] / self.CellSize) + 1
+        self.NumberRows = int(GridSize[1] / self.CellSize) + 1
+
+        Columns = np.minimum(np.floor((Positions[:, 0] - BoundsMin[0]) / self.CellSize).astype(int), self.NumberColumns - 1)
+        Rows = np.minimum(np.floor((Positions[:, 1] - BoundsMin[1]) / self.CellSize).astype(int), self.NumberRows - 1)
+
+        for Boid, Column, Row in zip(Boids, Columns.tolist(), Rows.tolist()):
+            self.Cells.setdefault((Column, Row), []).append(Boid)
+
+    def Neighbours(self, Position):
+        # Every boid in the 3x3 block of cells around the position
+        Column = math.floor((Position.x - self.GridOrigin.x) / self.CellSize)
+        Row = math.floor((Position.y - self.GridOrigin.y) / self.CellSize)
+
+        return [
+            Boid
+            for CellRow in range(Row - 1, Row + 2)
+            for CellColumn in range(Column - 1, Column + 2)
+            for Boid in self.Cells.get((CellColumn, CellRow), ())
+        ]
+
+class Boid(BoidSettings):
+    def __init__(self, BoundsMin, BoundsMax, BoundsMargin):
+        super().__init__(BoundsMin, BoundsMax, BoundsMargin)
+
+        Positions, Directions = RandomBoidStates(self, 1)
+        self.Position = Vec2(*Positions[0])
+        self.Direction = Vec2(*Directions[0])
+
+    def ApplyRules(self, Neighbours):
+        Neighbours = [Neighbour for Neighbour in Neighbours if Neighbour is not self]
+
+        NeighbourPositions = np.array([[Neighbour.Position.x, Neighbour.Position.y] for Neighbour in Neighbours]).reshape(-1, 2)
+        NeighbourDirections = np.array([[Neighbour.Direction.x, Neighbour.Direction.y] for Neighbour in Neighbours]).reshape(-1, 2)
+
+        return ApplyRulesArrays(
+            self,
+            np.array([[self.Position.x, self.Position.y]]),
+            np.array([[self.Direction.x, self.Direction.y]]),
+            NeighbourPositions,
+            NeighbourDirections,
+            np.ones((1, len(Neighbours)), dtype = bool),
+        )
+
+    def Update(self, Boids, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+        RulesDirections = self.ApplyRules(Boids.Neighbours(self.Position) if isinstance(Boids, SpatialGrid) else Boids)
+
+        Positions = np.array([[self.Position.x, self.Position.y]])
+        Directions = np.array([[self.Direction.x, self.Direction.y]])
+        SteerArrays(self, Positions, Directions, RulesDirections, DeltaTime, MouseClicking, MousePosition, MouseRadius)
+
+        # Written in place so references to Position and Direction stay live like the native attributes
+        self.Position.x, self.Position.y = Positions[0].tolist()
+        self.Direction.x, self.Direction.y = Directions[0].tolist()
+
+class Flock(BoidSettings):
+    # Rows of boids compared at once, bounds the (Rows, NumberBoids, 2) temporaries to about 16MB
+    PairsPerChunk = 1 << 20
+
+    def __init__(self, NumberBoids, BoundsMin, BoundsMax, BoundsMargin, NumberThreads = 1, Seed = None):
+        super().__init__(BoundsMin, BoundsMax, BoundsMargin)
+
+        self.NumberBoids = NumberBoids
+        self.NumberThreads = max(NumberThreads, 1)
+
+        # A step reads the current arrays and writes the next ones, then the two are swapped. Spawns
+        # come from Seed, None picks a new one.
+        self.CurrentPositions, self.CurrentDirections = RandomBoidStates(self, NumberBoids, np.random.RandomState(Seed))
+        self.NextPositions = self.CurrentPositions.copy()
+        self.NextDirections = self.CurrentDirections.copy()
+
+        self.Workers = ThreadPoolExecutor(max_workers = self.NumberThreads)
+        self.PendingRanges = None
+
+        # Boids outside the view only step every OffscreenUpdateInterval updates with a scaled
+        # delta time, staggered by index so the skipped work is spread over the frames
+        self.ViewMin = np.array([-np.inf, -np.inf])
+        self.ViewMax = np.array([np.inf, np.inf])
+        self.OffscreenUpdateInterval = 1
+        self.StepIndex = 0
+
+    def __len__(self):
+        return self.NumberBoids
+
+    @property
+    def UpdatePending(self):
+        return self.PendingRanges is not None
+
+    def MemberView(self, Current):
+        # Read only like the compiled flock, a view between steps that has to be read again after every
+        # WaitUpdate and a copy while a step is in flight, since the next step writes the array it views
+        View = Current.copy() if self.UpdatePending else Current.view()
+        View.flags.writeable = False
+        return View
+
+    @property
+    def Positions(self):
+        return self.MemberView(self.CurrentPositions)
+
+    @property
+    def Directions(self):
+        return self.MemberView(self.CurrentDirections)
+
+    def SetView(self, ViewMin, ViewMax):
+        self.ViewMin = np.array([ViewMin.x, ViewMin.y])
+        self.ViewMax = np.array([ViewMax.x, ViewMax.y])
+
+    def Update(self, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+        self.StartUpdate(DeltaTime, MouseClicking, MousePosition, MouseRadius)
+        self.WaitUpdate()
+
+    def StartUpdate(self, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+        self.WaitUpdate()
+        self.StepIndex += 1
+
+        RangeStarts = np.linspace(0, self.NumberBoids, self.NumberThreads + 1).astype(int).tolist()
+        Ranges = list(zip(RangeStarts[:-1], RangeStarts[1:]))
+        Arguments = (DeltaTime, MouseClicking, Vec2(MousePosition.x, MousePosition.y), MouseRadius)
+
+        # Numpy releases the GIL in its kernels so the worker threads run alongside the game loop
+        self.PendingRanges = [self.Workers.submit(self.UpdateRange, RangeStart, RangeEnd, *Arguments) for RangeStart, RangeEnd in Ranges]
+
+    def WaitUpdate(self):
+        if self.PendingRanges is None:
+            return
+
+        for PendingRange in self.PendingRanges:
+            PendingRange.result()
+
+        self.CurrentPositions, self.NextPositions = self.NextPositions, self.CurrentPositions
+        self.CurrentDirections, self.NextDirections = self.NextDirections, self.CurrentDirections
+        self.PendingRanges = None
+
+    def UpdateRange(self, RangeStart, RangeEnd, DeltaTime, MouseClicking, MousePosition, MouseRadius):
+        # Every boid only reads the current arrays so the result never depends on the thread count
+        ChunkSize = max(1, self.PairsPerChunk // max(self.NumberBoids, 1))
+
+        for ChunkStart in range(RangeStart, RangeEnd, ChunkSize):
+            ChunkEnd = min(ChunkStart + ChunkSize, RangeEnd)
+            self.NextPositions[ChunkStart:ChunkEnd] = self.CurrentPositions[ChunkStart:ChunkEnd]
+            self.NextDirections[ChunkStart:ChunkEnd] = self.CurrentDirections[ChunkStart:ChunkEnd]
+
+            ChunkPositions = self.CurrentPositions[ChunkStart:ChunkEnd]
+            InView = np.all((ChunkPositions >= self.ViewMin) & (ChunkPositions <= self.ViewMax), axis = 1)
+            UpdateIntervals = np.where(InView, 1, max(self.OffscreenUpdateInterval, 1))
+
+            ChunkIndices = np.arange(ChunkStart, ChunkEnd)
+            Stepping = (self.StepIndex + ChunkIndices) % UpdateIntervals == 0
+            ChunkIndices = ChunkIndices[Stepping]
+            if len(ChunkIndices) == 0:
+                continue
+
+            NeighbourMask = np.ones((len(ChunkIndices), self.NumberBoids), dtype = bool)
+            NeighbourMask[np.arange(len(ChunkIndices)), ChunkIndices] = False
+
+            RulesDirections = ApplyRulesArrays(
+                self,
+                self.CurrentPositions[ChunkIndices],
+                self.CurrentDirections[ChunkIndices],
+                self.CurrentPositions,
+                self.CurrentDirections,
+                NeighbourMask,
+            )
+
+            Positions = self.CurrentPositions[ChunkIndices]
+            Directions = self.CurrentDirections[ChunkIndices]
+            StepDeltaTimes = (DeltaTime * UpdateIntervals[Stepping])[:, None]
+            SteerArrays(self, Positions, Directions, RulesDirections, StepDeltaTimes, MouseClicking, MousePosition, MouseRadius)
+
+            self.NextPositions[ChunkIndices] = Positions
+            self.NextDirections[ChunkIndices] = Directions
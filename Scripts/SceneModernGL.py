@@ -1,14 +1,18 @@
 from .GameObject import GameObject
 from .CppBuild.Simulations import Vec2
+from .SpriteBatch import SpriteBatch
+from .NoiseTextures import NoiseTextures
+from .FrameCapture import FrameCapture
+from .Handlers.ProfilerHandler import GpuTimer
 
-import pygame
+import pygame, time
 import moderngl as mgl
 from array import array
 import numpy as np
 
 class SceneModernGL(GameObject):
     def __init__(self):
-        self.Context = mgl.create_context()
+        self.Context = mgl.create_context() if self.Game.Benchmark is None else self.Game.Benchmark.CreateContext()
         self.QuadBuffer = self.Context.buffer(data=array("f", [
             -1.0, 1.0, 0.0, 1.0,
             1.0, 1.0, 1.0, 1.0,
@@ -17,16 +21,16 @@ class SceneModernGL(GameObject):
         ]))
 
         with open(f"Shaders/Vertex.glsl") as file:
-            VertexShader = file.read()
+            self.VertexShader = file.read()
         with open(f"Shaders/SceneFragment.glsl") as file:
-            SceneFragmentShader = file.read()
+            self.SceneFragmentShader = file.read()
         with open(f"Shaders/ScreenFragment.glsl") as file:
             ScreenFragmentShader = file.read()
 
-        self.SceneProgram = self.Context.program(vertex_shader=VertexShader, fragment_shader=SceneFragmentShader)
-        self.SceneRenderObject = self.Context.vertex_array(self.SceneProgram, [(self.QuadBuffer, "2f 2f", "Vertex", "TextureCoordinate")])
+        # Scene shader variants are built the first time an effects quality needs them
+        self.ScenePrograms = {}
 
-        self.ScreenProgram = self.Context.program(vertex_shader=VertexShader, fragment_shader=ScreenFragmentShader)
+        self.ScreenProgram = self.Context.program(vertex_shader=self.VertexShader, fragment_shader=ScreenFragmentShader)
         self.ScreenRenderObject = self.Context.vertex_array(self.ScreenProgram, [(self.QuadBuffer, "2f 2f", "Vertex", "TextureCoordinate")])
 
         SceneResolutionInt = [int(self.Game.Settings.SceneResolution.x), int(self.Game.Settings.SceneResolution.y)]
@@ -36,62 +40,317 @@ class SceneModernGL(GameObject):
         self.SceneTexture.filter = (mgl.NEAREST, mgl.NEAREST)
         self.SceneFrameBuffer = self.Context.framebuffer(color_attachments=[self.SceneTexture])
 
-        self.BackgroundTexture = self.CreateTexture(SceneResolutionInt)
-        self.MidgroundTexture = self.CreateTexture(SceneResolutionInt)
+        # Without a window the upscaled scene goes to an offscreen framebuffer the size of the screen
+        if self.Game.Benchmark is None:
+            self.ScreenFrameBuffer = self.Context.screen
+        else:
+            self.ScreenFrameBuffer = self.Context.simple_framebuffer([int(self.Game.Settings.ScreenResolution.x), int(self.Game.Settings.ScreenResolution.y)])
+
+        # Static images are uploaded once, the scene shader places them with parallax
+        self.BackgroundTexture = self.CreateTexture(self.Game.PygameScene.BackgroundImage.get_size())
+        self.BackgroundTexture.write(self.Game.PygameScene.BackgroundImage.get_view("1"))
+        self.MidgroundTexture = self.CreateTexture(self.Game.PygameScene.MidgroundImage.get_size())
+        self.MidgroundTexture.write(self.Game.PygameScene.MidgroundImage.get_view("1"))
+
         self.ForegroundTexture = self.CreateTexture(SceneResolutionInt)
         self.MenusTexture = self.CreateTexture(SceneResolutionInt)
+        self.LayerTextures = {"Foreground": self.ForegroundTexture, "Menus": self.MenusTexture}
+
+        # Sprites are drawn over the uploaded foreground layer before the scene pass, then the
+        # overlays like the cursor over them
+        self.ForegroundFrameBuffer = self.Context.framebuffer(color_attachments=[self.ForegroundTexture])
+        self.Sprites = SpriteBatch(self.Context)
+        self.Overlays = SpriteBatch(self.Context)
+
+        # Two pixel buffers per layer used in turns, each orphaned before it is written so the
+        # driver hands back fresh memory instead of waiting on an upload still in flight
+        LayerBytes = SceneResolutionInt[0] * SceneResolutionInt[1] * 4
+        self.UploadBuffers = {
+            Name : [self.Context.buffer(reserve=LayerBytes, dynamic=True) for Index in range(2)]
+            for Name in self.LayerTextures
+        }
+        self.UploadBufferIndex = 0
+
+        # Seconds spent handing each layer to the driver last frame, zero when it didn't change
+        self.UploadTimes = {Name : 0.0 for Name in self.UploadBuffers}
+
+        # Wave heights and slopes for this frame, one float texel per table sample
+        self.WaveTexture = self.Context.texture([self.Game.Waves.NumberSamples, 1], 4, dtype="f4")
+        self.WaveTexture.filter = (mgl.LINEAR, mgl.LINEAR)
+        self.WaveTexture.repeat_x = False
+
+        self.Noise = NoiseTextures(self.Context, self.QuadBuffer) if self.Game.Settings.BakedNoise else None
+
+        # Extra border drawn around the view so the camera can move between refreshes without
+        # running off the edge of the buffer
+        self.EffectsMargin = 0.0625
+        self.EffectsTexture = None
+        self.EffectsResolutionDivisor = None
+        self.SetEffectsQuality(2, self.Game.Settings.EffectsResolutionDivisor, self.Game.Settings.EffectsRefreshInterval)
+
+        # GPU time of each part of the frame, from a few frames ago
+        self.GpuTimers = {Name : GpuTimer(self.Context) for Name in ["Layers", "ScenePass", "ScreenPass"]}
+        self.GpuFrameTime = 0.0
+
+        # Benchmarks start capturing once their warmup frames are done so only measured frames are kept
+        self.Capture = None
+        if self.Game.Settings.CaptureSource and self.Game.Benchmark is None:
+            self.StartCapture()
 
         self.ProgramTime = 0
 
+    def StartCapture(self):
+        # Either the scene before upscaling or the upscaled screen, read back a couple of frames late
+        CaptureFrameBuffer, CaptureResolution = {
+            "Scene": (self.SceneFrameBuffer, self.Game.Settings.SceneResolution),
+            "Screen": (self.ScreenFrameBuffer, self.Game.Settings.ScreenResolution),
+        }[self.Game.Settings.CaptureSource]
+
+        self.Capture = FrameCapture(
+            self.Context, CaptureFrameBuffer, CaptureResolution,
+            OutputDirectory = self.Game.Settings.CaptureDirectory,
+            Format = self.Game.Settings.CaptureFormat,
+            QueueFrames = self.Game.Settings.CaptureQueueFrames,
+            DropFrames = self.Game.Settings.CaptureDropFrames,
+        )
+
+    @staticmethod
+    def AddDefines(FragmentShader, Defines):
+        # Defines have to follow the version line
+        VersionLine, Source = FragmentShader.split("\n", 1)
+        return "\n".join([VersionLine] + [f"#define {Define}" for Define in Defines] + [Source])
+
+    def GetSceneProgram(self, Defines):
+        Defines = tuple(Defines)
+        if Defines not in self.ScenePrograms:
+            Program = self.Context.program(vertex_shader=self.VertexShader, fragment_shader=self.AddDefines(self.SceneFragmentShader, Defines))
+            self.ScenePrograms[Defines] = (Program, self.Context.vertex_array(Program, [(self.QuadBuffer, "2f 2f", "Vertex", "TextureCoordinate")]))
+        return self.ScenePrograms[Defines]
+
+    def SetEffectsQuality(self, EffectsTier, ResolutionDivisor, RefreshInterval):
+        # Fog and caustics come from the effects buffer unless it would be redrawn every frame at
+        # full resolution, at tier 0 there is nothing left to draw into it
+        self.EffectsTier = EffectsTier
+        self.EffectsRefreshInterval = RefreshInterval
+        self.UseEffectsBuffer = EffectsTier > 0 and (ResolutionDivisor != 1 or RefreshInterval != 1)
+
+        SceneDefines = [f"EFFECTS_TIER {EffectsTier}"]
+        if self.Noise is not None:
+            SceneDefines.append("BAKED_NOISE")
+
+        if self.UseEffectsBuffer:
+            self.EffectsProgram, self.EffectsRenderObject = self.GetSceneProgram(SceneDefines + ["EFFECTS_PASS"])
+            SceneDefines.append("EFFECTS_BUFFER")
+
+            # Settings that start at full rate never made the buffer
+            if self.EffectsTexture is None or ResolutionDivisor != self.EffectsResolutionDivisor:
+                self.CreateEffectsBuffer(ResolutionDivisor)
+            else:
+                self.EffectsOffset = None
+
+        self.SceneProgram, self.SceneRenderObject = self.GetSceneProgram(SceneDefines)
+
+    def CreateEffectsBuffer(self, Divisor):
+        # Fog intensity in red and caustics brightness in green, filtered so the lower resolution is smoothed out
+        if self.EffectsTexture is not None:
+            self.EffectsFrameBuffer.release()
+            self.EffectsTexture.release()
+
+        self.EffectsResolutionDivisor = Divisor
+        EffectsResolution = self.Game.Settings.SceneResolution * ((1 + 2 * self.EffectsMargin) / Divisor)
+
+        self.EffectsTexture = self.Context.texture([max(1, round(EffectsResolution.x)), max(1, round(EffectsResolution.y))], 2, dtype="f2")
+        self.EffectsTexture.filter = (mgl.LINEAR, mgl.LINEAR)
+        self.EffectsTexture.repeat_x = False
+        self.EffectsTexture.repeat_y = False
+        self.EffectsFrameBuffer = self.Context.framebuffer(color_attachments=[self.EffectsTexture])
+
+        # Drawn on the next frame
+        self.EffectsOffset = None
+        self.EffectsFrame = 0
+
+    def RenderEffects(self, Offset):
+        # Redrawn every few frames, or sooner if the camera moved far enough to reach the margin
+        self.EffectsFrame += 1
+        if self.EffectsOffset is not None and self.EffectsFrame < self.EffectsRefreshInterval:
+            if abs(Offset.x - self.EffectsOffset.x) < self.EffectsMargin and abs(Offset.y - self.EffectsOffset.y) < self.EffectsMargin:
+                return
+
+        self.EffectsFrame = 0
+        self.EffectsOffset = Offset
+        self.EffectsRange = (Offset.x - self.EffectsMargin, -Offset.y - self.EffectsMargin, 1 + 2 * self.EffectsMargin, 1 + 2 * self.EffectsMargin)
+
+        self.EffectsFrameBuffer.use()
+        self.Context.viewport = (0, 0, self.EffectsTexture.width, self.EffectsTexture.height)
+
+        if self.Noise is not None:
+            self.Noise.Use(self.EffectsProgram, 5, 6)
+
+        self.EffectsProgram["Time"] = self.ProgramTime
+        self.EffectsProgram["EffectsRange"] = self.EffectsRange
+
+        self.EffectsRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+
     def CreateTexture(self, Resolution):
         Texure = self.Context.texture(Resolution, 4)
         Texure.filter = (mgl.NEAREST, mgl.NEAREST)
         Texure.swizzle = "BGRA"
         return Texure
 
+    def UploadLayer(self, Name, Texture, Surface):
+        StartTime = time.perf_counter()
+
+        # Surface rows are copied as they are, the scene shader flips them when sampling
+        if self.Game.Settings.StreamLayerUploads:
+            UploadBuffer = self.UploadBuffers[Name][self.UploadBufferIndex]
+            UploadBuffer.orphan()
+            UploadBuffer.write(Surface.get_view("1"))
+            Texture.write(UploadBuffer)
+        else:
+            Texture.write(Surface.get_view("1"))
+
+        self.UploadTimes[Name] = time.perf_counter() - StartTime
+
+    def UploadLayerRects(self, Name, Texture, Surface, Rects):
+        StartTime = time.perf_counter()
+
+        # Overlapping rectangles are merged so nothing is sent twice
+        MergedRects = []
+        for Rect in Rects:
+            Rect = Rect.clip(Surface.get_rect())
+            if Rect.width == 0 or Rect.height == 0:
+                continue
+
+            Index = Rect.collidelist(MergedRects)
+            while Index != -1:
+                Rect = Rect.union(MergedRects.pop(Index))
+                Index = Rect.collidelist(MergedRects)
+
+            MergedRects.append(Rect)
+
+        # Rows are stored top first like the whole layer uploads
+        Pixels = np.frombuffer(Surface.get_view("1"), dtype=np.uint8).reshape(Surface.get_height(), Surface.get_pitch())
+        for Rect in MergedRects:
+            Texture.write(
+                np.ascontiguousarray(Pixels[Rect.top:Rect.bottom, Rect.left * 4:Rect.right * 4]),
+                viewport = (Rect.left, Rect.top, Rect.width, Rect.height),
+            )
+
+        self.UploadTimes[Name] = time.perf_counter() - StartTime
+
+    def RenderLayers(self, Offset):
+        # Sprites drawn last frame have to be wiped from the foreground texture as well
+        if any(Batch.PendingInstances or Batch.NumberInstances for Batch in (self.Sprites, self.Overlays)):
+            self.Game.PygameScene.DirtyLayers.add("Foreground")
+
+        # Only layers that changed since their last upload are sent again, retained layers
+        # only send the rectangles that changed
+        self.UploadBufferIndex = 1 - self.UploadBufferIndex
+
+        for Name, Texture in self.LayerTextures.items():
+            if Name in self.Game.PygameScene.DirtyLayers:
+                self.UploadLayer(Name, Texture, self.Game.PygameScene.LayerSurfaces[Name])
+            elif self.Game.PygameScene.DirtyRects[Name]:
+                self.UploadLayerRects(Name, Texture, self.Game.PygameScene.LayerSurfaces[Name], self.Game.PygameScene.DirtyRects[Name])
+            else:
+                self.UploadTimes[Name] = 0.0
+
+            self.Game.PygameScene.DirtyRects[Name].clear()
+
+        self.Game.PygameScene.DirtyLayers.clear()
+
+        self.Sprites.Render(self.ForegroundFrameBuffer, self.Game.PygameScene.PixelOffset, self.Game.Settings.SceneResolution)
+        self.Overlays.Render(self.ForegroundFrameBuffer, self.Game.PygameScene.PixelOffset, self.Game.Settings.SceneResolution)
+
+        if self.UseEffectsBuffer:
+            self.RenderEffects(Offset)
+
     def Render(self):
-        BackgroundSurface, MidgroundSurface, ForegroundSurface, MenusSurface = self.Game.PygameScene.GetLayers()
+        self.ProgramTime += self.Game.DeltaTime
+        Offset = self.Game.PygameScene.PixelOffset / self.Game.Settings.SceneResolution
+
+        with self.GpuTimers["Layers"]:
+            self.RenderLayers(Offset)
 
         # Render to sccene frame buffer
         self.SceneFrameBuffer.use()
         self.Context.viewport = (0, 0, int(self.Game.Settings.SceneResolution[0]), int(self.Game.Settings.SceneResolution[1]))
-    
-        self.BackgroundTexture.write(pygame.transform.flip(BackgroundSurface, False, True).get_view("1"))
+
         self.BackgroundTexture.use(0)
         self.SceneProgram["BackgroundTexture"] = 0
 
-        self.MidgroundTexture.write(pygame.transform.flip(MidgroundSurface, False, True).get_view("1"))
         self.MidgroundTexture.use(1)
         self.SceneProgram["MidgroundTexture"] = 1
 
-        self.ForegroundTexture.write(pygame.transform.flip(ForegroundSurface, False, True).get_view("1"))
         self.ForegroundTexture.use(2)
         self.SceneProgram["ForegroundTexture"] = 2
 
-        self.MenusTexture.write(pygame.transform.flip(MenusSurface, False, True).get_view("1"))
         self.MenusTexture.use(3)
         self.SceneProgram["MenusTexture"] = 3
 
-        self.ProgramTime += self.Game.DeltaTime
-        self.SceneProgram["Time"] = self.ProgramTime
-        self.SceneProgram["Offset"] = self.Game.PygameScene.PixelOffset / self.Game.Settings.SceneResolution
+        self.WaveTexture.write(self.Game.Waves.WaveTable)
+        self.WaveTexture.use(4)
+        self.SceneProgram["WaveTexture"] = 4
+        self.SceneProgram["WaveTableRange"] = (self.Game.Waves.TableStart, self.Game.Waves.TableWidth)
+
+        self.SceneProgram["NumberLights"] = self.Game.Lighting.NumberLights
+        self.SceneProgram["LightPositions"].write(self.Game.Lighting.LightPositions)
+        self.SceneProgram["LightColors"].write(self.Game.Lighting.LightColors)
+        self.SceneProgram["LightRadii"].write(self.Game.Lighting.LightRadii)
+
+        if self.UseEffectsBuffer:
+            self.EffectsTexture.use(7)
+            self.SceneProgram["EffectsTexture"] = 7
+            self.SceneProgram["EffectsRange"] = self.EffectsRange
+        elif self.Noise is not None and self.EffectsTier > 0:
+            self.Noise.Use(self.SceneProgram, 5, 6)
 
-        self.SceneRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+        # Lower effects tiers can leave out everything that moves with time
+        if self.SceneProgram.get("Time", None) is not None:
+            self.SceneProgram["Time"] = self.ProgramTime
+        self.SceneProgram["Offset"] = Offset.ToTuple()
+        self.SceneProgram["SceneResolution"] = self.Game.Settings.SceneResolution.ToTuple()
+
+        with self.GpuTimers["ScenePass"]:
+            self.SceneRenderObject.render(mode=mgl.TRIANGLE_STRIP)
 
         # Upscale scene and render to screen
-        self.Context.screen.use()
+        self.ScreenFrameBuffer.use()
         self.Context.viewport = (0, 0, int(self.Game.Settings.ScreenResolution[0]), int(self.Game.Settings.ScreenResolution[1]))
 
         self.SceneTexture.use(0)
         self.ScreenProgram["SceneTexture"] = 0
 
-        self.ScreenRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+        with self.GpuTimers["ScreenPass"]:
+            self.ScreenRenderObject.render(mode=mgl.TRIANGLE_STRIP)
+
+        self.GpuFrameTime = sum(Timer.Time for Timer in self.GpuTimers.values())
+
+        if self.Capture is not None:
+            self.Capture.Capture()
 
     def Quit(self):
+        if self.Capture is not None:
+            self.Capture.Close()
         self.BackgroundTexture.release()
         self.MidgroundTexture.release()
         self.ForegroundTexture.release()
         self.MenusTexture.release()
+        self.ForegroundFrameBuffer.release()
+        self.Sprites.Quit()
+        self.Overlays.Quit()
+        for UploadBuffers in self.UploadBuffers.values():
+            for UploadBuffer in UploadBuffers:
+                UploadBuffer.release()
+        self.WaveTexture.release()
+        if self.Noise is not None:
+            self.Noise.Release()
+        if self.EffectsTexture is not None:
+            self.EffectsFrameBuffer.release()
+            self.EffectsTexture.release()
+        for Program, RenderObject in self.ScenePrograms.values():
+            RenderObject.release()
+            Program.release()
         self.SceneTexture.release()
         self.SceneFrameBuffer.release()
 
@@ -6,10 +6,22 @@ from pygame.locals import *
 
 class ScenePygame(GameObject):
     def __init__(self):
-        self.BackgroundSurface = pygame.Surface(self.Game.Settings.SceneResolution).convert_alpha()
-        self.MidgroundSurface = pygame.Surface(self.Game.Settings.SceneResolution).convert_alpha()
-        self.ForegroundSurface = pygame.Surface(self.Game.Settings.SceneResolution).convert_alpha()
-        self.MenusSurface = pygame.Surface(self.Game.Settings.SceneResolution).convert_alpha()
+        # Background and midground are static images placed by the scene shader, only these are drawn on
+        self.LayerSurfaces = {
+            "Foreground": pygame.Surface(self.Game.Settings.SceneResolution).convert_alpha(),
+            "Menus": pygame.Surface(self.Game.Settings.SceneResolution).convert_alpha(),
+        }
+
+        for LayerSurface in self.LayerSurfaces.values():
+            LayerSurface.fill([0, 0, 0, 0])
+
+        # Layers drawn on since they were last cleared, and layers that changed since they were last uploaded
+        self.DrawnLayers = set()
+        self.DirtyLayers = set(self.LayerSurfaces)
+
+        # Retained layers are never cleared, whoever draws on them redraws and reports only what changed
+        self.RetainedLayers = {"Menus"}
+        self.DirtyRects = {Name : [] for Name in self.LayerSurfaces}
 
         self.TargetOffset = Vec2([0, 0])
         self.AnimatedOffset = Vec2([0, 0])
@@ -22,6 +34,21 @@ class ScenePygame(GameObject):
     def PixelOffset(self):
         return self.AnimatedOffset
 
+    # World space rectangle shown on screen this frame
+    @property
+    def ViewMin(self):
+        return self.PixelOffset.copy()
+
+    @property
+    def ViewMax(self):
+        return self.PixelOffset + self.Game.Settings.SceneResolution
+
+    def IsVisible(self, Position, Size):
+        # Position is the world space top left corner of something Size big
+        ViewMin = self.ViewMin
+        ViewMax = self.ViewMax
+        return Position.x + Size.x >= ViewMin.x and Position.x <= ViewMax.x and Position.y + Size.y >= ViewMin.y and Position.y <= ViewMax.y
+
     def Update(self, Events):
         self.TargetOffset.Clamp(
             -self.Game.Settings.SceneResolution * Vec2([0.5, 1.0]),
@@ -59,20 +86,21 @@ class ScenePygame(GameObject):
         if self.KeysPressed["d"]: self.TargetOffset.x += CameraSpeed
 
     def Render(self):
-        self.BackgroundSurface.fill([0, 0, 0, 0])
-        self.MidgroundSurface.fill([0, 0, 0, 0])
-        self.ForegroundSurface.fill([0, 0, 0, 0])
-        self.MenusSurface.fill([0, 0, 0, 0])
-
-        self.BackgroundSurface.blit(
-            source = self.BackgroundImage,
-            dest = self.Game.Settings.SceneResolution * Vec2([-0.5, -1.0]) - self.PixelOffset * Vec2([0.8, 1.0]),
-        )
+        # Layers nobody drew on last frame are already empty
+        for Name in self.DrawnLayers:
+            self.LayerSurfaces[Name].fill([0, 0, 0, 0])
+            self.DirtyLayers.add(Name)
 
-        self.MidgroundSurface.blit(
-            source = self.MidgroundImage,
-            dest = self.Game.Settings.SceneResolution * Vec2([-0.5, -1.0]) - self.PixelOffset * Vec2([0.9, 1.0]),
-        )
+        self.DrawnLayers.clear()
+
+    def GetLayer(self, Name):
+        # Anything drawing on a layer gets it through here so the layer is cleared and uploaded
+        self.DrawnLayers.add(Name)
+        self.DirtyLayers.add(Name)
+        return self.LayerSurfaces[Name]
+
+    def GetRetainedLayer(self, Name):
+        return self.LayerSurfaces[Name]
 
-    def GetLayers(self):
-        return self.BackgroundSurface, self.MidgroundSurface, self.ForegroundSurface, self.MenusSurface
+    def MarkDirty(self, Name, Rect):
+        self.DirtyRects[Name].append(pygame.Rect(Rect))
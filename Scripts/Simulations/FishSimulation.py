@@ -1,6 +1,6 @@
 from ..GameObject import GameObject
 from ..CppBuild.Simulations import Vec2
-from ..CppBuild.Simulations import Boid
+from ..CppBuild.Simulations import Flock
 
 import pygame, math, time, random, os
 from pygame.locals import *
@@ -8,43 +8,89 @@ import numpy as np
 
 class FishSimulationManager(GameObject):
     def __init__(self, NumberOfFish, BoundsMin, BoundsMax, BoundsMargin):
-        self.Boids = [Boid(
+        self.Boids = Flock(
+            NumberBoids = NumberOfFish,
             BoundsMin = BoundsMin,
             BoundsMax = BoundsMax,
             BoundsMargin = BoundsMargin,
-        ) for Index in range(NumberOfFish)]
+            NumberThreads = self.Game.Settings.SimulationThreads,
+            Seed = self.Game.Settings.RandomSeed,
+        )
+        # Handed to the flock between steps since the worker threads read it, QualityHandler may raise it
+        self.OffscreenUpdateInterval = self.Game.Settings.OffscreenUpdateInterval
+        self.NumberVisible = 0
+
+        # Steps run on the worker threads from one scheduler step to the next, so the fish are drawn
+        # between the two states before the one being worked on
+        self.PreviousPositions = self.Boids.Positions.copy()
+        self.PreviousDirections = self.Boids.Directions.copy()
+        self.Simulation = self.Game.Scheduler.Add("Fish", self.Step)
 
         self.FishImageLeft = pygame.image.load(os.path.join(os.getcwd(), "Data/Images/Fish.png")).convert_alpha()
         self.FishImageRight = pygame.transform.flip(self.FishImageLeft.copy(), True, False)
 
-        self.CachedRotationsFishImageLeft = {
-            Angle : pygame.transform.rotate(
-                surface = self.FishImageLeft,
-                angle = Angle,
-            ) for Angle in range(-90, 91)
-        }
-        self.CachedRotationsFishImageRight = {
-            Angle : pygame.transform.rotate(
-                surface = self.FishImageRight,
-                angle = Angle,
-            ) for Angle in range(-90, 91)
-        }
+        if self.Game.Settings.GpuSprites:
+            self.Game.ModernGLScene.Sprites.RegisterSprite("Fish", self.FishImageLeft)
+        else:
+            # Rotations are made on first use, or ahead of time on the prewarm thread
+            self.Game.Rotations.RegisterSprite("FishLeft", self.FishImageLeft, AngleStep = 1, PrewarmRange = (-90, 90))
+            self.Game.Rotations.RegisterSprite("FishRight", self.FishImageRight, AngleStep = 1, PrewarmRange = (-90, 90))
+
+    def Step(self, DeltaTime):
+        SpriteRadius = max(self.FishImageLeft.get_size())
+
+        # The current state becomes the previous one once the step working on it has finished
+        self.PreviousPositions[:] = self.Boids.Positions
+        self.PreviousDirections[:] = self.Boids.Directions
+        self.Boids.WaitUpdate()
+
+        # Fish out of view step less often, the margin stops them stuttering right at the edge
+        ViewMargin = Vec2([SpriteRadius, SpriteRadius])
+        self.Boids.OffscreenUpdateInterval = self.OffscreenUpdateInterval
+        self.Boids.SetView(self.Game.PygameScene.ViewMin - ViewMargin, self.Game.PygameScene.ViewMax + ViewMargin)
+
+        # The step only writes the next state, Positions and Directions stay the current one until
+        # the next WaitUpdate swaps them, so they are fetched again every time they are read
+        self.Boids.StartUpdate(DeltaTime, self.Game.Mouse.Clicking, self.Game.Mouse.WorldPosition, self.Game.Mouse.AnimatedRadius)
 
     def Render(self):
-        for Boid in self.Boids:
-            Boid.Update(self.Boids, self.Game.DeltaTime, self.Game.Mouse.Clicking, self.Game.Mouse.WorldPosition, self.Game.Mouse.AnimatedRadius)
-
-            if Boid.Direction.x < 0:
-                Angle = math.degrees(math.atan2(Boid.Direction.y, -Boid.Direction.x))
-                RenderImage = self.CachedRotationsFishImageLeft[round(Angle)]
-            else:
-                Angle = math.degrees(math.atan2(-Boid.Direction.y, Boid.Direction.x))
-                RenderImage = self.CachedRotationsFishImageRight[round(Angle)]
-
-            RenderPosition = Boid.Position - Vec2(RenderImage.get_size()) * 0.5
-            
-            self.Game.PygameScene.ForegroundSurface.blit(
-                source = RenderImage,
-                dest = RenderPosition - self.Game.PygameScene.PixelOffset,
-            )
+        # The current state is only read by the step in flight, so it can be drawn without waiting for it.
+        # During a step the flock hands out read only copies of it, fetched every frame rather than kept.
+        Alpha = self.Simulation.Alpha
+        Positions = self.PreviousPositions + (self.Boids.Positions - self.PreviousPositions) * Alpha
+        Directions = self.PreviousDirections + (self.Boids.Directions - self.PreviousDirections) * Alpha
+
+        RenderPositions = Positions - np.array(self.Game.PygameScene.PixelOffset.ToTuple())
+
+        # Only fish whose rotated sprite can overlap the screen are drawn
+        SpriteRadius = max(self.FishImageLeft.get_size())
+        OnScreen = np.all((RenderPositions >= -SpriteRadius) & (RenderPositions <= np.array(self.Game.Settings.SceneResolution.ToTuple()) + SpriteRadius), axis = 1)
+        self.NumberVisible = int(np.count_nonzero(OnScreen))
+
+        RenderPositions = RenderPositions[OnScreen]
+        Directions = Directions[OnScreen]
+
+        # Left facing fish mirror the angle so both caches only need -90 to 90 degrees
+        FacingLeft = Directions[:, 0] < 0
+        Angles = np.degrees(np.arctan2(
+            np.where(FacingLeft, Directions[:, 1], -Directions[:, 1]),
+            np.abs(Directions[:, 0]),
+        ))
+
+        if self.Game.Settings.GpuSprites:
+            # Right facing fish are the same sprite mirrored before it is rotated
+            Scales = np.ones((len(Angles), 2))
+            Scales[:, 0] = np.where(FacingLeft, 1.0, -1.0)
+            self.Game.ModernGLScene.Sprites.AddInstances("Fish", Positions[OnScreen], Angles, Scales)
+        else:
+            self.BlitFish(RenderPositions, np.round(Angles).astype(int), FacingLeft)
+
+    def BlitFish(self, RenderPositions, Angles, FacingLeft):
+        GetRotation = self.Game.Rotations.GetRotation
+
+        RenderImages = []
+        for (PositionX, PositionY), Angle, Left in zip(RenderPositions.tolist(), Angles.tolist(), FacingLeft.tolist()):
+            RenderImage = GetRotation("FishLeft" if Left else "FishRight", Angle)
+            RenderImages.append((RenderImage, (PositionX - RenderImage.get_width() * 0.5, PositionY - RenderImage.get_height() * 0.5)))
 
+        self.Game.PygameScene.GetLayer("Foreground").fblits(RenderImages)
@@ -1,6 +1,6 @@
 from ..GameObject import GameObject
 from ..CppBuild.Simulations import Vec2
-from ..CppBuild.Simulations import VerletChain
+from ..CppBuild.Simulations import VerletWorld
 
 import pygame, random
 from pygame.locals import *
@@ -8,33 +8,74 @@ import numpy as np
 
 class KelpSimulationManager(GameObject):
     def __init__(self, NumberOfKelp):
-        self.KelpVerletChains = [self.CreateKelpVerletChain() for Index in range(NumberOfKelp)]
+        # All kelp lives in one world so a frame is a single update call
+        self.KelpWorld = VerletWorld(Seed = self.Game.Settings.RandomSeed)
 
-    def CreateKelpVerletChain(self):
-        NumberPoints = random.randint(3, 20)
-        RandomPositionX = random.uniform(-0.5, 1.5)
-        OceanFloorHeight = self.Game.OceanFloor.GetTerrainHeight((RandomPositionX + 0.5) * 0.5)
-        return VerletChain(
+        # Terrain heights under every kelp are sampled in one batch
+        RandomPositionsX = np.random.uniform(-0.5, 1.5, NumberOfKelp)
+        OceanFloorHeights = self.Game.OceanFloor.GetTerrainHeights((RandomPositionsX + 0.5) * 0.5)
+        for RandomPositionX, OceanFloorHeight in zip(RandomPositionsX.tolist(), OceanFloorHeights.tolist()):
+            self.AddKelpVerletChain(RandomPositionX, OceanFloorHeight)
+
+        # Widths and colours never change, convert them to python values once
+        self.SegmentWidths = self.KelpWorld.SegmentWidths.tolist()
+        self.SegmentColors = (np.array([225, 255, 75]) * self.KelpWorld.SegmentColorMultipliers[:, None]).tolist()
+        self.ChainDisplayStarts = self.KelpWorld.ChainDisplayStarts.tolist()
+        self.ChainDisplayLengths = np.diff(self.KelpWorld.ChainDisplayStarts)
+
+        # Verlet chains are unstable with variable delta time values, so the kelp always steps by
+        # the same amount and is drawn between its last two steps
+        self.KelpWorld.CalculateDisplayPoints()
+        self.PreviousDisplayPoints = self.KelpWorld.DisplayPoints.copy()
+        self.Simulation = self.Game.Scheduler.Add("Kelp", self.Step)
+
+    def AddKelpVerletChain(self, RandomPositionX, OceanFloorHeight):
+        return self.KelpWorld.AddChain(
             Position = self.Game.Settings.SceneResolution * Vec2([RandomPositionX, 2.0]) - Vec2([0, OceanFloorHeight]),
-            NumberPoints = NumberPoints,
+            NumberPoints = random.randint(3, 20),
             DesiredDistancePoints = 25,
             NumberDisplayPointsPerSegment = 2,
         )
 
+    @property
+    def NumberVisible(self):
+        return int(np.count_nonzero(self.KelpWorld.ChainVisible))
+
+    @property
+    def NumberSleeping(self):
+        return int(np.count_nonzero(self.KelpWorld.ChainSleeping))
+
+    def Step(self, DeltaTime):
+        # Kelp out of view settles and sleeps, it wakes when the mouse reaches it or it is seen again
+        self.KelpWorld.SetView(self.Game.PygameScene.ViewMin, self.Game.PygameScene.ViewMax)
+
+        self.PreviousDisplayPoints[:] = self.KelpWorld.DisplayPoints
+        PreviouslyVisible = self.KelpWorld.ChainVisible.copy()
+
+        self.KelpWorld.Update(DeltaTime, self.Game.Mouse.Clicking, self.Game.Mouse.WorldPosition, self.Game.Mouse.AnimatedRadius)
+        self.KelpWorld.CalculateDisplayPoints()
+
+        # Display points aren't updated out of view, where chains also sleep, so a chain that has just
+        # come into view starts from its new points instead of sweeping over from where it was last seen
+        NewlyVisible = (self.KelpWorld.ChainVisible != 0) & (PreviouslyVisible == 0)
+        if NewlyVisible.any():
+            Snapped = np.repeat(NewlyVisible, self.ChainDisplayLengths)
+            self.PreviousDisplayPoints[Snapped] = self.KelpWorld.DisplayPoints[Snapped]
+
     def Render(self):
-        for KelpVerletChain in self.KelpVerletChains:
-            # Verlet chains are unstable with variable delta time values
-            KelpVerletChain.Update(1 / self.Game.Settings.FpsCap, self.Game.Mouse.Clicking, self.Game.Mouse.WorldPosition, self.Game.Mouse.AnimatedRadius)
-            DisplayPoints = KelpVerletChain.CalculateDisplayPoints()
-            
-            SegmentWidths = KelpVerletChain.SegmentWidths
-            SegmentColorMultipliers = KelpVerletChain.SegmentColorMultipliers
-
-            for Index in range(len(DisplayPoints) - 1):
+        PreviousDisplayPoints = self.PreviousDisplayPoints
+        DisplayPoints = PreviousDisplayPoints + (self.KelpWorld.DisplayPoints - PreviousDisplayPoints) * self.Simulation.Alpha
+        DisplayPoints = (DisplayPoints - np.array(self.Game.PygameScene.PixelOffset.ToTuple())).tolist()
+
+        for ChainStart, ChainEnd, Visible in zip(self.ChainDisplayStarts[:-1], self.ChainDisplayStarts[1:], self.KelpWorld.ChainVisible.tolist()):
+            if not Visible:
+                continue
+
+            for Index in range(ChainStart, ChainEnd - 1):
                 pygame.draw.line(
-                    surface = self.Game.PygameScene.ForegroundSurface,
-                    color = np.array([225, 255, 75]) * SegmentColorMultipliers[Index],
-                    start_pos = DisplayPoints[Index] - self.Game.PygameScene.PixelOffset,
-                    end_pos = DisplayPoints[Index + 1] - self.Game.PygameScene.PixelOffset,
-                    width = SegmentWidths[Index],
+                    surface = self.Game.PygameScene.GetLayer("Foreground"),
+                    color = self.SegmentColors[Index],
+                    start_pos = DisplayPoints[Index],
+                    end_pos = DisplayPoints[Index + 1],
+                    width = self.SegmentWidths[Index],
                 )
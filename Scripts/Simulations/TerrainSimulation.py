@@ -3,103 +3,194 @@ from ..CppBuild.Simulations import Vec2
 
 import pygame, math, time, sys, random
 from pygame.locals import *
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 import numpy as np
 
 class GrassSimulation(GameObject):
-    def __init__(self, TerrainSurface, DisplayPointsOffset):
-        self.TerrainSurface = TerrainSurface
+    def __init__(self, DisplayPointsOffset):
         self.DisplayPointsOffset = DisplayPointsOffset
 
-    def RenderBlade(self, Position, NumberDisplayPoints):
+    def RenderBlade(self, TerrainSurface, Position, NumberDisplayPoints, Generator):
+        # Plain pairs, a blade only has a few points so even a Vec2Array costs more than it saves
+        PositionX, PositionY = Position.ToTuple()
         DisplayPoints = [
-            Position + Vec2([
-                random.randint(-self.DisplayPointsOffset.x, self.DisplayPointsOffset.x),
-                -Index * self.DisplayPointsOffset.y,
-            ])
+            (PositionX + Generator.randint(-self.DisplayPointsOffset.x, self.DisplayPointsOffset.x), PositionY - Index * self.DisplayPointsOffset.y)
             for Index in range(NumberDisplayPoints)
         ]
         
         for Index in range(NumberDisplayPoints - 1):
             pygame.draw.line(
-                surface = self.TerrainSurface,
+                surface = TerrainSurface,
                 color = [225, 255, 75],
                 start_pos = DisplayPoints[Index],
                 end_pos = DisplayPoints[Index + 1],
-                width = random.randint(1, 3),
+                width = Generator.randint(1, 3),
             )
 
 class TerrainSimulation(GameObject):
-    def __init__(self, Position, Resolution, StepSize, NumberOfGrassBlades):
+    # Chunks generated ahead of the camera on each side
+    PrefetchChunks = 2
+
+    def __init__(self, Position, Resolution, StepSize, NumberOfGrassBlades, ChunkWidth, CacheBudget):
+        # Resolution.x is the width the noise is scaled over, the terrain itself has no edges
+        # and is cut into ChunkWidth wide chunks starting at Position
         self.Position = Position - Vec2([0, Resolution.y])
         self.Resolution = Resolution
+        self.ChunkWidth = ChunkWidth
         
         self.StepSize = StepSize
         self.TerrainSeed = random.random()
-        self.TerrainSurface = pygame.Surface(Resolution).convert_alpha()
 
         self.TerrarinGrass = GrassSimulation(
-            TerrainSurface = self.TerrainSurface,
             DisplayPointsOffset = Vec2([3, 4]),
         )
         self.NumberOfGrassBlades = NumberOfGrassBlades
-        
-        self.RenderTerrain()
+        self.GrassSpacing = Resolution.x / NumberOfGrassBlades
 
-    def EaseInOutSine(self, Value):
-        return -(math.cos(math.pi * Value) - 1) * 0.5;
+        # Finished chunk surfaces by chunk index, least recently drawn first
+        self.CacheBudget = CacheBudget
+        self.CachedChunks = OrderedDict()
+        self.CachedBytes = 0
 
-    def SampleValueNoise(self, PositionX):
-        Fractional = lambda Value: Value - math.floor(Value)
-        return Fractional(math.sin(PositionX + self.TerrainSeed) * 43758.5453123)
+        # Chunks are generated on one worker thread, the game loop only ever polls them
+        self.ChunkWorker = ThreadPoolExecutor(max_workers = 1)
+        self.PendingChunks = {}
 
-    def GetTerrainHeight(self, ScaledPositionX, Octaves=4, Lacunarity=3.0, Gain=0.5):
-        TotalValue = 0.0
+    def EaseInOutSine(self, Values):
+        return -(np.cos(np.pi * Values) - 1) * 0.5
+
+    def SampleValueNoise(self, PositionsX):
+        Values = np.sin(PositionsX + self.TerrainSeed) * 43758.5453123
+        return Values - np.floor(Values)
+
+    def GetTerrainHeights(self, ScaledPositionsX, Octaves=4, Lacunarity=3.0, Gain=0.5):
+        # Every octave is evaluated for all positions at once
+        ScaledPositionsX = np.asarray(ScaledPositionsX, dtype=np.float64)
+        TotalValues = np.zeros_like(ScaledPositionsX)
         MaxValue = 0.0
 
         Amplitude = 1.0
         Frequency = 1.0
 
         for Octave in range(Octaves):
-            SamplePositionX = ScaledPositionX * Frequency
+            SamplePositionsX = ScaledPositionsX * Frequency
             
-            ValueNoiseLeft = self.SampleValueNoise(SamplePositionX // self.StepSize)
-            ValueNoiseRight = self.SampleValueNoise(SamplePositionX // self.StepSize + 1.0)
+            ValueNoiseLeft = self.SampleValueNoise(np.floor_divide(SamplePositionsX, self.StepSize))
+            ValueNoiseRight = self.SampleValueNoise(np.floor_divide(SamplePositionsX, self.StepSize) + 1.0)
 
-            BlendFactor = self.EaseInOutSine((SamplePositionX % self.StepSize) / self.StepSize)
-            BlendedValueNoise = ValueNoiseLeft * (1 - BlendFactor) + ValueNoiseRight * BlendFactor
+            BlendFactors = self.EaseInOutSine(np.mod(SamplePositionsX, self.StepSize) / self.StepSize)
+            BlendedValueNoise = ValueNoiseLeft * (1 - BlendFactors) + ValueNoiseRight * BlendFactors
 
-            TotalValue += BlendedValueNoise * Amplitude
+            TotalValues += BlendedValueNoise * Amplitude
             MaxValue += Amplitude
 
             Amplitude *= Gain
             Frequency *= Lacunarity
 
         # Normalize and scale
-        return (TotalValue / MaxValue) * self.Resolution.y
-
-    def RenderTerrain(self):
-        TerrainPoints = [self.Resolution, Vec2([0, self.Resolution.y])]
-        for PositionX in range(int(self.Resolution.x)):
-            TerrainPoints.append(Vec2([PositionX, self.Resolution.y - self.GetTerrainHeight(PositionX / self.Resolution.x)]))
+        return (TotalValues / MaxValue) * self.Resolution.y
 
-        self.TerrainSurface.fill([0, 0, 0, 0])
+    def GetTerrainHeight(self, ScaledPositionX, Octaves=4, Lacunarity=3.0, Gain=0.5):
+        return float(self.GetTerrainHeights(np.array([ScaledPositionX]), Octaves, Lacunarity, Gain)[0])
+
+    def TerrainPoints(self, ChunkIndex, NumberColumns):
+        # Outline of a chunk in its own pixels, columns are sampled in terrain space so
+        # neighbouring chunks meet exactly at their shared edge
+        ColumnsX = np.linspace(0, self.ChunkWidth, NumberColumns + 1)
+        ColumnsY = self.Resolution.y - self.GetTerrainHeights((ChunkIndex * self.ChunkWidth + ColumnsX) / self.Resolution.x)
+        return [(self.ChunkWidth, self.Resolution.y), (0, self.Resolution.y)] + list(zip(ColumnsX.tolist(), ColumnsY.tolist()))
+
+    def RenderChunk(self, ChunkIndex):
+        # Runs on the worker thread, the surface is converted for fast blits once it is picked up
+        TerrainSurface = pygame.Surface([self.ChunkWidth, self.Resolution.y], pygame.SRCALPHA)
         pygame.draw.polygon(
-            surface = self.TerrainSurface,
+            surface = TerrainSurface,
             color = [225, 190, 145],
-            points = TerrainPoints,
+            points = self.TerrainPoints(ChunkIndex, self.ChunkWidth),
         )
 
-        for Index in range(self.NumberOfGrassBlades):
+        # Grass blades sit on a fixed terrain wide spacing and every chunk has its own seeded
+        # generator, so a chunk looks the same every time it is generated
+        Generator = random.Random(f"{self.TerrainSeed}:{ChunkIndex}")
+        ChunkStart = ChunkIndex * self.ChunkWidth
+        FirstBlade = math.ceil(ChunkStart / self.GrassSpacing)
+        LastBlade = math.ceil((ChunkStart + self.ChunkWidth) / self.GrassSpacing)
+
+        BladeIndices = np.arange(FirstBlade, LastBlade)
+        GrassHeights = self.GetTerrainHeights(BladeIndices / self.NumberOfGrassBlades).tolist()
+        for BladeIndex, GrassHeight in zip(BladeIndices.tolist(), GrassHeights):
             self.TerrarinGrass.RenderBlade(
+                TerrainSurface = TerrainSurface,
                 Position = Vec2([
-                    Index * (self.Resolution.x / self.NumberOfGrassBlades),
-                    self.Resolution.y - self.GetTerrainHeight(Index / self.NumberOfGrassBlades),
+                    BladeIndex * self.GrassSpacing - ChunkStart,
+                    self.Resolution.y - GrassHeight,
                 ]),
-                NumberDisplayPoints = random.randint(2, 4),
+                NumberDisplayPoints = Generator.randint(2, 4),
+                Generator = Generator,
             )
 
-    def Render(self):
-        self.Game.PygameScene.ForegroundSurface.blit(
-            source = self.TerrainSurface,
-            dest = self.Position - self.Game.PygameScene.PixelOffset,
+        return TerrainSurface
+
+    def CollectChunks(self):
+        for ChunkIndex, PendingChunk in list(self.PendingChunks.items()):
+            if not PendingChunk.done():
+                continue
+
+            del self.PendingChunks[ChunkIndex]
+            TerrainSurface = PendingChunk.result().convert_alpha()
+
+            self.CachedChunks[ChunkIndex] = TerrainSurface
+            self.CachedBytes += TerrainSurface.get_width() * TerrainSurface.get_height() * TerrainSurface.get_bytesize()
+
+    def EvictChunks(self, RequiredChunks):
+        # Least recently drawn chunks go first, chunks on screen are never evicted
+        for ChunkIndex in list(self.CachedChunks):
+            if self.CachedBytes <= self.CacheBudget:
+                break
+            if ChunkIndex in RequiredChunks:
+                continue
+
+            TerrainSurface = self.CachedChunks.pop(ChunkIndex)
+            self.CachedBytes -= TerrainSurface.get_width() * TerrainSurface.get_height() * TerrainSurface.get_bytesize()
+
+    def RenderPlaceholder(self, ChunkIndex, RenderPosition):
+        # Coarse outline of the chunk until the real one is ready
+        PlaceholderPoints = np.array(self.TerrainPoints(ChunkIndex, 16)) + np.array([RenderPosition.x, RenderPosition.y])
+        pygame.draw.polygon(
+            surface = self.Game.PygameScene.GetLayer("Foreground"),
+            color = [225, 190, 145],
+            points = PlaceholderPoints.tolist(),
         )
+
+    def Render(self):
+        self.CollectChunks()
+
+        # Chunks overlapping the view and a few either side of it
+        ViewMin = self.Game.PygameScene.ViewMin
+        ViewMax = self.Game.PygameScene.ViewMax
+        FirstChunk = math.floor((ViewMin.x - self.Position.x) / self.ChunkWidth)
+        LastChunk = math.floor((ViewMax.x - self.Position.x) / self.ChunkWidth)
+        RequiredChunks = range(FirstChunk - self.PrefetchChunks, LastChunk + self.PrefetchChunks + 1)
+
+        for ChunkIndex in RequiredChunks:
+            if ChunkIndex not in self.CachedChunks and ChunkIndex not in self.PendingChunks:
+                self.PendingChunks[ChunkIndex] = self.ChunkWorker.submit(self.RenderChunk, ChunkIndex)
+
+        for ChunkIndex in range(FirstChunk, LastChunk + 1):
+            ChunkPosition = self.Position + Vec2([ChunkIndex * self.ChunkWidth, 0])
+            if not self.Game.PygameScene.IsVisible(ChunkPosition, Vec2([self.ChunkWidth, self.Resolution.y])):
+                continue
+
+            RenderPosition = ChunkPosition - self.Game.PygameScene.PixelOffset
+            if ChunkIndex not in self.CachedChunks:
+                self.RenderPlaceholder(ChunkIndex, RenderPosition)
+                continue
+
+            self.CachedChunks.move_to_end(ChunkIndex)
+            self.Game.PygameScene.GetLayer("Foreground").blit(
+                source = self.CachedChunks[ChunkIndex],
+                dest = RenderPosition.ToTuple(),
+            )
+
+        self.EvictChunks(RequiredChunks)
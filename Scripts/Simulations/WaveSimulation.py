@@ -0,0 +1,88 @@
+from ..GameObject import GameObject
+from ..CppBuild.Simulations import Vec2
+
+import numpy as np
+
+class WaveSimulation(GameObject):
+    def __init__(self, SamplesPerPixel, TableMargin):
+        # Positions and heights are in scene units, x is scaled by the scene width and the
+        # height is measured up from the bottom of the screen
+        self.ForegroundWaves = {
+            "FrequencyMultiplier": 2.5,
+            "AmplitudeMultiplier": 0.25,
+            "SpeedMultiplier": 1.1,
+            "NumberOfWaves": 3,
+            "BaseWaveAmplitude": 1.0,
+            "BaseWaveFrequency": 10.0,
+            "BaseWaveSpeed": 0.25,
+            "BaseWaterLevel": 0.5,
+            "MaxWaveHeight": 0.035,
+        }
+        self.BackgroundWaves = dict(self.ForegroundWaves, BaseWaveFrequency = 8.0, BaseWaterLevel = 0.55)
+
+        # The table covers the view plus TableMargin scene widths either side of it
+        self.TableMargin = TableMargin
+        self.TableWidth = 1.0 + TableMargin * 2
+        self.NumberSamples = int(self.Game.Settings.SceneResolution.x * self.TableWidth * SamplesPerPixel)
+        self.TableStart = -TableMargin
+
+        # Foreground height, foreground slope, background height, background slope per sample,
+        # samples sit at texel centres so the shader's linear filtering lines up with SampleWaves
+        self.WaveTable = np.zeros((self.NumberSamples, 4), dtype = np.float32)
+        self.SamplePositions = (np.arange(self.NumberSamples) + 0.5) / self.NumberSamples
+
+        self.ProgramTime = 0
+
+    def EvaluateWaves(self, PositionsX, Waves):
+        # Sum of exponential sine waves, returns the heights and their exact slopes
+        WaveHeightTotal = np.zeros_like(PositionsX)
+        WaveSlopeTotal = np.zeros_like(PositionsX)
+        WaveAmplitudeTotal = 0
+
+        WaveAmplitude = Waves["BaseWaveAmplitude"]
+        WaveFrequency = Waves["BaseWaveFrequency"]
+        WaveSpeed = Waves["BaseWaveSpeed"]
+
+        # FBM loop
+        for WaveNumber in range(Waves["NumberOfWaves"]):
+            WaveDirection = (WaveNumber % 2) * 2 - 1
+            WavePhases = PositionsX * WaveDirection * WaveFrequency + self.ProgramTime * WaveSpeed * WaveFrequency
+
+            WaveHeights = WaveAmplitude * np.exp(np.sin(WavePhases) - 1)
+            WaveHeightTotal += WaveHeights
+            WaveSlopeTotal += WaveHeights * np.cos(WavePhases) * WaveDirection * WaveFrequency
+            WaveAmplitudeTotal += WaveAmplitude
+
+            WaveFrequency *= Waves["FrequencyMultiplier"]
+            WaveAmplitude *= Waves["AmplitudeMultiplier"]
+            WaveSpeed *= Waves["SpeedMultiplier"]
+
+        Heights = Waves["BaseWaterLevel"] + (WaveHeightTotal / WaveAmplitudeTotal) * Waves["MaxWaveHeight"]
+        Slopes = (WaveSlopeTotal / WaveAmplitudeTotal) * Waves["MaxWaveHeight"]
+        return Heights, Slopes
+
+    def Update(self):
+        self.ProgramTime += self.Game.DeltaTime
+
+        # Follow the camera so the table always covers what is on screen
+        self.TableStart = self.Game.PygameScene.PixelOffset.x / self.Game.Settings.SceneResolution.x - self.TableMargin
+        PositionsX = self.TableStart + self.SamplePositions * self.TableWidth
+
+        self.WaveTable[:, 0], self.WaveTable[:, 1] = self.EvaluateWaves(PositionsX, self.ForegroundWaves)
+        self.WaveTable[:, 2], self.WaveTable[:, 3] = self.EvaluateWaves(PositionsX, self.BackgroundWaves)
+
+    def SampleWaves(self, PositionsX, Background = False):
+        # Heights and slopes of the foreground (or background) waves, read from this frame's
+        # table and evaluated directly for anything outside of it
+        PositionsX = np.asarray(PositionsX, dtype = np.float64)
+        TableColumn = 2 if Background else 0
+
+        TablePositions = self.TableStart + self.SamplePositions * self.TableWidth
+        Heights = np.interp(PositionsX, TablePositions, self.WaveTable[:, TableColumn])
+        Slopes = np.interp(PositionsX, TablePositions, self.WaveTable[:, TableColumn + 1])
+
+        OutsideTable = (PositionsX < TablePositions[0]) | (PositionsX > TablePositions[-1])
+        if OutsideTable.any():
+            Heights[OutsideTable], Slopes[OutsideTable] = self.EvaluateWaves(PositionsX[OutsideTable], self.BackgroundWaves if Background else self.ForegroundWaves)
+
+        return Heights, Slopes
@@ -0,0 +1,154 @@
+from .GameObject import GameObject
+
+import pygame
+import moderngl as mgl
+from array import array
+import numpy as np
+
+class SpriteBatch(GameObject):
+    # Instance layout, world position of the sprite centre, counterclockwise degrees, scale, atlas rectangle in pixels
+    InstanceFormat = "2f 1f 2f 4f/i"
+    InstanceFloats = 9
+
+    def __init__(self, Context, AtlasWidth = 256, AtlasPadding = 1):
+        self.Context = Context
+        self.AtlasWidth = AtlasWidth
+        self.AtlasPadding = AtlasPadding
+
+        # Sprites by name, their place in the atlas is found when the atlas is built
+        self.Sprites = {}
+        self.AtlasRects = {}
+        self.AtlasTexture = None
+        self.AtlasDirty = False
+
+        with open(f"Shaders/SpriteVertex.glsl") as file:
+            VertexShader = file.read()
+        with open(f"Shaders/SpriteFragment.glsl") as file:
+            FragmentShader = file.read()
+
+        self.Program = self.Context.program(vertex_shader=VertexShader, fragment_shader=FragmentShader)
+        self.CornerBuffer = self.Context.buffer(data=array("f", [
+            -0.5, -0.5,
+            0.5, -0.5,
+            -0.5, 0.5,
+            0.5, 0.5,
+        ]))
+
+        # Grown to the next power of two whenever a frame needs more instances
+        self.InstanceCapacity = 0
+        self.InstanceBuffer = None
+        self.RenderObject = None
+
+        # Instance arrays added this frame, joined into one buffer at render time
+        self.PendingInstances = []
+        self.NumberInstances = 0
+
+    def RegisterSprite(self, Name, Surface):
+        self.Sprites[Name] = Surface
+        self.AtlasDirty = True
+
+    def PackAtlas(self):
+        # Shelf packing, tallest sprites first so each row wastes little height
+        Names = sorted(self.Sprites, key = lambda Name: self.Sprites[Name].get_height(), reverse = True)
+
+        AtlasWidth = max([self.AtlasWidth] + [self.Sprites[Name].get_width() + self.AtlasPadding * 2 for Name in Names])
+        ShelfX, ShelfY, ShelfHeight = self.AtlasPadding, self.AtlasPadding, 0
+
+        AtlasRects = {}
+        for Name in Names:
+            Width, Height = self.Sprites[Name].get_size()
+
+            if ShelfX + Width + self.AtlasPadding > AtlasWidth:
+                ShelfX = self.AtlasPadding
+                ShelfY += ShelfHeight + self.AtlasPadding
+                ShelfHeight = 0
+
+            AtlasRects[Name] = (ShelfX, ShelfY, Width, Height)
+            ShelfX += Width + self.AtlasPadding
+            ShelfHeight = max(ShelfHeight, Height)
+
+        return AtlasRects, (AtlasWidth, ShelfY + ShelfHeight + self.AtlasPadding)
+
+    def BuildAtlas(self):
+        self.AtlasRects, AtlasSize = self.PackAtlas()
+
+        # Pixels are copied in the surface byte order, the sprite shader writes them to the
+        # foreground layer in that same order
+        AtlasPixels = np.zeros((AtlasSize[1], AtlasSize[0], 4), dtype=np.uint8)
+        for Name, (PositionX, PositionY, Width, Height) in self.AtlasRects.items():
+            Surface = self.Sprites[Name]
+            SurfacePixels = np.frombuffer(Surface.get_view("1"), dtype=np.uint8).reshape(Surface.get_height(), Surface.get_pitch())
+            AtlasPixels[PositionY:PositionY + Height, PositionX:PositionX + Width] = SurfacePixels[:, :Width * 4].reshape(Height, Width, 4)
+
+        if self.AtlasTexture is not None:
+            self.AtlasTexture.release()
+
+        self.AtlasTexture = self.Context.texture(AtlasSize, 4, AtlasPixels.tobytes())
+        self.AtlasTexture.filter = (mgl.NEAREST, mgl.NEAREST)
+        self.AtlasTexture.repeat_x = False
+        self.AtlasTexture.repeat_y = False
+        self.AtlasDirty = False
+
+    def AddInstances(self, Name, Positions, Angles, Scales = None):
+        # Positions are sprite centres in world pixels, angles counterclockwise in degrees like pygame.transform.rotate
+        NumberInstances = len(Positions)
+        if NumberInstances == 0:
+            return
+
+        Instances = np.empty((NumberInstances, self.InstanceFloats), dtype=np.float32)
+        Instances[:, 0:2] = Positions
+        Instances[:, 2] = Angles
+        Instances[:, 3:5] = 1.0 if Scales is None else Scales
+
+        self.PendingInstances.append((Name, Instances))
+
+    def Render(self, FrameBuffer, PixelOffset, Resolution):
+        if self.AtlasDirty:
+            self.BuildAtlas()
+
+        self.NumberInstances = sum(len(Instances) for Name, Instances in self.PendingInstances)
+        if self.NumberInstances == 0:
+            return
+
+        # Atlas rectangles are filled in last since the atlas may only just have been built
+        Instances = np.concatenate([Instances for Name, Instances in self.PendingInstances])
+        Instances[:, 5:9] = np.concatenate([np.broadcast_to(self.AtlasRects[Name], (len(NameInstances), 4)) for Name, NameInstances in self.PendingInstances])
+        self.PendingInstances.clear()
+
+        if self.NumberInstances > self.InstanceCapacity:
+            self.InstanceCapacity = 1 << (self.NumberInstances - 1).bit_length()
+
+            if self.InstanceBuffer is not None:
+                self.InstanceBuffer.release()
+                self.RenderObject.release()
+
+            self.InstanceBuffer = self.Context.buffer(reserve=self.InstanceCapacity * self.InstanceFloats * 4, dynamic=True)
+            self.RenderObject = self.Context.vertex_array(self.Program, [
+                (self.CornerBuffer, "2f", "Corner"),
+                (self.InstanceBuffer, self.InstanceFormat, "InstancePosition", "InstanceAngle", "InstanceScale", "InstanceRect"),
+            ])
+
+        self.InstanceBuffer.orphan()
+        self.InstanceBuffer.write(Instances)
+
+        FrameBuffer.use()
+        self.Context.viewport = (0, 0, int(Resolution[0]), int(Resolution[1]))
+
+        self.AtlasTexture.use(0)
+        self.Program["AtlasTexture"] = 0
+        self.Program["PixelOffset"] = PixelOffset.ToTuple()
+        self.Program["Resolution"] = Resolution.ToTuple()
+
+        self.Context.enable(mgl.BLEND)
+        self.Context.blend_func = (mgl.SRC_ALPHA, mgl.ONE_MINUS_SRC_ALPHA, mgl.ONE, mgl.ONE_MINUS_SRC_ALPHA)
+        self.RenderObject.render(mode=mgl.TRIANGLE_STRIP, instances=self.NumberInstances)
+        self.Context.disable(mgl.BLEND)
+
+    def Quit(self):
+        if self.AtlasTexture is not None:
+            self.AtlasTexture.release()
+        if self.InstanceBuffer is not None:
+            self.RenderObject.release()
+            self.InstanceBuffer.release()
+        self.CornerBuffer.release()
+        self.Program.release()
@@ -0,0 +1,113 @@
+#version 330 core
+
+// Tileable versions of the scene shader noise, rendered once at startup into the textures
+// SceneFragment.glsl samples when BakedNoise is set. The lattice hashes wrap every Period cells
+// so the texture covers exactly one period.
+uniform int BakeMode;
+uniform float Period;
+uniform float BakeTime;
+
+// Caustic lines are thinner than a texel, so their coverage of each texel is baked instead of the
+// edge distance, which wouldn't survive filtering
+uniform float TexelSize;
+uniform float EdgeWidth;
+
+in vec2 FragmentCoordinate;
+out vec4 FragmentColor;
+
+vec2 WhiteNoise2D(vec2 Position) {
+    return fract(sin(vec2(dot(Position, vec2(127.1, 311.7)), dot(Position, vec2(269.5, 183.3)))) * 43758.5453);
+}
+
+float WhiteNoise1D(vec2 Position) {
+    return fract(sin(dot(Position, vec2(12.9898, 78.233))) * 43758.5453);
+}
+
+float VoronoiNoise(vec2 Position) {
+    vec2 CellCoordindte = floor(Position);
+    vec2 LocalCoordinate = fract(Position);
+
+    vec2 NearestGrid = vec2(0.0);
+    vec2 NearestVector = vec2(0.0);
+    float MinimumDistance = 8.0;
+
+    // First pass: find the closest cell center
+    for (int y = -1; y <= 1; y++) {
+        for (int x = -1; x <= 1; x++) {
+            vec2 GridOffset = vec2(float(x), float(y));
+            vec2 RandomCenter = 0.5 + 0.5 * sin(BakeTime + 6.2831 * WhiteNoise2D(mod(CellCoordindte + GridOffset, Period)));
+            vec2 OffsetVector = GridOffset + RandomCenter - LocalCoordinate;
+            float Distance = dot(OffsetVector, OffsetVector);
+
+            if (Distance < MinimumDistance) {
+                MinimumDistance = Distance;
+                NearestVector = OffsetVector;
+                NearestGrid = GridOffset;
+            }
+        }
+    }
+
+    // Second pass: compute distance to nearest border
+    MinimumDistance = 8.0;
+    for (int y = -2; y <= 2; y++) {
+        for (int x = -2; x <= 2; x++) {
+            vec2 GridOffset = NearestGrid + vec2(float(x), float(y));
+            vec2 RandomCenter = 0.5 + 0.5 * sin(BakeTime + 6.2831 * WhiteNoise2D(mod(CellCoordindte + GridOffset, Period)));
+            vec2 OffsetVector = GridOffset + RandomCenter - LocalCoordinate;
+
+            if (dot(NearestVector - OffsetVector, NearestVector - OffsetVector) > 0.00001) {
+                float edgeDist = dot(0.5 * (NearestVector + OffsetVector), normalize(OffsetVector - NearestVector));
+                MinimumDistance = min(MinimumDistance, edgeDist);
+            }
+        }
+    }
+
+    return MinimumDistance;
+}
+
+float SmoothValueNoise(vec2 Position, float CellPeriod) {
+    vec2 CellIndex = floor(Position);
+
+    float NoiseSouthWest = WhiteNoise1D(mod(CellIndex + vec2(0.0, 0.0), CellPeriod));
+    float NoiseSouthEast = WhiteNoise1D(mod(CellIndex + vec2(1.0, 0.0), CellPeriod));
+    float NoiseNorthWest = WhiteNoise1D(mod(CellIndex + vec2(0.0, 1.0), CellPeriod));
+    float NoiseNorthEast = WhiteNoise1D(mod(CellIndex + vec2(1.0, 1.0), CellPeriod));
+
+    vec2 InterpolationValues = smoothstep(0.0, 1.0, fract(Position));
+
+    return mix(
+        mix(NoiseSouthWest, NoiseSouthEast, InterpolationValues.x),
+        mix(NoiseNorthWest, NoiseNorthEast, InterpolationValues.x), 
+        InterpolationValues.y
+    );
+}
+
+float FractalNoise(vec2 Position) {
+    float Octaves = 5.0;
+    float Lacunarity = 2.0;
+    float Gain = 0.5;
+
+    float TotalValue = 0.0;
+    float MaxValue = 0.0;
+
+    float Amplitude = 0.5;
+    float Frequency = 1.0;
+    
+    // Each octave has Frequency times as many cells across the same period
+    for (float Octave = 0.0; Octave < Octaves; Octave++) {
+        TotalValue += SmoothValueNoise(Position * Frequency, Period * Frequency) * Amplitude;
+        MaxValue += Amplitude;
+
+        Amplitude *= Gain;
+        Frequency *= Lacunarity;
+    }
+
+    return TotalValue / MaxValue;
+}
+
+void main()
+{
+    vec2 Position = FragmentCoordinate * Period;
+    float Noise = BakeMode == 0 ? FractalNoise(Position) : clamp(0.5 + (EdgeWidth - VoronoiNoise(Position)) / TexelSize, 0.0, 1.0);
+    FragmentColor = vec4(Noise, 0.0, 0.0, 1.0);
+}
@@ -5,68 +5,74 @@ uniform sampler2D MidgroundTexture;
 uniform sampler2D ForegroundTexture;
 uniform sampler2D MenusTexture;
 
+// Foreground height, foreground slope, background height, background slope for this frame,
+// evaluated on the CPU by WaveSimulation and shared with the boat
+uniform sampler2D WaveTexture;
+uniform vec2 WaveTableRange;
+
+// Point lights in world pixels, filled by LightingHandler, only the first NumberLights are used
+const int MaximumLights = 32;
+uniform int NumberLights;
+uniform vec2 LightPositions[MaximumLights];
+uniform vec4 LightColors[MaximumLights];
+uniform float LightRadii[MaximumLights];
+
+// Tileable noise baked at startup, sampled instead of the procedural noise when the program is
+// built with BAKED_NOISE defined. The caustics texture holds the line coverage for one full period
+// of its animation along the third axis. A define rather than a uniform since software drivers run
+// both sides of a branch.
+#ifdef BAKED_NOISE
+uniform sampler2D ValueNoiseTexture;
+uniform float ValueNoisePeriod;
+uniform sampler3D CausticsTexture;
+uniform float CausticsPeriod;
+#endif
+
+// Fog and caustics are drawn at a lower resolution every few frames by this shader built with
+// EFFECTS_PASS, and read back by the scene pass built with EFFECTS_BUFFER. EffectsRange is the
+// world rectangle (origin, size) the buffer covered when it was drawn, so looking it up by world
+// position keeps it in place while the camera moves between refreshes.
+#if defined(EFFECTS_PASS) || defined(EFFECTS_BUFFER)
+uniform vec4 EffectsRange;
+#endif
+#ifdef EFFECTS_BUFFER
+uniform sampler2D EffectsTexture;
+#endif
+
+// Quality picked by QualityHandler, 2 draws everything, 1 leaves out refraction and caustics and
+// 0 also stops the fog from moving
+#ifndef EFFECTS_TIER
+#define EFFECTS_TIER 2
+#endif
+
 uniform float Time;
 uniform vec2 Offset;
+uniform vec2 SceneResolution;
 
 in vec2 FragmentCoordinate;
 out vec4 FragmentColor;
 
-struct WaveSettings
-{
-    float FrequencyMultiplier;
-    float AmplitudeMultiplier;
-    float SpeedMultiplier;
-    float NumberOfWaves;
-    float BaseWaveAmplitude;
-    float BaseWaveFrequency;
-    float BaseWaveSpeed;
-    float BaseWaterLevel;
-    float MaxWaveHeight;
-};
-
-const WaveSettings ForegroundWaves = WaveSettings(
-    2.5, 0.25, 1.1, 3.0, 1.0, 10.0, 0.25, 0.5, 0.035
-);
-const WaveSettings BackgroundWaves = WaveSettings(
-    2.5, 0.25, 1.1, 3.0, 1.0, 8.0, 0.25, 0.55, 0.035
-);
+// Background and midground images are placed relative to the scene like they used to be blitted,
+// moving by a fraction of the camera offset for parallax
+const vec2 ParallaxOrigin = vec2(-0.5, -1.0);
+const vec2 BackgroundParallax = vec2(0.8, 1.0);
+const vec2 MidgroundParallax = vec2(0.9, 1.0);
 
 const vec4 WaterColor = vec4(0.175, 0.25, 0.25, 1.0);
 const vec4 FogColor = vec4(0.5, 0.5, 0.5, 1.0);
 
 vec2 PositionOffsetRefraction(vec2 ScreenSpacePosition, vec2 WorldSpacePosition)
 {
+#if EFFECTS_TIER >= 2
     ScreenSpacePosition.y += (cos((WorldSpacePosition.y + (Time * 0.04)) * 45.0) * 0.0019) + (cos((WorldSpacePosition.y + (Time * 0.1)) * 10.0) * 0.002) * 1.0;
 	ScreenSpacePosition.x += (sin((WorldSpacePosition.y + (Time * 0.07)) * 15.0) * 0.0029) + (sin((WorldSpacePosition.y + (Time * 0.1)) * 15.0) * 0.002) * 1.0;
+#endif
     return ScreenSpacePosition;
 }
 
-float GetWaveHeight(float PositionX, WaveSettings Waves)
-{   
-    // Initial values
-    float WaveHeightTotal = 0.0;
-    float WaveAmplitudeTotal = 0.0;
-    
-    float WaveAmplitude = Waves.BaseWaveAmplitude;
-    float WaveFrequency = Waves.BaseWaveFrequency;
-    float WaveSpeed = Waves.BaseWaveSpeed;
-    
-    // FBM loop
-    for (float WaveNumber = 0.0; WaveNumber < Waves.NumberOfWaves; WaveNumber++) {
-        float WaveDirection = mod(WaveNumber, 2.0) * 2.0 - 1.0;
-        float WavePosition = PositionX * WaveDirection * WaveFrequency;
-        float WaveTime = Time * WaveSpeed * WaveFrequency;
-        
-        WaveHeightTotal += WaveAmplitude * exp(sin(WavePosition + WaveTime) - 1.0);
-        WaveAmplitudeTotal += WaveAmplitude;
-        
-        WaveFrequency *= Waves.FrequencyMultiplier;
-        WaveAmplitude *= Waves.AmplitudeMultiplier;
-        WaveSpeed *= Waves.SpeedMultiplier;
-    
-    }
-    
-    return Waves.BaseWaterLevel + (WaveHeightTotal / WaveAmplitudeTotal) * Waves.MaxWaveHeight;
+vec4 SampleWaves(float PositionX)
+{
+    return texture(WaveTexture, vec2((PositionX - WaveTableRange.x) / WaveTableRange.y, 0.5));
 }
 
 vec2 PositionOffsetCaustics(vec2 Position)
@@ -124,16 +130,42 @@ float VoronoiNoise(vec2 Position) {
 
 float GetCausticsPattern(vec2 Position)
 {
-    float EdgeDistance = VoronoiNoise(PositionOffsetCaustics(Position * 10.0));
-    return 1.0 + step(EdgeDistance, 0.015) * 0.045;
+    vec2 CausticsPosition = PositionOffsetCaustics(Position * 10.0);
+#ifdef BAKED_NOISE
+    float EdgeCoverage = texture(CausticsTexture, vec3(CausticsPosition / CausticsPeriod, Time / 6.2831853)).r;
+#else
+    float EdgeCoverage = step(VoronoiNoise(CausticsPosition), 0.015);
+#endif
+    return 1.0 + EdgeCoverage * 0.045;
 }
 
-vec4 SampleLayer(sampler2D Texture, vec2 Position, float DarknessFactor, float FogFactor, vec4 BaseColor) {
-    vec4 TextureSample = texture(Texture, Position);
+// Layers are uploaded straight from pygame surfaces so the first row is the top of the scene
+vec4 SampleLayerTexture(sampler2D Texture, vec2 Position) {
+    return texture(Texture, vec2(Position.x, 1.0 - Position.y));
+}
+
+vec4 SampleParallaxTexture(sampler2D Texture, vec2 Position, vec2 Parallax) {
+    // Whole pixel placement like a blit, anything outside the image is empty
+    vec2 ImageSize = vec2(textureSize(Texture, 0));
+    vec2 ImageOrigin = trunc(ParallaxOrigin * SceneResolution - Offset * SceneResolution * Parallax);
+    vec2 ImagePixel = floor(vec2(Position.x, 1.0 - Position.y) * SceneResolution) - ImageOrigin;
+
+    if (any(lessThan(ImagePixel, vec2(0.0))) || any(greaterThanEqual(ImagePixel, ImageSize))) {
+        return vec4(0.0);
+    }
+
+    return texture(Texture, (ImagePixel + 0.5) / ImageSize);
+}
+
+vec4 ShadeLayer(vec4 TextureSample, float DarknessFactor, float FogFactor, vec4 BaseColor) {
     TextureSample.rgb *= DarknessFactor;
     return vec4(mix(BaseColor.rgb, TextureSample.rgb, FogFactor), TextureSample.a);
 }
 
+vec4 SampleParallaxLayer(sampler2D Texture, vec2 Position, vec2 Parallax, float DarknessFactor, float FogFactor, vec4 BaseColor) {
+    return ShadeLayer(SampleParallaxTexture(Texture, Position, Parallax), DarknessFactor, FogFactor, BaseColor);
+}
+
 vec4 BlendLayers(vec4 BaseColor, vec4 BackgroundColor, vec4 MidgroundColor, vec4 ForegroundColor) {
     BaseColor = mix(BaseColor, BackgroundColor, BackgroundColor.a);
     BaseColor = mix(BaseColor, MidgroundColor, MidgroundColor.a);
@@ -145,6 +177,26 @@ float WhiteNoise1D(vec2 Position) {
     return fract(sin(dot(Position, vec2(12.9898, 78.233))) * 43758.5453);
 }
 
+vec4 AddLights(vec4 LayerColor, vec2 ScreenSpacePosition) {
+    vec2 WorldPosition = vec2(ScreenSpacePosition.x + Offset.x, 1.0 - ScreenSpacePosition.y + Offset.y) * SceneResolution;
+    float Dither = (WhiteNoise1D(ScreenSpacePosition * SceneResolution) - 0.5) / 255.0;
+
+    for (int Index = 0; Index < NumberLights; Index++) {
+        float Falloff = max(1.0 - length(WorldPosition - LightPositions[Index]) / LightRadii[Index], 0.0);
+        float LightAlpha = clamp(Falloff * Falloff * LightColors[Index].a + Dither, 0.0, 1.0);
+
+        // Blends the same way an alpha blit onto the layer would, transparent pixels take the light color
+        LayerColor.rgb = mix(LayerColor.rgb, LightColors[Index].rgb, LayerColor.a > 0.0 ? LightAlpha : 1.0);
+        LayerColor.a = LightAlpha + LayerColor.a * (1.0 - LightAlpha);
+    }
+
+    return LayerColor;
+}
+
+vec4 SampleForeground(vec2 Position, float DarknessFactor, float FogFactor, vec4 BaseColor) {
+    return ShadeLayer(AddLights(SampleLayerTexture(ForegroundTexture, Position), Position), DarknessFactor, FogFactor, BaseColor);
+}
+
 float SmoothValueNoise(vec2 Position) {
     vec2 CellIndex = floor(Position);
 
@@ -163,6 +215,10 @@ float SmoothValueNoise(vec2 Position) {
 }
 
 float FractalNoise(vec2 Position) {
+#ifdef BAKED_NOISE
+    return texture(ValueNoiseTexture, Position / ValueNoisePeriod).r;
+#endif
+
     float Octaves = 5.0;
     float Lacunarity = 2.0;
     float Gain = 0.5;
@@ -198,12 +254,43 @@ float GetWindPattern(vec2 Position) {
     return FourthLayerNoise;
 }
 
+float SampleWindPattern(vec2 Position) {
+#if EFFECTS_TIER < 1
+    return 0.5;
+#elif defined(EFFECTS_BUFFER)
+    return texture(EffectsTexture, (Position - EffectsRange.xy) / EffectsRange.zw).r;
+#else
+    return GetWindPattern(Position);
+#endif
+}
+
+float SampleCausticsPattern(vec2 Position) {
+#if EFFECTS_TIER < 2
+    return 1.0;
+#elif defined(EFFECTS_BUFFER)
+    return texture(EffectsTexture, (Position - EffectsRange.xy) / EffectsRange.zw).g;
+#else
+    return GetCausticsPattern(Position * 1.5);
+#endif
+}
+
 void main()
 {
+#ifdef EFFECTS_PASS
+    vec2 EffectsCoordinate = EffectsRange.xy + FragmentCoordinate * EffectsRange.zw;
+#if EFFECTS_TIER >= 2
+    FragmentColor = vec4(GetWindPattern(EffectsCoordinate), GetCausticsPattern(EffectsCoordinate * 1.5), 0.0, 1.0);
+#else
+    FragmentColor = vec4(GetWindPattern(EffectsCoordinate), 1.0, 0.0, 1.0);
+#endif
+    return;
+#endif
+
 	vec2 OffestCoordinate = FragmentCoordinate + vec2(Offset.x, -Offset.y);
     
-    float ForegroundHeight = GetWaveHeight(OffestCoordinate.x, ForegroundWaves);
-    float BackgroundHeight = GetWaveHeight(OffestCoordinate.x, BackgroundWaves);
+    vec4 Waves = SampleWaves(OffestCoordinate.x);
+    float ForegroundHeight = Waves.x;
+    float BackgroundHeight = Waves.z;
     
     if (ForegroundHeight > OffestCoordinate.y) {
         // Apply depth based darkening
@@ -214,24 +301,24 @@ void main()
         vec2 SamplePosition = FragmentCoordinate + vec2(smoothstep(ForegroundHeight - 0.025, ForegroundHeight, OffestCoordinate.y) * 0.015, 0.0);
         SamplePosition = PositionOffsetRefraction(SamplePosition, OffestCoordinate);
 
-        vec4 BackgroundColor = SampleLayer(BackgroundTexture, SamplePosition, WaterBrightness * 0.25 + 0.25, 0.1, FragmentColor);
-        vec4 MidgroundColor = SampleLayer(MidgroundTexture, SamplePosition, WaterBrightness * 0.25 + 0.25, 0.2, FragmentColor);
-        vec4 ForegroundColor = SampleLayer(ForegroundTexture, SamplePosition, WaterBrightness * 0.075 + 0.05, 0.4, FragmentColor);
+        vec4 BackgroundColor = SampleParallaxLayer(BackgroundTexture, SamplePosition, BackgroundParallax, WaterBrightness * 0.25 + 0.25, 0.1, FragmentColor);
+        vec4 MidgroundColor = SampleParallaxLayer(MidgroundTexture, SamplePosition, MidgroundParallax, WaterBrightness * 0.25 + 0.25, 0.2, FragmentColor);
+        vec4 ForegroundColor = SampleForeground(SamplePosition, WaterBrightness * 0.075 + 0.05, 0.4, FragmentColor);
 
         // Combine layers + Add caustics to water
-        FragmentColor = GetCausticsPattern(OffestCoordinate * 1.5) * BlendLayers(FragmentColor, BackgroundColor, MidgroundColor, ForegroundColor);
+        FragmentColor = SampleCausticsPattern(OffestCoordinate) * BlendLayers(FragmentColor, BackgroundColor, MidgroundColor, ForegroundColor);
     }
     
     else {
 
         // Apply fog to water based on scene depth
         float SceneDepth = smoothstep(ForegroundHeight, BackgroundHeight, OffestCoordinate.y);
-        vec4 FogColorAnimated = FogColor * (GetWindPattern(OffestCoordinate) * 0.75 + 0.5);
+        vec4 FogColorAnimated = FogColor * (SampleWindPattern(OffestCoordinate) * 0.75 + 0.5);
         FragmentColor = vec4(mix(WaterColor.rgb * 0.75, FogColorAnimated.rgb, SceneDepth * 0.5 + step(1.0, SceneDepth) * 0.5), 1.0);
 
-        vec4 BackgroundColor = SampleLayer(BackgroundTexture, FragmentCoordinate, 0.5, 0.45, FogColorAnimated);
-        vec4 MidgroundColor = SampleLayer(MidgroundTexture, FragmentCoordinate, 0.5, 0.65, FogColorAnimated);
-        vec4 ForegroundColor = SampleLayer(ForegroundTexture, FragmentCoordinate, 0.5, 0.85, FogColorAnimated);
+        vec4 BackgroundColor = SampleParallaxLayer(BackgroundTexture, FragmentCoordinate, BackgroundParallax, 0.5, 0.45, FogColorAnimated);
+        vec4 MidgroundColor = SampleParallaxLayer(MidgroundTexture, FragmentCoordinate, MidgroundParallax, 0.5, 0.65, FogColorAnimated);
+        vec4 ForegroundColor = SampleForeground(FragmentCoordinate, 0.5, 0.85, FogColorAnimated);
 
         // Layers hit water at different scene depth
         BackgroundColor.a *= 1.0 - step(SceneDepth, 0.85);
@@ -242,6 +329,6 @@ void main()
         FragmentColor = BlendLayers(FragmentColor, BackgroundColor, MidgroundColor, ForegroundColor);
     }
 
-    vec4 MenusColor = texture(MenusTexture, FragmentCoordinate);
+    vec4 MenusColor = SampleLayerTexture(MenusTexture, FragmentCoordinate);
     FragmentColor = mix(FragmentColor, MenusColor, MenusColor.a);
 }
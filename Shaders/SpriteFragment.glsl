@@ -0,0 +1,16 @@
+#version 330 core
+
+uniform sampler2D AtlasTexture;
+
+in vec2 AtlasCoordinate;
+out vec4 FragmentColor;
+
+void main()
+{
+    // Atlas texels are in the surface byte order, written out unchanged like a layer upload
+    FragmentColor = texture(AtlasTexture, AtlasCoordinate);
+
+    if (FragmentColor.a == 0.0) {
+        discard;
+    }
+}
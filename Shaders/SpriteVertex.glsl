@@ -0,0 +1,31 @@
+#version 330 core
+
+in vec2 Corner;
+
+in vec2 InstancePosition;
+in float InstanceAngle;
+in vec2 InstanceScale;
+in vec4 InstanceRect;
+
+uniform sampler2D AtlasTexture;
+uniform vec2 PixelOffset;
+uniform vec2 Resolution;
+
+out vec2 AtlasCoordinate;
+
+void main()
+{
+    // Mirror and scale first, then rotate counterclockwise on screen like pygame.transform.rotate
+    vec2 LocalPosition = Corner * InstanceRect.zw * InstanceScale;
+    float Angle = radians(InstanceAngle);
+    vec2 RotatedPosition = vec2(
+        LocalPosition.x * cos(Angle) + LocalPosition.y * sin(Angle),
+        -LocalPosition.x * sin(Angle) + LocalPosition.y * cos(Angle)
+    );
+
+    // Layer textures keep the first row at the top so pixel rows map straight onto clip space
+    vec2 ScenePosition = InstancePosition + RotatedPosition - PixelOffset;
+    gl_Position = vec4(ScenePosition / Resolution * 2.0 - 1.0, 0.0, 1.0);
+
+    AtlasCoordinate = (InstanceRect.xy + (Corner + 0.5) * InstanceRect.zw) / vec2(textureSize(AtlasTexture, 0));
+}
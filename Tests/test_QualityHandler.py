@@ -0,0 +1,81 @@
+import os, sys, unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame, moderngl as mgl
+
+from Scripts.GameObject import GameObject
+from Scripts.CppBuild.Simulations import Vec2
+from Scripts.Handlers.SettingsHandler import SettingsHandler
+
+# Run from anywhere, the game loads its data relative to the working directory
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+class QualityHandlerTests(unittest.TestCase):
+    # Only the parts of the game the scene and the quality handler read are made, the audio and
+    # simulations aren't needed to pick a tier
+    def CreateGame(self, ResolutionDivisor, RefreshInterval):
+        try:
+            Context = mgl.create_standalone_context(backend = "egl") if sys.platform.startswith("linux") else mgl.create_standalone_context()
+        except Exception as Error:
+            self.skipTest(f"No OpenGL context: {Error}")
+
+        from Scripts.ScenePygame import ScenePygame
+        from Scripts.SceneModernGL import SceneModernGL
+        from Scripts.Simulations.WaveSimulation import WaveSimulation
+        from Scripts.Handlers.QualityHandler import QualityHandler
+
+        pygame.init()
+        Settings = SettingsHandler()
+        Settings.CaptureSource = ""
+        Settings.EffectsResolutionDivisor = ResolutionDivisor
+        Settings.EffectsRefreshInterval = RefreshInterval
+        pygame.display.set_mode(Settings.SceneResolution)
+
+        Game = GameObject.Game = SimpleNamespace(
+            Settings = Settings,
+            Benchmark = SimpleNamespace(CreateContext = lambda: Context),
+            DeltaTime = 1 / Settings.FpsCap,
+            FishManager = SimpleNamespace(OffscreenUpdateInterval = Settings.OffscreenUpdateInterval),
+            KelpManager = SimpleNamespace(KelpWorld = SimpleNamespace(MaximumIterations = 10)),
+        )
+        Game.Waves = WaveSimulation(SamplesPerPixel = 1, TableMargin = 0.25)
+        Game.PygameScene = ScenePygame()
+        Game.ModernGLScene = SceneModernGL()
+        Game.Quality = QualityHandler(Tiers = Settings.QualityTiers, WindowFrames = 60, DownscaleLoad = 1.0, UpscaleLoad = 0.7)
+        return Game
+
+    def tearDown(self):
+        pygame.quit()
+
+    def AssertEffectsRender(self, Scene):
+        if Scene.UseEffectsBuffer:
+            self.assertIsNotNone(Scene.EffectsTexture)
+            Scene.RenderEffects(Vec2([0, 0]))
+
+    def test_FullRateEffectsSettings(self):
+        # A divisor and interval of 1 draw the effects per pixel, without an effects buffer
+        Game = self.CreateGame(1, 1)
+        Scene = Game.ModernGLScene
+
+        self.assertEqual(Game.Quality.Tier, len(Game.Quality.Tiers) - 1)
+        self.assertFalse(Scene.UseEffectsBuffer)
+        self.assertIsNone(Scene.EffectsTexture)
+
+        # Every tier, then back to the settings as written
+        for Tier in list(range(len(Game.Quality.Tiers))) + [len(Game.Quality.Tiers) - 1]:
+            Game.Quality.ApplyTier(Tier)
+            self.AssertEffectsRender(Scene)
+
+    def test_RefreshIntervalAtFullResolution(self):
+        # Full resolution still goes through the buffer when it is only redrawn every few frames
+        Game = self.CreateGame(1, 2)
+        Scene = Game.ModernGLScene
+
+        self.assertTrue(Scene.UseEffectsBuffer)
+        self.AssertEffectsRender(Scene)
+
+if __name__ == "__main__":
+    unittest.main()